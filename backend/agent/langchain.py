@@ -30,6 +30,9 @@ class CVAnalyzer:
     Refactorizado para mantener solo métodos utilizados
     """
     
+    # Respuesta por defecto cuando el LLM falla
+    FALLBACK_ADVICE = "Lo siento, no pude generar consejos personalizados en este momento. Te recomiendo explorar cursos de programación básica y plataformas como LinkedIn Learning para comenzar tu transición al sector tecnológico."
+    
     def __init__(self):
         """Initialize the CV Analyzer with LLM connection only"""
         self.groq_api_key = os.getenv("GROQ_API_KEY")
@@ -109,7 +112,7 @@ class CVAnalyzer:
 
         except Exception as e:
             logger.error(f"Error generating career advice: {e}")
-            return "Lo siento, no pude generar consejos personalizados en este momento. Te recomiendo explorar cursos de programación básica y plataformas como LinkedIn Learning para comenzar tu transición al sector tecnológico."
+            return self.FALLBACK_ADVICE
 
     def save_user_profile_to_db(self, user_id: int, analysis_result: Dict[str, Any], 
                                resume_path: str) -> bool:
@@ -207,6 +210,10 @@ class CVAnalyzer:
                 logger.info(f"Created new user profile for user_id: {user_id}")
             
             conn.commit()
+            
+            # The CV anonymizer caches profiles (full_name) per user
+            from services.cv_anonymizer import invalidate_user
+            invalidate_user(user_id)
             return True
             
         except Exception as e:
@@ -282,15 +289,15 @@ def analyze_user_cv(user_id: int, cv_text: str) -> Dict[str, Any]:
     return analyzer.process_cv_and_generate_advice(user_id, cv_text)
 
 
-def get_career_advice_for_profile(user_id: int) -> Optional[str]:
+def get_user_profile_analysis(user_id: int) -> Optional[Dict[str, Any]]:
     """
-    Generate career advice for an existing user profile
+    Load an existing user profile in the analysis format used by the advice prompt
     
     Args:
         user_id: User ID
         
     Returns:
-        Career advice string or None if profile not found
+        Analysis dict or None if profile not found
     """
     conn = connect()
     if conn is None:
@@ -310,7 +317,7 @@ def get_career_advice_for_profile(user_id: int) -> Optional[str]:
             return None
         
         # Convert to analysis format
-        analysis_result = {
+        return {
             "full_name": profile[0] or "Usuario",
             "education_level": profile[1] or "secondary",
             "previous_experience": profile[2] or "Sin experiencia detectada",
@@ -322,15 +329,35 @@ def get_career_advice_for_profile(user_id: int) -> Optional[str]:
             "tech_readiness": 5
         }
         
+    except Exception as e:
+        logger.error(f"Error loading user profile: {e}")
+        return None
+    finally:
+        cursor.close()
+        disconnect(conn)
+
+
+def get_career_advice_for_profile(user_id: int) -> Optional[str]:
+    """
+    Generate career advice for an existing user profile
+    
+    Args:
+        user_id: User ID
+        
+    Returns:
+        Career advice string or None if profile not found
+    """
+    analysis_result = get_user_profile_analysis(user_id)
+    if analysis_result is None:
+        return None
+    
+    try:
         analyzer = CVAnalyzer()
         return analyzer.generate_career_advice(analysis_result)
         
     except Exception as e:
         logger.error(f"Error getting career advice for profile: {e}")
         return None
-    finally:
-        cursor.close()
-        disconnect(conn)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 # Database package - Migration-based architecture
-from .db_connection import connect, disconnect, connect_async, disconnect_async, get_database_url
+from .db_connection import (
+    connect, disconnect, connect_async, disconnect_async, get_database_url,
+    get_pool, get_conn, close_pool, get_async_pool, close_async_pool
+)
 from .create_database import create_database
 from .init_extensions import init_pgvector_extension
 from .migration_manager import MigrationManager
@@ -11,6 +14,11 @@ __all__ = [
     "connect_async",
     "disconnect_async",
     "get_database_url",
+    "get_pool",
+    "get_conn",
+    "close_pool",
+    "get_async_pool",
+    "close_async_pool",
     # Database initialization functions
     "create_database",
     "init_pgvector_extension",
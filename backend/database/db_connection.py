@@ -1,6 +1,13 @@
 import os
+import asyncio
+import threading
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import asyncpg
+from pgvector.psycopg2 import register_vector
+from pgvector.asyncpg import register_vector as register_vector_async
 from dotenv import load_dotenv
 from loguru import logger
 from urllib.parse import urlparse
@@ -8,6 +15,20 @@ from urllib.parse import urlparse
 # Load environment variables from the .env file in backend directory
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
+# Shared psycopg2 connection pool (created lazily by get_pool)
+POOL_MIN_CONNECTIONS = int(os.getenv("DB_POOL_MIN", "2"))
+POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX", "20"))
+_pool = None
+_pool_lock = threading.Lock()
+
+# Shared asyncpg connection pool (created lazily by get_async_pool)
+ASYNC_POOL_MIN_CONNECTIONS = int(os.getenv("DB_ASYNC_POOL_MIN", "5"))
+ASYNC_POOL_MAX_CONNECTIONS = int(os.getenv("DB_ASYNC_POOL_MAX", "20"))
+# Prepared statements kept per async connection, keyed by SQL text
+ASYNC_STATEMENT_CACHE_SIZE = int(os.getenv("DB_ASYNC_STATEMENT_CACHE", "256"))
+_async_pool = None
+_async_pool_lock = asyncio.Lock()
+
 def get_database_url():
     """Get the constructed database URL for the target database"""
     database_url = os.getenv("DATABASE_URL")
@@ -72,6 +93,117 @@ def connect():
         logger.error(f"Error while connecting to database: {e}")
         return None
 
+def get_pool():
+    """
+    Get the shared thread-safe connection pool, creating it on first use.
+    
+    Returns:
+        psycopg2.pool.ThreadedConnectionPool: Pool for the project database
+    """
+    global _pool
+    
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = psycopg2.pool.ThreadedConnectionPool(
+                    POOL_MIN_CONNECTIONS,
+                    POOL_MAX_CONNECTIONS,
+                    get_database_url()
+                )
+                logger.info(
+                    f"Connection pool created ({POOL_MIN_CONNECTIONS}-{POOL_MAX_CONNECTIONS} connections)"
+                )
+                _register_vector_type(_pool)
+    return _pool
+
+def _register_vector_type(pool):
+    """
+    Register the pgvector adapter so numpy arrays bind as vector parameters
+    and vector columns are read back as float32 numpy arrays.
+    
+    psycopg2 registers the type globally, so one connection is enough.
+    """
+    conn = pool.getconn()
+    try:
+        register_vector(conn)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"pgvector type not registered: {e}")
+    finally:
+        pool.putconn(conn)
+
+@contextmanager
+def get_conn():
+    """
+    Borrow a connection from the shared pool.
+    
+    The transaction is rolled back if the block raises or leaves it open,
+    and the connection is always returned to the pool.
+    
+    Yields:
+        psycopg2.extensions.connection: Pooled database connection
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        if not conn.closed and conn.status != psycopg2.extensions.STATUS_READY:
+            conn.rollback()
+        pool.putconn(conn, close=bool(conn.closed))
+
+def close_pool():
+    """Close all pooled connections"""
+    global _pool
+    
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            logger.info("Connection pool closed")
+
+async def get_async_pool():
+    """
+    Get the shared asyncpg connection pool, creating it on first use.
+    
+    Every pooled connection has the pgvector codec registered, so vector
+    parameters and columns are exchanged as float32 numpy arrays. Queries
+    are prepared once per connection and reused by SQL text, so hot queries
+    should be constant strings with all values passed as parameters.
+    
+    Returns:
+        asyncpg.Pool: Pool for the project database
+    """
+    global _async_pool
+    
+    if _async_pool is None:
+        async with _async_pool_lock:
+            if _async_pool is None:
+                _async_pool = await asyncpg.create_pool(
+                    get_database_url(),
+                    min_size=ASYNC_POOL_MIN_CONNECTIONS,
+                    max_size=ASYNC_POOL_MAX_CONNECTIONS,
+                    statement_cache_size=ASYNC_STATEMENT_CACHE_SIZE,
+                    max_cached_statement_lifetime=0,
+                    init=register_vector_async
+                )
+                logger.info(
+                    f"Async connection pool created "
+                    f"({ASYNC_POOL_MIN_CONNECTIONS}-{ASYNC_POOL_MAX_CONNECTIONS} connections)"
+                )
+    return _async_pool
+
+async def close_async_pool():
+    """Close all async pooled connections"""
+    global _async_pool
+    
+    async with _async_pool_lock:
+        if _async_pool is not None:
+            await _async_pool.close()
+            _async_pool = None
+            logger.info("Async connection pool closed")
+
 async def connect_async():
     """Asynchronous connection using asyncpg"""
     try:
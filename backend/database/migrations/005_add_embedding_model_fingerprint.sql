@@ -0,0 +1,9 @@
+-- Migration 005: Embedding model fingerprint and file hash lookup
+-- Lets RAGIntegrationService reuse a stored embedding for identical files
+-- (same file_hash) produced by the same embedding model.
+
+ALTER TABLE document_embeddings
+    ADD COLUMN IF NOT EXISTS embedding_model_id VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS idx_doc_embeddings_hash
+    ON document_embeddings(file_hash, embedding_model_id);
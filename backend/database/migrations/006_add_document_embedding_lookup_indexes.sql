@@ -0,0 +1,14 @@
+-- Migration 006: Lookup indexes for document_embeddings
+-- (user_id, document_id) is already covered by the unique constraint that
+-- ON CONFLICT (user_id, document_id) relies on, and file_hash lookups by
+-- idx_doc_embeddings_hash (005). This adds a partial index for the
+-- per-user listing/search filters, which only ever read active rows.
+--
+-- Plain CREATE INDEX is used because migrations run inside a transaction
+-- (CREATE INDEX CONCURRENTLY is not allowed there).
+
+CREATE INDEX IF NOT EXISTS idx_doc_embeddings_user_active
+    ON document_embeddings(user_id, document_type)
+    WHERE is_active;
+
+ANALYZE document_embeddings;
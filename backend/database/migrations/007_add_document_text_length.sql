@@ -0,0 +1,10 @@
+-- Migration 007: Store content length alongside the document
+-- Status queries read text_length instead of LENGTH(content_text), which
+-- had to detoast the full document text on every call.
+
+ALTER TABLE document_embeddings
+    ADD COLUMN IF NOT EXISTS text_length INTEGER;
+
+UPDATE document_embeddings
+SET text_length = LENGTH(content_text)
+WHERE text_length IS NULL AND content_text IS NOT NULL;
@@ -0,0 +1,6 @@
+-- Migration 008: MinHash signature per document
+-- 128 x uint32 MinHash over word shingles, used to reuse the embedding of a
+-- near-duplicate document of the same user instead of re-running inference.
+
+ALTER TABLE document_embeddings
+    ADD COLUMN IF NOT EXISTS content_minhash BYTEA;
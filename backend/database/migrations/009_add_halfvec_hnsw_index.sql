@@ -0,0 +1,18 @@
+-- Migration 009: Half-precision HNSW index for document search
+-- Requires pgvector >= 0.7.0 (halfvec type).
+--
+-- The index stores content_embedding as halfvec (2 bytes per dimension), so
+-- it takes half the memory of a float32 vector index and ANN probes read
+-- half the pages. content_embedding itself stays vector(384) because the
+-- search function and the primary-CV sync trigger expect that type.
+-- m=24 / ef_construction=128 (default 16 / 64) build a denser graph for
+-- higher recall at the same ef_search. Building on a large table is faster
+-- with a session-level maintenance_work_mem that fits the graph.
+-- Queries use the index with:
+--   ORDER BY content_embedding::halfvec(384) <=> $1::halfvec(384)
+
+CREATE INDEX IF NOT EXISTS idx_doc_embeddings_halfvec_hnsw
+    ON document_embeddings
+    USING hnsw ((content_embedding::halfvec(384)) halfvec_cosine_ops)
+    WITH (m = 24, ef_construction = 128)
+    WHERE is_active;
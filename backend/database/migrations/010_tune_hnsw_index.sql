@@ -0,0 +1,7 @@
+-- Migration 010: Search-time tuning of the HNSW index
+-- The index from 009 is built with m=24 / ef_construction=128; recall at
+-- query time is set per transaction with hnsw.ef_search
+-- (SearchService.DEFAULT_EF_SEARCH), so no server setting is changed here.
+
+COMMENT ON INDEX idx_doc_embeddings_halfvec_hnsw IS
+    'HNSW m=24, ef_construction=128; hnsw.ef_search is set per transaction by SearchService';
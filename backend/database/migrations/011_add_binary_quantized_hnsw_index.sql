@@ -0,0 +1,17 @@
+-- Migration 011: Binary-quantized HNSW index for large corpora
+-- Requires pgvector >= 0.7.0 (binary_quantize, bit_hamming_ops).
+--
+-- Each embedding is indexed as a 384-bit sign vector (48 bytes instead of
+-- 1536), so the graph stays in memory far longer and distances are popcounts.
+-- Used by SearchService when SEARCH_BINARY_RERANK=true: candidates are taken
+-- by Hamming distance and re-ranked with the exact cosine distance.
+-- Queries use the index with:
+--   ORDER BY binary_quantize(content_embedding)::bit(384) <~> binary_quantize($1::vector)
+
+SET LOCAL maintenance_work_mem = '2GB';
+SET LOCAL max_parallel_maintenance_workers = 7;
+
+CREATE INDEX IF NOT EXISTS idx_doc_embeddings_bit_hnsw
+    ON document_embeddings
+    USING hnsw ((binary_quantize(content_embedding)::bit(384)) bit_hamming_ops)
+    WHERE is_active;
@@ -0,0 +1,15 @@
+-- Migration 012: Stored content preview for search results
+-- Computes the 200-character preview once per write instead of on every
+-- search, so result rows never read the (TOASTed, multi-KB) content_text.
+-- Same text SearchService used to build: trimmed, with '...' when truncated.
+-- Adding a stored generated column rewrites the table once.
+
+ALTER TABLE document_embeddings
+    ADD COLUMN IF NOT EXISTS content_preview TEXT
+    GENERATED ALWAYS AS (
+        CASE
+            WHEN char_length(content_text) > 200
+                THEN btrim(LEFT(content_text, 200)) || '...'
+            ELSE COALESCE(btrim(content_text), '')
+        END
+    ) STORED;
@@ -0,0 +1,24 @@
+-- Migration 013: Precomputed per-user document statistics
+-- Replaces the COUNT/SUM scan of get_document_statistics() on every call
+-- with a lookup in a small materialized view. SearchService refreshes it
+-- CONCURRENTLY in the background (STATS_REFRESH_SECONDS), which needs the
+-- unique index below; readers are never blocked by a refresh.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS doc_stats_by_user AS
+SELECT
+    user_id,
+    COUNT(*) AS total_documents,
+    COUNT(*) FILTER (WHERE document_type = 'cv') AS cv_count,
+    COUNT(*) FILTER (WHERE document_type = 'cover_letter') AS cover_letter_count,
+    COUNT(*) FILTER (WHERE document_type = 'certificate') AS certificate_count,
+    COUNT(*) FILTER (WHERE document_type = 'other') AS other_count,
+    COALESCE(SUM(file_size), 0)::bigint AS total_size_bytes,
+    COUNT(*) FILTER (WHERE processing_status = 'processed') AS processed_count,
+    COUNT(*) FILTER (WHERE processing_status = 'pending') AS pending_count,
+    COUNT(*) FILTER (WHERE processing_status = 'failed') AS failed_count
+FROM document_embeddings
+WHERE is_active = TRUE
+GROUP BY user_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_doc_stats_by_user_user_id
+    ON doc_stats_by_user (user_id);
@@ -7,9 +7,10 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import os
+import asyncio
 from dotenv import load_dotenv
 from loguru import logger
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 # Cargar variables de entorno desde backend/.env (antes de importar routers)
@@ -25,7 +26,10 @@ from routes.reviews_routes import reviews_router
 from routes.employment_platforms_routes import platforms_router
 from routes.rag_routes import rag_router
 from services.setup_service import setup_service
+from database.db_connection import close_pool, close_async_pool
 from routes.chatbot_route import router as chatbot_router
+from services.RAG.embedding_service import get_embedding_service
+from services.RAG.search_service import get_search_service
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -48,10 +52,25 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("✅ Sistema ya configurado")
     
+    # Cargar el modelo de embeddings una vez al arrancar (no en la primera petición)
+    if os.getenv("PRELOAD_EMBEDDING_MODEL", "true").lower() == "true":
+        try:
+            await asyncio.to_thread(get_embedding_service().warmup)
+        except Exception as e:
+            logger.error(f"❌ Error precargando el modelo de embeddings: {e}")
+    
+    # Refrescar periódicamente las estadísticas de documentos (vista materializada)
+    stats_refresh_task = asyncio.create_task(get_search_service().run_statistics_refresh())
+    
     yield
     
     # Shutdown
     logger.info("🔄 Cerrando aplicación")
+    stats_refresh_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await stats_refresh_task
+    await close_async_pool()
+    close_pool()
 
 # Configuración CORS
 try:
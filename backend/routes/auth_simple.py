@@ -273,7 +273,7 @@ async def login_for_swagger(form_data: Annotated[OAuth2PasswordRequestForm, Depe
         )
     
     # Verificar contraseña
-    if not verify_password(form_data.password, user["password_hash"]):
+    if not await verify_password(form_data.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email o contraseña incorrectos",
@@ -393,7 +393,7 @@ async def register(
         )
     
     # Encriptar contraseña
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     
     # Crear usuario (solo email y password van a la DB)
     try:
@@ -508,7 +508,7 @@ async def login(
         )
     
     # Verificar contraseña
-    if not verify_password(user_credentials.password, user["password_hash"]):
+    if not await verify_password(user_credentials.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email o contraseña incorrectos",
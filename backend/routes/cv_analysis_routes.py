@@ -59,7 +59,7 @@ async def analyze_resume(
                 raise HTTPException(status_code=400, detail=validation_result.get("message"))
             
             # Analyze resume
-            analysis_result = cv_analysis_service.analyze_user_resume(user_id, temp_file_path)
+            analysis_result = await cv_analysis_service.analyze_user_resume_async(user_id, temp_file_path)
             
             if analysis_result.get("success"):
                 return JSONResponse(
@@ -104,7 +104,7 @@ async def get_career_advice(current_user: Dict = Depends(get_current_user)):
         if not user_id:
             raise HTTPException(status_code=401, detail="Usuario no autenticado")
         
-        advice_result = cv_analysis_service.get_updated_career_advice(user_id)
+        advice_result = await cv_analysis_service.get_updated_career_advice_async(user_id)
         
         if advice_result.get("success"):
             return JSONResponse(
@@ -21,6 +21,9 @@ from routes.auth_simple import get_current_user
 # Import de base de datos
 from database.db_connection import connect_async, disconnect_async
 
+# Caché de perfiles del anonimizador de CVs
+from services.cv_anonymizer import invalidate_user
+
 # Router para perfil de usuario
 profile_router = APIRouter(
     prefix="/profile",
@@ -116,6 +119,7 @@ async def update_profile_db(user_id: int, profile_data: dict) -> Optional[dict]:
         
         values.append(user_id)
         row = await conn.fetchrow(query, *values)
+        invalidate_user(user_id)
         return dict(row) if row else None
     
     except Exception as e:
@@ -133,6 +137,7 @@ async def delete_profile_db(user_id: int) -> bool:
     try:
         query = "DELETE FROM user_personal_info WHERE user_id = $1"
         result = await conn.execute(query, user_id)
+        invalidate_user(user_id)
         return "DELETE 1" in result
     
     except Exception as e:
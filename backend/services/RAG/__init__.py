@@ -38,7 +38,9 @@ from .ranking_service import (
 
 from .rag_integration_service import (
     RAGIntegrationService,
+    DocumentBatchCollector,
     get_rag_integration_service,
+    get_document_batch_collector,
     process_document_for_rag
 )
 
@@ -65,6 +67,8 @@ __all__ = [
     
     # RAG Integration service
     'RAGIntegrationService',
+    'DocumentBatchCollector',
     'get_rag_integration_service',
+    'get_document_batch_collector',
     'process_document_for_rag',
 ]
@@ -4,7 +4,7 @@ Extracts text from various document formats (PDF, DOC, DOCX)
 """
 import os
 import re
-from typing import Dict, Optional
+from typing import Dict, Optional, Iterable
 from pathlib import Path
 from loguru import logger
 import fitz  # PyMuPDF
@@ -97,6 +97,62 @@ class DocumentProcessor:
             logger.error(f"❌ Error extracting text from {file_path.name}: {e}")
             raise RuntimeError(f"Failed to extract text: {e}")
     
+    def extract_text_preview(self, file_path: Path, max_chars: int = 500) -> Optional[str]:
+        """
+        Cheaply extract the first max_chars characters of cleaned text
+        
+        Reads PDFs page by page and TXT files in chunks, stopping as soon as
+        enough text is found, so documents without usable text can be
+        rejected before full extraction. DOCX files must be parsed entirely
+        anyway, so no preview is produced for them.
+        
+        Args:
+            file_path: Path to the document file
+            max_chars: Number of cleaned characters to collect
+            
+        Returns:
+            Optional[str]: Cleaned text (shorter than max_chars only if the
+            whole document is), or None if no cheap preview is available
+        """
+        file_path = Path(file_path)
+        extension = file_path.suffix.lower()
+        
+        if extension == '.pdf':
+            with fitz.open(file_path) as pdf_document:
+                return self._preview_from_chunks(
+                    (page.get_text() for page in pdf_document),
+                    max_chars
+                )
+        
+        if extension == '.txt':
+            # Trivial early out: fewer bytes than characters needed
+            if file_path.stat().st_size < max_chars:
+                return self.clean_extracted_text(self.extract_text_from_txt(file_path))
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                return self._preview_from_chunks(iter(lambda: f.read(4096), ''), max_chars)
+        
+        return None
+    
+    def _preview_from_chunks(self, chunks: Iterable[str], max_chars: int) -> str:
+        """
+        Collect raw text chunks until the cleaned text reaches max_chars
+        
+        Args:
+            chunks: Raw text pieces (pages, file chunks)
+            max_chars: Number of cleaned characters to collect
+            
+        Returns:
+            str: Cleaned preview text
+        """
+        collected = []
+        preview = ""
+        for chunk in chunks:
+            collected.append(chunk)
+            preview = self.clean_extracted_text("\n\n".join(collected))
+            if len(preview) >= max_chars:
+                break
+        return preview[:max_chars]
+    
     # ===================================
     # SPECIFIC METHODS (Advanced API)
     # ===================================
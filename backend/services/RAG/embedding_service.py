@@ -3,13 +3,60 @@ Embedding Service for OrientaTech RAG System
 Generates vector embeddings from text using sentence-transformers
 """
 import os
+import re
+import asyncio
+import hashlib
+import functools
+import threading
+import contextlib
+import concurrent.futures
+from collections import OrderedDict
 import numpy as np
-from typing import List, Optional, Dict, Union
+from typing import List, Optional, Dict, Union, Literal, Tuple
 from pathlib import Path
 from loguru import logger
 from sentence_transformers import SentenceTransformer
 import torch
 
+# Numba is optional: without it calculate_similarity falls back to NumPy
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Intel Extension for PyTorch is optional: enables the BF16 CPU path (AMX/AVX-512)
+try:
+    import intel_extension_for_pytorch as ipex
+    HAS_IPEX = True
+except ImportError:
+    ipex = None
+    HAS_IPEX = False
+
+
+# Output precisions supported by the embedding APIs
+EmbeddingPrecision = Literal["float32", "float16", "bfloat16", "int8", "ubinary"]
+
+# Runs of whitespace collapsed by preprocess_text
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+if numba is not None:
+    @numba.njit("f4(f4[::1], f4[::1])", fastmath=True, cache=True)
+    def _cosine_similarity_kernel(vec1, vec2):
+        """Single-pass fused dot product and norms over two FP32 vectors"""
+        dot = np.float32(0.0)
+        norm1 = np.float32(0.0)
+        norm2 = np.float32(0.0)
+        for i in range(vec1.shape[0]):
+            dot += vec1[i] * vec2[i]
+            norm1 += vec1[i] * vec1[i]
+            norm2 += vec2[i] * vec2[i]
+        if norm1 == 0.0 or norm2 == 0.0:
+            return np.float32(0.0)
+        return dot / np.sqrt(norm1 * norm2)
+else:
+    _cosine_similarity_kernel = None
+
 
 class EmbeddingService:
     """
@@ -18,7 +65,7 @@ class EmbeddingService:
     Features:
     - Multi-language support (English, Spanish)
     - Batch processing for performance
-    - Caching for frequently used embeddings
+    - LRU caching for frequently used embeddings
     - 384-dimensional vectors optimized for semantic search
     """
     
@@ -27,9 +74,40 @@ class EmbeddingService:
     EMBEDDING_DIMENSION = 384
     MAX_SEQUENCE_LENGTH = 512
     
+    # Bump when preprocessing/tokenization changes so stored embeddings are
+    # no longer reused (see model_fingerprint)
+    EMBEDDING_REVISION = 1
+    
+    # Character budget for preprocessing (rough estimate: 1 token ≈ 4 characters)
+    MAX_CHARS = MAX_SEQUENCE_LENGTH * 4
+    
+    # LRU cache of generated embeddings (keyed by text hash)
+    EMBEDDING_CACHE_SIZE = 10_000
+    
+    # LRU cache of fixed-shape tokenizer output (see encode_cached)
+    TOKEN_CACHE_SIZE = 4096
+    
+    # generate_batch_embeddings preprocesses and encodes this many batches at a time
+    STREAM_WINDOW_BATCHES = 16
+    
+    # Above this many texts, preprocessing runs on a thread pool and the next
+    # window is prepared while the current one is being encoded
+    PARALLEL_PREPROCESS_THRESHOLD = 1000
+    
+    # encode_async groups concurrent requests into one forward pass of up to
+    # this many texts, waiting at most this long for the batch to fill
+    MICRO_BATCH_SIZE = 32
+    MICRO_BATCH_WAIT_MS = 10
+    
     # Singleton pattern - one model instance per application
     _model_instance: Optional[SentenceTransformer] = None
     _model_loaded: bool = False
+    _load_lock = threading.Lock()
+    
+    # CUDA graph for single-text inference at a fixed sequence length (GPU only)
+    CUDA_GRAPH_SEQ_LENGTH = 128
+    _cuda_graph: Optional[Dict] = None
+    _cuda_graph_lock = threading.Lock()
     
     def __init__(self):
         """Initialize the embedding service"""
@@ -37,9 +115,261 @@ class EmbeddingService:
         self.embedding_dim = self.EMBEDDING_DIMENSION
         self.max_length = self.MAX_SEQUENCE_LENGTH
         
+        # Identifies the vector space of stored embeddings (model + dim + revision)
+        self.model_fingerprint = hashlib.blake2b(
+            f"{self.model_name}:{self.embedding_dim}:{self.max_length}:{self.EMBEDDING_REVISION}".encode(),
+            digest_size=8
+        ).hexdigest()
+        
         # Device configuration (GPU if available, otherwise CPU)
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"EmbeddingService initialized with device: {self.device}")
+        
+        # Inference precision: half precision on GPU (tensor cores), FP32 on CPU
+        self.dtype = self._select_dtype()
+        
+        # LRU embedding cache: (blake2b digest, normalize) -> FP32 vector
+        self._embedding_cache: "OrderedDict[Tuple[bytes, bool], np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Per-instance LRU of fixed-shape tokenizer output (text -> ids, mask)
+        self._tokenize_cached = functools.lru_cache(maxsize=self.TOKEN_CACHE_SIZE)(
+            self._tokenize_fixed_length
+        )
+        
+        # Single inference worker: model.encode already uses every core / the
+        # whole GPU, so async callers are serialized instead of contending
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="embed"
+        )
+        
+        # Micro-batching state for encode_async (bound to the running event loop)
+        self._micro_batch_queue: Optional[asyncio.Queue] = None
+        self._micro_batch_worker: Optional[asyncio.Task] = None
+        logger.info(f"EmbeddingService initialized with device: {self.device} ({self.dtype})")
+    
+    def _select_dtype(self) -> torch.dtype:
+        """
+        Select the inference dtype for the current device
+        
+        Returns:
+            torch.dtype: bfloat16 on Ampere+, float16 on older GPUs; on CPU
+            bfloat16 with IPEX and native BF16 support, float32 otherwise
+        """
+        if self.device != "cuda":
+            if HAS_IPEX and torch.ops.mkldnn._is_mkldnn_bf16_supported():
+                return torch.bfloat16
+            return torch.float32
+        if torch.cuda.is_bf16_supported():
+            return torch.bfloat16
+        return torch.float16
+    
+    def _optimize_for_gpu(self, model: SentenceTransformer) -> None:
+        """
+        Move the transformer onto tensor cores (half precision + torch.compile)
+        
+        Args:
+            model: Freshly loaded SentenceTransformer instance
+        """
+        # Allow TF32 for any matmul that stays in FP32 (pooling, normalization)
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.set_float32_matmul_precision("high")
+        
+        transformer = model._first_module()
+        transformer.auto_model = transformer.auto_model.to(dtype=self.dtype)
+        
+        # Capture the graph on the eager module, before torch.compile wraps it
+        self._capture_cuda_graph(transformer.auto_model)
+        
+        eager_model = transformer.auto_model
+        try:
+            # CUDA graphs are handled by the manual capture above, so inductor
+            # must not record its own (reduce-overhead would)
+            compiled_model = torch.compile(
+                eager_model,
+                mode="max-autotune-no-cudagraphs",
+                dynamic=True
+            )
+            
+            # torch.compile is lazy: run one forward so compilation errors
+            # surface here instead of on the first encode
+            warmup_ids = torch.zeros((1, 16), dtype=torch.long, device=self.device)
+            with torch.inference_mode():
+                compiled_model(input_ids=warmup_ids, attention_mask=torch.ones_like(warmup_ids))
+            
+            transformer.auto_model = compiled_model
+            logger.info(f"   GPU optimizations enabled: {self.dtype} + torch.compile")
+        except Exception as e:
+            # torch.compile is optional: keep the half precision model if it fails
+            transformer.auto_model = eager_model
+            logger.warning(f"⚠️ torch.compile unavailable, using eager mode: {e}")
+    
+    def _capture_cuda_graph(self, auto_model: torch.nn.Module) -> None:
+        """
+        Record a CUDA graph of the transformer for one sequence of
+        CUDA_GRAPH_SEQ_LENGTH tokens
+        
+        Single-text requests are dominated by kernel launch overhead; replaying
+        a recorded graph turns every layer launch into one call.
+        
+        Args:
+            auto_model: Half precision Hugging Face transformer on CUDA
+        """
+        try:
+            shape = (1, self.CUDA_GRAPH_SEQ_LENGTH)
+            static_ids = torch.zeros(shape, dtype=torch.long, device=self.device)
+            static_mask = torch.ones(shape, dtype=torch.long, device=self.device)
+            
+            with torch.inference_mode():
+                # Warm up on a side stream (required before capture)
+                side_stream = torch.cuda.Stream()
+                side_stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(side_stream):
+                    for _ in range(3):
+                        auto_model(input_ids=static_ids, attention_mask=static_mask)
+                torch.cuda.current_stream().wait_stream(side_stream)
+                torch.cuda.synchronize()
+                
+                graph = torch.cuda.CUDAGraph()
+                with torch.cuda.graph(graph):
+                    static_out = auto_model(
+                        input_ids=static_ids,
+                        attention_mask=static_mask
+                    ).last_hidden_state
+            
+            EmbeddingService._cuda_graph = {
+                "graph": graph,
+                "input_ids": static_ids,
+                "attention_mask": static_mask,
+                "output": static_out
+            }
+            logger.info(f"   CUDA graph captured for sequences up to {self.CUDA_GRAPH_SEQ_LENGTH} tokens")
+        except Exception as e:
+            EmbeddingService._cuda_graph = None
+            logger.warning(f"⚠️ CUDA graph capture failed, using regular encode: {e}")
+    
+    def _encode_with_cuda_graph(
+        self,
+        model: SentenceTransformer,
+        cleaned_text: str,
+        normalize: bool
+    ) -> Optional[np.ndarray]:
+        """
+        Embed a single text by replaying the captured CUDA graph
+        
+        Args:
+            model: Loaded SentenceTransformer
+            cleaned_text: Preprocessed text
+            normalize: Whether to normalize the embedding vector
+            
+        Returns:
+            Optional[np.ndarray]: FP32 embedding, or None if the graph is not
+            available or the text is longer than CUDA_GRAPH_SEQ_LENGTH tokens
+        """
+        cuda_graph = EmbeddingService._cuda_graph
+        if cuda_graph is None:
+            return None
+        
+        input_ids, attention_mask, truncated = self._tokenize_cached(cleaned_text)
+        if truncated:
+            return None
+        
+        with EmbeddingService._cuda_graph_lock, torch.inference_mode():
+            cuda_graph["input_ids"].copy_(torch.from_numpy(input_ids)[None])
+            cuda_graph["attention_mask"].copy_(torch.from_numpy(attention_mask)[None])
+            cuda_graph["graph"].replay()
+            
+            # Run the remaining modules (pooling, normalization) eagerly
+            features = {
+                "token_embeddings": cuda_graph["output"],
+                "attention_mask": cuda_graph["attention_mask"]
+            }
+            for module in list(model)[1:]:
+                features = module(features)
+            
+            embedding = features["sentence_embedding"][0]
+            if normalize:
+                embedding = torch.nn.functional.normalize(embedding, p=2, dim=0)
+            return embedding.float().cpu().numpy()
+    
+    def _optimize_for_cpu(self, model: SentenceTransformer) -> None:
+        """
+        Optimize the transformer with IPEX for BF16 inference on CPU
+        
+        Args:
+            model: Freshly loaded SentenceTransformer instance
+        """
+        transformer = model._first_module()
+        try:
+            transformer.auto_model = ipex.optimize(
+                transformer.auto_model,
+                dtype=torch.bfloat16,
+                inplace=True
+            )
+            logger.info("   CPU optimizations enabled: IPEX + bfloat16")
+        except Exception as e:
+            self.dtype = torch.float32
+            logger.warning(f"⚠️ IPEX optimization failed, using FP32: {e}")
+    
+    def _autocast(self):
+        """Autocast context for the IPEX BF16 CPU path (no-op otherwise)"""
+        if self.device == "cpu" and self.dtype == torch.bfloat16:
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+    
+    def _configure_cpu_threads(self) -> None:
+        """Use every core for intra-op work and avoid inter-op oversubscription"""
+        torch.set_num_threads(os.cpu_count() or 1)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set before the first parallel op in the process
+            logger.debug("Inter-op thread count already fixed, keeping current value")
+    
+    def _create_model(self) -> SentenceTransformer:
+        """
+        Load and optimize the sentence-transformer model
+        
+        The instance is only published by _load_model once it is fully
+        optimized, so other threads never see a half-initialized model.
+        
+        Returns:
+            SentenceTransformer: Ready-to-use model instance
+        """
+        logger.info(f"Loading embedding model: {self.model_name}")
+        try:
+            # Load model with caching
+            cache_folder = Path(__file__).parent.parent.parent / "models_cache"
+            cache_folder.mkdir(exist_ok=True)
+            
+            model = SentenceTransformer(
+                self.model_name,
+                device=self.device,
+                cache_folder=str(cache_folder)
+            )
+            
+            # Inference only: no dropout, no autograd state on the weights
+            model.eval()
+            for parameter in model.parameters():
+                parameter.requires_grad_(False)
+            
+            if self.device == "cuda":
+                self._optimize_for_gpu(model)
+            else:
+                self._configure_cpu_threads()
+                if self.dtype == torch.bfloat16:
+                    self._optimize_for_cpu(model)
+            
+            logger.success(f"✅ Model loaded successfully: {self.model_name}")
+            logger.info(f"   Dimension: {self.embedding_dim}")
+            logger.info(f"   Max sequence length: {self.max_length}")
+            logger.info(f"   Device: {self.device}")
+            
+            return model
+            
+        except Exception as e:
+            logger.error(f"❌ Error loading model: {e}")
+            raise RuntimeError(f"Failed to load embedding model: {e}")
     
     def _load_model(self) -> SentenceTransformer:
         """
@@ -48,31 +378,78 @@ class EmbeddingService:
         Returns:
             SentenceTransformer: Loaded model instance
         """
+        # Double-checked locking: concurrent first calls load the model once
         if EmbeddingService._model_instance is None:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            try:
-                # Load model with caching
-                cache_folder = Path(__file__).parent.parent.parent / "models_cache"
-                cache_folder.mkdir(exist_ok=True)
-                
-                EmbeddingService._model_instance = SentenceTransformer(
-                    self.model_name,
-                    device=self.device,
-                    cache_folder=str(cache_folder)
-                )
-                
-                EmbeddingService._model_loaded = True
-                logger.success(f"✅ Model loaded successfully: {self.model_name}")
-                logger.info(f"   Dimension: {self.embedding_dim}")
-                logger.info(f"   Max sequence length: {self.max_length}")
-                logger.info(f"   Device: {self.device}")
-                
-            except Exception as e:
-                logger.error(f"❌ Error loading model: {e}")
-                raise RuntimeError(f"Failed to load embedding model: {e}")
+            with EmbeddingService._load_lock:
+                if EmbeddingService._model_instance is None:
+                    EmbeddingService._model_instance = self._create_model()
+                    EmbeddingService._model_loaded = True
         
         return EmbeddingService._model_instance
     
+    def _encode(
+        self,
+        model: SentenceTransformer,
+        texts: Union[str, List[str]],
+        **encode_kwargs
+    ) -> np.ndarray:
+        """
+        Run model.encode and always hand back FP32 numpy arrays
+        
+        The GPU path runs in half precision, so the output tensor is
+        upcast before leaving the device; callers (and calculate_similarity)
+        keep receiving float32 regardless of self.dtype.
+        
+        Args:
+            model: Loaded SentenceTransformer
+            texts: Single text or list of texts
+            **encode_kwargs: Extra arguments forwarded to model.encode
+            
+        Returns:
+            np.ndarray: FP32 embedding(s)
+        """
+        with torch.inference_mode(), self._autocast():
+            embeddings = model.encode(
+                texts,
+                convert_to_tensor=True,
+                **encode_kwargs
+            )
+            return embeddings.float().cpu().numpy()
+    
+    # ===================================
+    # EMBEDDING CACHE
+    # ===================================
+    
+    @staticmethod
+    def _cache_key(cleaned_text: str, normalize: bool) -> Tuple[bytes, bool]:
+        """Build the cache key for a preprocessed text"""
+        digest = hashlib.blake2b(cleaned_text.encode("utf-8"), digest_size=16).digest()
+        return digest, normalize
+    
+    def _cache_get(self, key: Tuple[bytes, bool]) -> Optional[np.ndarray]:
+        """Return a cached embedding and mark it as recently used"""
+        with self._cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+            return embedding
+    
+    def _cache_put(self, key: Tuple[bytes, bool], embedding: np.ndarray) -> None:
+        """Store an embedding, evicting the least recently used entry if full"""
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        with self._cache_lock:
+            self._embedding_cache[key] = embedding
+            self._embedding_cache.move_to_end(key)
+            while len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+    
+    def clear_cache(self) -> None:
+        """Drop all cached embeddings and tokenizer output"""
+        with self._cache_lock:
+            self._embedding_cache.clear()
+        self._tokenize_cached.cache_clear()
+    
     def preprocess_text(self, text: str) -> str:
         """
         Preprocess text before generating embeddings
@@ -86,35 +463,32 @@ class EmbeddingService:
         if not text:
             return ""
         
-        # Convert to string if not already
-        text = str(text)
-        
-        # Remove excessive whitespace
-        text = " ".join(text.split())
-        
-        # Strip leading/trailing whitespace
-        text = text.strip()
+        # Collapse whitespace runs and strip leading/trailing whitespace
+        text = _WHITESPACE_RE.sub(" ", str(text)).strip()
         
         # Truncate to max length (approximate, model will handle exact tokenization)
-        # Rough estimate: 1 token ≈ 4 characters
-        max_chars = self.max_length * 4
-        if len(text) > max_chars:
-            text = text[:max_chars]
-            logger.debug(f"Text truncated to {max_chars} characters")
+        if len(text) > self.MAX_CHARS:
+            text = text[:self.MAX_CHARS]
+            logger.debug(f"Text truncated to {self.MAX_CHARS} characters")
         
         return text
     
     def generate_embedding(
         self, 
         text: str,
-        normalize: bool = True
-    ) -> List[float]:
+        normalize: bool = True,
+        return_numpy: bool = False,
+        precision: EmbeddingPrecision = "float32"
+    ) -> Union[List[float], np.ndarray]:
         """
         Generate embedding vector for a single text
         
         Args:
             text: Input text to embed
             normalize: Whether to normalize the embedding vector
+            return_numpy: Return a (read-only) float32 np.ndarray instead of a list
+            precision: Output precision; anything but "float32" returns an
+                np.ndarray (see quantize_embeddings)
             
         Returns:
             List[float]: 384-dimensional embedding vector
@@ -133,29 +507,43 @@ class EmbeddingService:
             if not cleaned_text:
                 raise ValueError("Text is empty after preprocessing")
             
-            # Load model (lazy loading)
-            model = self._load_model()
+            cache_key = self._cache_key(cleaned_text, normalize)
+            embedding = self._cache_get(cache_key)
             
-            # Generate embedding
-            embedding = model.encode(
-                cleaned_text,
-                convert_to_numpy=True,
-                normalize_embeddings=normalize,
-                show_progress_bar=False
-            )
-            
-            # Convert to list of floats
-            embedding_list = embedding.tolist()
+            if embedding is None:
+                # Load model (lazy loading)
+                model = self._load_model()
+                
+                # GPU fast path: replay the captured CUDA graph for short texts
+                embedding = self._encode_with_cuda_graph(model, cleaned_text, normalize)
+                
+                if embedding is None:
+                    # Generate embedding
+                    embedding = self._encode(
+                        model,
+                        cleaned_text,
+                        normalize_embeddings=normalize,
+                        show_progress_bar=False
+                    )
+                self._cache_put(cache_key, embedding)
             
             # Validate dimension
-            if len(embedding_list) != self.embedding_dim:
+            if embedding.shape[-1] != self.embedding_dim:
                 raise RuntimeError(
-                    f"Unexpected embedding dimension: {len(embedding_list)} "
+                    f"Unexpected embedding dimension: {embedding.shape[-1]} "
                     f"(expected {self.embedding_dim})"
                 )
             
             logger.debug(f"Generated embedding for text: '{cleaned_text[:50]}...'")
-            return embedding_list
+            
+            if precision != "float32":
+                return self.quantize_embeddings(embedding, precision)
+            
+            if return_numpy:
+                return embedding
+            
+            # Convert to list of floats
+            return embedding.tolist()
             
         except ValueError:
             raise
@@ -163,12 +551,109 @@ class EmbeddingService:
             logger.error(f"Error generating embedding: {e}")
             raise RuntimeError(f"Failed to generate embedding: {e}")
     
+    def _iter_preprocessed_windows(self, texts: List[str], window_size: int):
+        """
+        Yield preprocessed, non-empty texts one window at a time
+        
+        Large inputs are preprocessed on a thread pool with one window of
+        look-ahead, so cleaning the next window overlaps with encoding the
+        current one (the model releases the GIL during the forward pass).
+        
+        Args:
+            texts: Raw input texts
+            window_size: Number of raw texts per window
+            
+        Yields:
+            List[str]: Cleaned texts of the window (empties dropped)
+        """
+        windows = (texts[start:start + window_size] for start in range(0, len(texts), window_size))
+        
+        if len(texts) <= self.PARALLEL_PREPROCESS_THRESHOLD:
+            for window in windows:
+                yield [cleaned for cleaned in map(self.preprocess_text, window) if cleaned]
+            return
+        
+        max_workers = min(8, os.cpu_count() or 1)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="preprocess"
+        ) as pool:
+            pending = pool.map(self.preprocess_text, next(windows))
+            for window in windows:
+                upcoming = pool.map(self.preprocess_text, window)
+                yield [cleaned for cleaned in pending if cleaned]
+                pending = upcoming
+            yield [cleaned for cleaned in pending if cleaned]
+    
+    def _embed_cleaned_texts(
+        self,
+        cleaned_texts: List[str],
+        normalize: bool,
+        batch_size: int
+    ) -> np.ndarray:
+        """
+        Embed already preprocessed, non-empty texts (cache-aware)
+        
+        Serves cache hits, encodes each unique miss once (length-sorted so
+        batches pad to similar lengths) and returns rows in input order.
+        
+        Args:
+            cleaned_texts: Preprocessed texts
+            normalize: Whether to normalize embedding vectors
+            batch_size: Number of texts per forward pass
+            
+        Returns:
+            np.ndarray: FP32 embeddings of shape (len(cleaned_texts), 384)
+        """
+        embeddings = np.empty((len(cleaned_texts), self.embedding_dim), dtype=np.float32)
+        
+        # Serve cache hits; collect unique misses (text -> row indices)
+        misses: Dict[Tuple[bytes, bool], List[int]] = {}
+        miss_texts: List[str] = []
+        for i, text in enumerate(cleaned_texts):
+            key = self._cache_key(text, normalize)
+            cached = self._cache_get(key)
+            if cached is not None:
+                embeddings[i] = cached
+            elif key in misses:
+                misses[key].append(i)
+            else:
+                misses[key] = [i]
+                miss_texts.append(text)
+        
+        if miss_texts:
+            # Load model (lazy loading)
+            model = self._load_model()
+            
+            # Sort by length so each batch pads to a similar sequence length
+            order = np.argsort([len(text) for text in miss_texts], kind="stable")
+            sorted_texts = [miss_texts[i] for i in order]
+            
+            # Generate embeddings in batches
+            sorted_embeddings = self._encode(
+                model,
+                sorted_texts,
+                normalize_embeddings=normalize,
+                show_progress_bar=len(sorted_texts) > 10,
+                batch_size=batch_size
+            )
+            
+            # Scatter back to the caller's order and fill the cache
+            for (key, rows), embedding in zip(misses.items(), sorted_embeddings[np.argsort(order)]):
+                embeddings[rows] = embedding
+                self._cache_put(key, embedding)
+        
+        logger.debug(f"Embedding cache: {len(cleaned_texts) - len(miss_texts)}/{len(cleaned_texts)} hits")
+        return embeddings
+    
     def generate_batch_embeddings(
         self,
         texts: List[str],
         normalize: bool = True,
-        batch_size: int = 32
-    ) -> List[List[float]]:
+        batch_size: int = 32,
+        precision: EmbeddingPrecision = "float32",
+        return_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         """
         Generate embeddings for multiple texts efficiently
         
@@ -176,9 +661,15 @@ class EmbeddingService:
             texts: List of texts to embed
             normalize: Whether to normalize embedding vectors
             batch_size: Number of texts to process at once
+            precision: Output precision (see quantize_embeddings)
+            return_numpy: Return the float32 (N, 384) np.ndarray instead of
+                boxing every value into a Python list
             
         Returns:
-            List[List[float]]: List of 384-dimensional embedding vectors
+            List[List[float]]: List of 384-dimensional embedding vectors for
+            "float32" (np.ndarray if return_numpy); for other precisions an
+            np.ndarray of shape (N, 384) float16/int16/int8 or (N, 48)
+            packed uint8 bits
             
         Raises:
             ValueError: If texts list is empty
@@ -188,32 +679,40 @@ class EmbeddingService:
             raise ValueError("Texts list cannot be empty")
         
         try:
-            # Preprocess all texts
-            cleaned_texts = [self.preprocess_text(text) for text in texts]
+            # Stream preprocessing in windows so only one window of cleaned
+            # strings is alive at a time; rows go straight into one array
+            window_size = batch_size * self.STREAM_WINDOW_BATCHES
+            embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+            valid_count = 0
             
-            # Filter out empty texts
-            valid_texts = [text for text in cleaned_texts if text]
+            for window in self._iter_preprocessed_windows(texts, window_size):
+                if not window:
+                    continue
+                
+                embeddings[valid_count:valid_count + len(window)] = self._embed_cleaned_texts(
+                    window,
+                    normalize,
+                    batch_size
+                )
+                valid_count += len(window)
             
-            if not valid_texts:
+            if valid_count == 0:
                 raise ValueError("All texts are empty after preprocessing")
             
-            # Load model (lazy loading)
-            model = self._load_model()
+            embeddings = embeddings[:valid_count]
             
-            # Generate embeddings in batches
-            embeddings = model.encode(
-                valid_texts,
-                convert_to_numpy=True,
-                normalize_embeddings=normalize,
-                show_progress_bar=len(valid_texts) > 10,
-                batch_size=batch_size
-            )
+            if precision != "float32":
+                quantized = self.quantize_embeddings(embeddings, precision)
+                logger.info(f"✅ Generated {len(quantized)} {precision} embeddings")
+                return quantized
             
-            # Convert to list of lists
-            embeddings_list = embeddings.tolist()
+            logger.info(f"✅ Generated {len(embeddings)} embeddings")
             
-            logger.info(f"✅ Generated {len(embeddings_list)} embeddings")
-            return embeddings_list
+            if return_numpy:
+                return embeddings
+            
+            # Convert to list of lists
+            return embeddings.tolist()
             
         except ValueError:
             raise
@@ -221,6 +720,229 @@ class EmbeddingService:
             logger.error(f"Error generating batch embeddings: {e}")
             raise RuntimeError(f"Failed to generate batch embeddings: {e}")
     
+    # ===================================
+    # PRE-TOKENIZED CORPUS
+    # ===================================
+    
+    def _tokenize_fixed_length(self, cleaned_text: str) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Tokenize one text padded to CUDA_GRAPH_SEQ_LENGTH tokens
+        
+        Fixed shapes let the output be cached (see _tokenize_cached) and fed
+        directly to the CUDA graph. Over-long texts are truncated the same
+        way the tokenizer does (keeping the closing special token).
+        
+        Args:
+            cleaned_text: Preprocessed text
+            
+        Returns:
+            Tuple: (input_ids, attention_mask, truncated) as read-only int32 arrays
+        """
+        tokenizer = self._load_model().tokenizer
+        seq_length = self.CUDA_GRAPH_SEQ_LENGTH
+        
+        token_ids = tokenizer(cleaned_text, truncation=False)["input_ids"]
+        truncated = len(token_ids) > seq_length
+        if truncated:
+            token_ids = token_ids[:seq_length - 1] + token_ids[-1:]
+        
+        input_ids = np.full(seq_length, tokenizer.pad_token_id, dtype=np.int32)
+        input_ids[:len(token_ids)] = token_ids
+        attention_mask = np.zeros(seq_length, dtype=np.int32)
+        attention_mask[:len(token_ids)] = 1
+        
+        input_ids.setflags(write=False)
+        attention_mask.setflags(write=False)
+        return input_ids, attention_mask, truncated
+    
+    def encode_cached(self, text: str, normalize: bool = True) -> np.ndarray:
+        """
+        Embed a short text reusing cached tokenizer output
+        
+        Intended for short, repetitive inputs (queries, autocompletion):
+        the tokenizer only runs on the first occurrence of a text and the
+        token IDs go straight to the model (or the CUDA graph on GPU).
+        Texts longer than CUDA_GRAPH_SEQ_LENGTH tokens are truncated.
+        
+        Args:
+            text: Input text to embed
+            normalize: Whether to normalize the embedding vector
+            
+        Returns:
+            np.ndarray: FP32 embedding vector
+            
+        Raises:
+            ValueError: If text is empty after preprocessing
+        """
+        cleaned_text = self.preprocess_text(text)
+        if not cleaned_text:
+            raise ValueError("Text is empty after preprocessing")
+        
+        model = self._load_model()
+        embedding = self._encode_with_cuda_graph(model, cleaned_text, normalize)
+        if embedding is not None:
+            return embedding
+        
+        input_ids, attention_mask, _ = self._tokenize_cached(cleaned_text)
+        return self.encode_from_tokens(
+            input_ids[None],
+            attention_mask[None],
+            normalize=normalize
+        )[0]
+    
+    def tokenize_texts(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Tokenize a corpus once so it can be re-encoded without the tokenizer
+        
+        The returned int32 arrays are much smaller than the raw text and can
+        be persisted (e.g. np.savez) for offline indexing or re-encoding.
+        
+        Args:
+            texts: List of texts to tokenize
+            
+        Returns:
+            Dict[str, np.ndarray]: 'input_ids' and 'attention_mask' of shape (N, L)
+            
+        Raises:
+            ValueError: If texts list is empty
+        """
+        if not texts:
+            raise ValueError("Texts list cannot be empty")
+        
+        cleaned_texts = [self.preprocess_text(text) for text in texts]
+        model = self._load_model()
+        
+        tokens = model.tokenizer(
+            cleaned_texts,
+            padding=True,
+            truncation=True,
+            max_length=min(self.max_length, model.max_seq_length),
+            return_tensors="np"
+        )
+        
+        return {
+            "input_ids": tokens["input_ids"].astype(np.int32),
+            "attention_mask": tokens["attention_mask"].astype(np.int32)
+        }
+    
+    def encode_from_tokens(
+        self,
+        input_ids: np.ndarray,
+        attention_mask: np.ndarray,
+        normalize: bool = True,
+        batch_size: int = 32
+    ) -> np.ndarray:
+        """
+        Generate embeddings from pre-tokenized input (see tokenize_texts)
+        
+        Runs the model modules (transformer + pooling) directly, skipping
+        the Python-side tokenizer. Each batch is trimmed to its longest
+        sequence before the forward pass.
+        
+        Args:
+            input_ids: Token IDs of shape (N, L)
+            attention_mask: Attention mask of shape (N, L)
+            normalize: Whether to L2-normalize the embeddings
+            batch_size: Number of sequences per forward pass
+            
+        Returns:
+            np.ndarray: FP32 embeddings of shape (N, 384)
+            
+        Raises:
+            RuntimeError: If the forward pass fails
+        """
+        model = self._load_model()
+        embeddings = np.empty((len(input_ids), self.embedding_dim), dtype=np.float32)
+        
+        try:
+            with torch.inference_mode(), self._autocast():
+                for start in range(0, len(input_ids), batch_size):
+                    mask = np.asarray(attention_mask[start:start + batch_size])
+                    seq_len = max(int(mask.sum(axis=1).max()), 1)
+                    features = {
+                        "input_ids": torch.as_tensor(
+                            np.asarray(input_ids[start:start + batch_size])[:, :seq_len],
+                            dtype=torch.long,
+                            device=self.device
+                        ),
+                        "attention_mask": torch.as_tensor(
+                            mask[:, :seq_len],
+                            dtype=torch.long,
+                            device=self.device
+                        )
+                    }
+                    batch = model(features)["sentence_embedding"]
+                    if normalize:
+                        batch = torch.nn.functional.normalize(batch, p=2, dim=1)
+                    embeddings[start:start + len(mask)] = batch.float().cpu().numpy()
+        except Exception as e:
+            logger.error(f"Error encoding pre-tokenized input: {e}")
+            raise RuntimeError(f"Failed to encode pre-tokenized input: {e}")
+        
+        logger.info(f"✅ Generated {len(embeddings)} embeddings from tokens")
+        return embeddings
+    
+    @staticmethod
+    def quantize_embeddings(
+        embeddings: np.ndarray,
+        precision: EmbeddingPrecision
+    ) -> np.ndarray:
+        """
+        Quantize FP32 embeddings for compact storage and cheaper similarity
+        
+        - float16: IEEE half precision
+        - bfloat16: raw bfloat16 bits stored as int16 (NumPy has no bfloat16)
+        - int8: per-vector absmax scaling to [-127, 127] (cosine is scale
+          invariant, so no calibration data needs to be stored)
+        - ubinary: sign bit per dimension, packed 8 dimensions per byte
+        
+        Args:
+            embeddings: FP32 matrix of shape (N, D)
+            precision: Target precision
+            
+        Returns:
+            np.ndarray: Quantized embeddings
+            
+        Raises:
+            ValueError: If precision is not supported
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        if precision == "float32":
+            return embeddings
+        
+        if precision == "float16":
+            return embeddings.astype(np.float16)
+        
+        if precision == "bfloat16":
+            writable = np.require(embeddings, requirements=["C", "W"])
+            return torch.from_numpy(writable).to(torch.bfloat16).view(torch.int16).numpy()
+        
+        if precision == "int8":
+            absmax = np.max(np.abs(embeddings), axis=-1, keepdims=True)
+            absmax[absmax == 0] = 1.0
+            return np.round(127 * embeddings / absmax).astype(np.int8)
+        
+        if precision == "ubinary":
+            return np.packbits(embeddings > 0, axis=-1)
+        
+        raise ValueError(
+            f"Unsupported precision: {precision}. "
+            f"Expected one of: float32, float16, bfloat16, int8, ubinary"
+        )
+    
+    @staticmethod
+    def _as_float32(embeddings: Union[List[float], np.ndarray]) -> np.ndarray:
+        """
+        Upcast float16 / bfloat16-bit (int16) embeddings to FP32
+        
+        Similarity is always accumulated in FP32 to avoid precision loss.
+        """
+        embeddings = np.asarray(embeddings)
+        if embeddings.dtype == np.int16:
+            return torch.from_numpy(np.ascontiguousarray(embeddings)).view(torch.bfloat16).float().numpy()
+        return embeddings.astype(np.float32, copy=False)
+    
     def calculate_similarity(
         self,
         embedding1: Union[List[float], np.ndarray],
@@ -229,6 +951,11 @@ class EmbeddingService:
         """
         Calculate cosine similarity between two embeddings
         
+        Quantized inputs are dispatched on dtype: int8 vectors use an
+        integer dot product, packed uint8 (ubinary) vectors use the
+        Hamming distance over the unpacked bits. float16 and bfloat16
+        inputs are upcast to FP32 before accumulating.
+        
         Args:
             embedding1: First embedding vector
             embedding2: Second embedding vector
@@ -238,8 +965,33 @@ class EmbeddingService:
         """
         try:
             # Convert to numpy arrays
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
+            vec1 = np.asarray(embedding1)
+            vec2 = np.asarray(embedding2)
+            
+            # The JIT kernel does not bounds-check: mismatched vectors must
+            # fail here (as np.dot did) instead of reading past the shorter one
+            if vec1.shape != vec2.shape:
+                raise ValueError(f"Embedding shapes differ: {vec1.shape} vs {vec2.shape}")
+            
+            if vec1.dtype == np.uint8 and vec2.dtype == np.uint8:
+                # Binary: 1 - normalized Hamming distance
+                differing_bits = np.unpackbits(np.bitwise_xor(vec1, vec2)).sum()
+                return float(1.0 - differing_bits / (vec1.size * 8))
+            
+            if vec1.dtype == np.int8 and vec2.dtype == np.int8:
+                # int8: accumulate in int32 to avoid overflow
+                vec1 = vec1.astype(np.int32)
+                vec2 = vec2.astype(np.int32)
+            else:
+                vec1 = self._as_float32(vec1)
+                vec2 = self._as_float32(vec2)
+            
+            if vec1.dtype == np.float32 and _cosine_similarity_kernel is not None:
+                # FP32: fused JIT kernel (signature is compiled eagerly at import)
+                return float(_cosine_similarity_kernel(
+                    np.ascontiguousarray(vec1, dtype=np.float32),
+                    np.ascontiguousarray(vec2, dtype=np.float32)
+                ))
             
             # Calculate cosine similarity
             # similarity = 1 - cosine_distance
@@ -251,6 +1003,70 @@ class EmbeddingService:
             logger.error(f"Error calculating similarity: {e}")
             return 0.0
     
+    def calculate_similarity_one_to_many(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        corpus_embeddings: Union[List[List[float]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Calculate cosine similarity of one query against many embeddings
+        
+        Precondition: corpus rows are already unit-normalized (true for
+        generate_batch_embeddings with normalize=True), so only the query
+        is normalized and the whole computation is one matrix-vector product.
+        
+        Args:
+            query_embedding: Query vector of shape (D,)
+            corpus_embeddings: Unit-normalized matrix of shape (N, D)
+            
+        Returns:
+            np.ndarray: Similarity scores of shape (N,)
+        """
+        query = np.array(self._as_float32(query_embedding), dtype=np.float32)
+        corpus = np.atleast_2d(self._as_float32(corpus_embeddings))
+        
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query /= norm
+        
+        return corpus @ query
+    
+    def calculate_similarity_matrix(
+        self,
+        embeddings_a: Union[List[List[float]], np.ndarray],
+        embeddings_b: Union[List[List[float]], np.ndarray],
+        assume_normalized: bool = False,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Calculate all pairwise cosine similarities between two sets of embeddings
+        
+        Computes the full M x N matrix with one FP32 matrix product (sgemm)
+        instead of M * N calls to calculate_similarity.
+        
+        Args:
+            embeddings_a: Matrix of shape (M, D)
+            embeddings_b: Matrix of shape (N, D)
+            assume_normalized: Skip L2 normalization (embeddings generated
+                with normalize=True are already unit length)
+            out: Optional preallocated float32 array of shape (M, N)
+            
+        Returns:
+            np.ndarray: Similarity matrix of shape (M, N)
+        """
+        matrix_a = np.atleast_2d(self._as_float32(embeddings_a))
+        matrix_b = np.atleast_2d(self._as_float32(embeddings_b))
+        
+        if not assume_normalized:
+            norms_a = np.linalg.norm(matrix_a, axis=1, keepdims=True)
+            norms_b = np.linalg.norm(matrix_b, axis=1, keepdims=True)
+            norms_a[norms_a == 0] = 1.0
+            norms_b[norms_b == 0] = 1.0
+            matrix_a = matrix_a / norms_a
+            matrix_b = matrix_b / norms_b
+        
+        return np.matmul(matrix_a, matrix_b.T, out=out)
+    
     def get_model_info(self) -> Dict:
         """
         Get information about the embedding model
@@ -262,8 +1078,11 @@ class EmbeddingService:
             "model_name": self.model_name,
             "embedding_dimension": self.embedding_dim,
             "max_sequence_length": self.max_length,
+            "model_fingerprint": self.model_fingerprint,
             "device": self.device,
+            "dtype": str(self.dtype).replace("torch.", ""),
             "model_loaded": EmbeddingService._model_loaded,
+            "cached_embeddings": len(self._embedding_cache),
             "supported_languages": [
                 "en", "es", "ru", "de", "fr", "it", "pt", "nl", "pl", "tr",
                 "ar", "zh", "ja", "ko", "th", "hi"
@@ -275,6 +1094,18 @@ class EmbeddingService:
         """Check if model is loaded in memory"""
         return EmbeddingService._model_loaded
     
+    def warmup(self) -> None:
+        """
+        Load the model and run one dummy inference
+        
+        Intended for application startup so the first request does not pay
+        model loading and first-call compilation/graph capture. The dummy
+        text bypasses the embedding cache.
+        """
+        model = self._load_model()
+        self._encode(model, ["warmup"], normalize_embeddings=True, show_progress_bar=False)
+        logger.info(f"🔥 Embedding model warmed up on {self.device}")
+    
     def unload_model(self):
         """
         Unload model from memory (useful for testing or cleanup)
@@ -285,16 +1116,28 @@ class EmbeddingService:
             logger.info("Unloading embedding model from memory")
             EmbeddingService._model_instance = None
             EmbeddingService._model_loaded = False
+            EmbeddingService._cuda_graph = None
             
             # Clear GPU cache if using CUDA
             if self.device == "cuda":
                 torch.cuda.empty_cache()
     
+    def close(self):
+        """Shut down the inference thread pool"""
+        self._executor.shutdown(wait=False)
+    
+    def __del__(self):
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+    
     async def generate_embedding_async(
         self,
         text: str,
-        normalize: bool = True
-    ) -> List[float]:
+        normalize: bool = True,
+        return_numpy: bool = False,
+        precision: EmbeddingPrecision = "float32"
+    ) -> Union[List[float], np.ndarray]:
         """
         Async wrapper for generate_embedding
         Useful for FastAPI async endpoints
@@ -302,26 +1145,93 @@ class EmbeddingService:
         Args:
             text: Input text to embed
             normalize: Whether to normalize the embedding vector
+            return_numpy: Return a float32 np.ndarray instead of a list
+            precision: Output precision (see quantize_embeddings)
             
         Returns:
             List[float]: 384-dimensional embedding vector
         """
-        # Run in thread pool to avoid blocking
-        import asyncio
-        loop = asyncio.get_event_loop()
+        # Run in the dedicated inference thread to avoid blocking
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            None,
+            self._executor,
             self.generate_embedding,
             text,
-            normalize
+            normalize,
+            return_numpy,
+            precision
         )
     
+    async def encode_async(self, text: str) -> np.ndarray:
+        """
+        Embed one text, batched with other concurrent encode_async calls
+        
+        Requests arriving within MICRO_BATCH_WAIT_MS of each other (up to
+        MICRO_BATCH_SIZE) share a single normalized forward pass.
+        
+        Args:
+            text: Input text to embed
+            
+        Returns:
+            np.ndarray: 384-dimensional float32 embedding vector
+            
+        Raises:
+            ValueError: If text is empty or invalid
+            RuntimeError: If model fails to generate embedding
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        if self._micro_batch_worker is None or self._micro_batch_worker.done():
+            self._micro_batch_queue = asyncio.Queue()
+            self._micro_batch_worker = asyncio.create_task(self._run_micro_batches())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._micro_batch_queue.put((text, future))
+        return await future
+    
+    async def _run_micro_batches(self) -> None:
+        """Collects queued texts and embeds them one batch at a time"""
+        loop = asyncio.get_running_loop()
+        max_wait = self.MICRO_BATCH_WAIT_MS / 1000
+        while True:
+            batch = [await self._micro_batch_queue.get()]
+            deadline = loop.time() + max_wait
+            
+            while len(batch) < self.MICRO_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._micro_batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                embeddings = await self.generate_batch_embeddings_async(
+                    [text for text, _ in batch],
+                    batch_size=self.MICRO_BATCH_SIZE,
+                    return_numpy=True
+                )
+            except Exception as e:
+                logger.error(f"Error generating micro-batch embeddings: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError(f"Failed to generate embedding: {e}"))
+                continue
+            
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+    
     async def generate_batch_embeddings_async(
         self,
         texts: List[str],
         normalize: bool = True,
-        batch_size: int = 32
-    ) -> List[List[float]]:
+        batch_size: int = 32,
+        precision: EmbeddingPrecision = "float32",
+        return_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         """
         Async wrapper for generate_batch_embeddings
         
@@ -329,19 +1239,22 @@ class EmbeddingService:
             texts: List of texts to embed
             normalize: Whether to normalize embedding vectors
             batch_size: Number of texts to process at once
+            precision: Output precision (see quantize_embeddings)
+            return_numpy: Return the float32 np.ndarray instead of lists
             
         Returns:
             List[List[float]]: List of embedding vectors
         """
-        # Run in thread pool to avoid blocking
-        import asyncio
-        loop = asyncio.get_event_loop()
+        # Run in the dedicated inference thread to avoid blocking
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            None,
+            self._executor,
             self.generate_batch_embeddings,
             texts,
             normalize,
-            batch_size
+            batch_size,
+            precision,
+            return_numpy
         )
 
 
@@ -350,6 +1263,7 @@ class EmbeddingService:
 # ===================================
 
 _embedding_service_instance: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
 
 def get_embedding_service() -> EmbeddingService:
     """
@@ -361,7 +1275,9 @@ def get_embedding_service() -> EmbeddingService:
     global _embedding_service_instance
     
     if _embedding_service_instance is None:
-        _embedding_service_instance = EmbeddingService()
+        with _embedding_service_lock:
+            if _embedding_service_instance is None:
+                _embedding_service_instance = EmbeddingService()
     
     return _embedding_service_instance
 
@@ -7,26 +7,123 @@ This service automatically:
 3. Saves them to PostgreSQL database
 4. Updates document metadata
 """
+import io
+import re
+import csv
+import asyncio
 import hashlib
+import threading
+import weakref
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+import numpy as np
 from loguru import logger
 import psycopg2
 from psycopg2.extras import execute_values
+from pgvector.utils import from_db, to_db
 
-from database.db_connection import connect, disconnect
+from database.db_connection import get_conn
 from services.RAG.embedding_service import get_embedding_service
 from services.RAG.document_processor import get_document_processor
 
 
+# MinHash configuration for near-duplicate detection
+MINHASH_PERMUTATIONS = 128
+MINHASH_SHINGLE_SIZE = 5
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_minhash_rng = np.random.RandomState(1)
+_MINHASH_A = _minhash_rng.randint(1, (1 << 61) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _minhash_rng.randint(0, (1 << 61) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_WORD_RE = re.compile(r"\w+")
+
+
+def compute_minhash(text: str) -> np.ndarray:
+    """
+    Computes a MinHash signature over word shingles of a text
+    
+    Args:
+        text: Document text
+        
+    Returns:
+        np.ndarray: uint32 signature of MINHASH_PERMUTATIONS values
+    """
+    words = _WORD_RE.findall(text.lower())
+    shingles = {
+        " ".join(words[i:i + MINHASH_SHINGLE_SIZE])
+        for i in range(max(len(words) - MINHASH_SHINGLE_SIZE + 1, 1))
+    }
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), "little")
+         for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    
+    # (a * h + b) mod p for every shingle/permutation pair, minimum per permutation
+    with np.errstate(over="ignore"):
+        permuted = (hashes[:, None] * _MINHASH_A + _MINHASH_B) % _MERSENNE_PRIME
+    return (permuted & _MAX_HASH).min(axis=0).astype(np.uint32)
+
+
 class RAGIntegrationService:
     """Service for integrating RAG with document upload system"""
     
+    # Columns written for every document (order used by the COPY batch path)
+    EMBEDDING_COLUMNS = (
+        "user_id", "document_id", "filename", "original_filename", "document_type",
+        "is_primary_cv", "content_text", "content_embedding", "file_size", "mime_type",
+        "file_hash", "is_active", "processing_status", "description",
+        "embedding_model_id", "text_length", "content_minhash"
+    )
+    
+    # Server-side prepared upsert used by _save_to_database (PREPAREd once
+    # per pooled connection, then only EXECUTEd)
+    UPSERT_STATEMENT_NAME = "rag_upsert_document"
+    UPSERT_STATEMENT_SQL = """
+    INSERT INTO document_embeddings (
+        user_id, document_id, filename, original_filename, document_type,
+        is_primary_cv, content_text, content_embedding, file_size, mime_type,
+        file_hash, is_active, processing_status, description,
+        embedding_model_id, text_length, content_minhash
+    ) VALUES (
+        $1, $2, $3, $4, $5,
+        $6, $7, $8::vector, $9, $10,
+        $11, $12, $13, $14,
+        $15, $16, $17
+    )
+    ON CONFLICT (user_id, document_id) 
+    DO UPDATE SET
+        filename = EXCLUDED.filename,
+        original_filename = EXCLUDED.original_filename,
+        document_type = EXCLUDED.document_type,
+        is_primary_cv = EXCLUDED.is_primary_cv,
+        content_text = EXCLUDED.content_text,
+        content_embedding = EXCLUDED.content_embedding,
+        file_size = EXCLUDED.file_size,
+        mime_type = EXCLUDED.mime_type,
+        file_hash = EXCLUDED.file_hash,
+        is_active = EXCLUDED.is_active,
+        processing_status = EXCLUDED.processing_status,
+        description = EXCLUDED.description,
+        embedding_model_id = EXCLUDED.embedding_model_id,
+        text_length = EXCLUDED.text_length,
+        content_minhash = EXCLUDED.content_minhash,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING id
+    """
+    _prepared_connections = weakref.WeakSet()
+    _prepared_lock = threading.Lock()
+    
+    # save_batch_to_database uses COPY above this many rows, execute_values below
+    COPY_BATCH_THRESHOLD = 10_000
+    
+    # Estimated Jaccard similarity above which a document of the same user
+    # is treated as a near-duplicate and its embedding is reused
+    NEAR_DUPLICATE_THRESHOLD = 0.9
+    
     def __init__(self):
         self.embedding_service = get_embedding_service()
         self.document_processor = get_document_processor()
-        self.conn = None
-        self.cursor = None
         logger.info("✅ RAGIntegrationService initialized")
     
     async def process_uploaded_document(
@@ -67,25 +164,23 @@ class RAGIntegrationService:
         try:
             logger.info(f"🔄 Starting RAG document processing: {original_filename} for user_id={user_id}")
             
-            # 1. Text extraction
-            logger.info(f"📄 Extracting text from {file_path}")
-            content_text = self.document_processor.extract_text(file_path)
-            
-            if not content_text or len(content_text.strip()) < 50:
-                logger.warning(f"⚠️ Document contains too little text: {len(content_text)} characters")
-                return {
-                    "success": False,
-                    "error": "Document contains insufficient text for analysis",
-                    "text_length": len(content_text)
-                }
+            # 1-3. Text extraction, file hash and stored-embedding reuse
+            prepared = await self._prepare_document(user_id, file_path)
+            if not prepared["success"]:
+                return prepared
             
-            logger.info(f"✅ Extracted {len(content_text)} characters of text")
+            content_text = prepared["content_text"]
+            file_hash = prepared["file_hash"]
+            content_minhash = prepared["content_minhash"]
+            embedding = prepared["embedding"]
             
-            # 2. Embedding generation
-            logger.info("🧮 Generating vector representation...")
-            embedding = self.embedding_service.generate_embedding(content_text)
+            if embedding is None:
+                logger.info("🧮 Generating vector representation...")
+                embedding = await self.embedding_service.generate_embedding_async(
+                    content_text, return_numpy=True
+                )
             
-            if not embedding:
+            if embedding is None:
                 logger.error("❌ Failed to generate embedding")
                 return {
                     "success": False,
@@ -94,9 +189,6 @@ class RAGIntegrationService:
             
             logger.info(f"✅ Generated vector of dimension {len(embedding)}")
             
-            # 3. Calculate file hash
-            file_hash = self._calculate_file_hash(file_path)
-            
             # 4. Determine if this is primary CV
             is_primary_cv = (document_type.lower() == 'cv')
             
@@ -114,7 +206,8 @@ class RAGIntegrationService:
                 mime_type=mime_type,
                 file_hash=file_hash,
                 is_primary_cv=is_primary_cv,
-                description=description
+                description=description,
+                content_minhash=content_minhash
             )
             
             if not db_result["success"]:
@@ -125,6 +218,7 @@ class RAGIntegrationService:
             return {
                 "success": True,
                 "document_id": document_id,
+                "database_id": db_result["database_id"],
                 "text_length": len(content_text),
                 "embedding_dimension": len(embedding),
                 "is_primary_cv": is_primary_cv,
@@ -139,6 +233,194 @@ class RAGIntegrationService:
                 "error": f"Processing error: {str(e)}"
             }
     
+    async def _prepare_document(self, user_id: int, file_path: Path) -> Dict:
+        """
+        Runs the per-document steps shared by the single and batch upload paths
+        
+        A cheap text preview rejects documents without enough text before full
+        extraction; the file hash and MinHash signature are then computed
+        concurrently and used to reuse a stored embedding (same file, or a
+        near-duplicate of one of the user's documents).
+        
+        Args:
+            user_id: User ID
+            file_path: File path
+            
+        Returns:
+            Dict: Failure result, or success with content_text, file_hash
+                (None if the file could not be hashed), content_minhash and
+                embedding (None if it must be generated)
+        """
+        try:
+            preview = await asyncio.to_thread(self.document_processor.extract_text_preview, file_path)
+        except Exception as e:
+            logger.debug(f"Text preview unavailable, using full extraction: {e}")
+            preview = None
+        
+        if preview is not None and len(preview) < 50:
+            logger.warning(f"⚠️ Document contains too little text: {len(preview)} characters")
+            return {
+                "success": False,
+                "error": "Document contains insufficient text for analysis",
+                "text_length": len(preview)
+            }
+        
+        logger.info(f"📄 Extracting text from {file_path}")
+        content_text = await asyncio.to_thread(self.document_processor.extract_text, file_path)
+        
+        if not content_text or len(content_text.strip()) < 50:
+            logger.warning(f"⚠️ Document contains too little text: {len(content_text)} characters")
+            return {
+                "success": False,
+                "error": "Document contains insufficient text for analysis",
+                "text_length": len(content_text)
+            }
+        
+        logger.info(f"✅ Extracted {len(content_text)} characters of text")
+        
+        file_hash, content_minhash = await asyncio.gather(
+            asyncio.to_thread(self._calculate_file_hash, file_path),
+            asyncio.to_thread(compute_minhash, content_text)
+        )
+        
+        # An unreadable file has no hash: skip the cache rather than match other
+        # hashless rows, and store NULL
+        file_hash = file_hash or None
+        embedding = None
+        if file_hash:
+            embedding = await asyncio.to_thread(self._find_cached_embedding, file_hash)
+        
+        if embedding is not None:
+            logger.info(f"♻️ Reusing stored embedding for file_hash={file_hash[:12]}")
+        else:
+            embedding = await asyncio.to_thread(
+                self._find_near_duplicate_embedding, user_id, content_minhash
+            )
+        
+        return {
+            "success": True,
+            "content_text": content_text,
+            "file_hash": file_hash,
+            "content_minhash": content_minhash,
+            "embedding": embedding
+        }
+    
+    async def process_uploaded_documents_batch(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Processes several uploaded documents with one embedding call and one insert
+        
+        Every document goes through _prepare_document concurrently (preview
+        check, extraction, hash-cache and near-duplicate reuse); only the ones
+        without a reusable embedding are embedded, together, with
+        generate_batch_embeddings and all rows are written with
+        save_batch_to_database.
+        
+        Args:
+            documents: Dicts with the keyword arguments of process_uploaded_document
+            
+        Returns:
+            List[Dict]: One processing result per input document, in input order
+        """
+        results: List[Optional[Dict]] = [None] * len(documents)
+        pending = []
+        
+        # 1. Text extraction, file hash and stored-embedding reuse
+        prepared_documents = await asyncio.gather(
+            *(self._prepare_document(doc["user_id"], doc["file_path"]) for doc in documents),
+            return_exceptions=True
+        )
+        
+        for index, (doc, prepared) in enumerate(zip(documents, prepared_documents)):
+            if isinstance(prepared, Exception):
+                logger.error(f"❌ Error processing document {doc.get('original_filename')}: {str(prepared)}")
+                results[index] = {
+                    "success": False,
+                    "error": f"Processing error: {str(prepared)}"
+                }
+            elif not prepared["success"]:
+                results[index] = prepared
+            else:
+                pending.append((index, doc, prepared))
+        
+        if not pending:
+            return results
+        
+        try:
+            # 2. Embedding generation (single call for the documents without a reusable one)
+            missing = [prepared for _, _, prepared in pending if prepared["embedding"] is None]
+            if missing:
+                logger.info(f"🧮 Generating vector representations for {len(missing)} documents...")
+                embeddings = await self.embedding_service.generate_batch_embeddings_async(
+                    [prepared["content_text"] for prepared in missing],
+                    return_numpy=True
+                )
+                for prepared, embedding in zip(missing, embeddings):
+                    prepared["embedding"] = embedding
+        except Exception as e:
+            logger.error(f"❌ Error processing document batch: {str(e)}")
+            for index, _, _ in pending:
+                results[index] = {
+                    "success": False,
+                    "error": f"Processing error: {str(e)}"
+                }
+            return results
+        
+        # 3. Build rows
+        records = [
+            {
+                "user_id": doc["user_id"],
+                "document_id": doc["document_id"],
+                "filename": doc["filename"],
+                "original_filename": doc["original_filename"],
+                "document_type": doc["document_type"],
+                "content_text": prepared["content_text"],
+                "content_embedding": prepared["embedding"],
+                "file_size": doc.get("file_size"),
+                "mime_type": doc.get("mime_type"),
+                "file_hash": prepared["file_hash"],
+                "content_minhash": prepared["content_minhash"],
+                "is_primary_cv": doc["document_type"].lower() == 'cv',
+                "description": doc.get("description")
+            }
+            for _, doc, prepared in pending
+        ]
+        
+        # 4. Save to database. The batch shares one transaction, so if it fails
+        # each document is retried on its own and only the bad ones fail
+        db_result = await self.save_batch_to_database(records)
+        if db_result["success"]:
+            save_results = [
+                {
+                    "success": True,
+                    "database_id": db_result["database_ids"][(record["user_id"], record["document_id"])]
+                }
+                for record in records
+            ]
+        else:
+            logger.warning(f"⚠️ Batch save failed, saving {len(records)} documents one by one")
+            save_results = await asyncio.gather(
+                *(self._save_to_database(**record) for record in records)
+            )
+        
+        for (index, doc, prepared), record, save_result in zip(pending, records, save_results):
+            if not save_result["success"]:
+                results[index] = save_result
+                continue
+            
+            results[index] = {
+                "success": True,
+                "document_id": doc["document_id"],
+                "database_id": save_result["database_id"],
+                "text_length": len(prepared["content_text"]),
+                "embedding_dimension": len(record["content_embedding"]),
+                "is_primary_cv": record["is_primary_cv"],
+                "file_hash": record["file_hash"],
+                "message": "Document successfully processed for RAG system"
+            }
+        
+        logger.info(f"✅ Processed batch of {len(documents)} documents for RAG system")
+        return results
+    
     async def _save_to_database(
         self,
         user_id: int,
@@ -147,12 +429,13 @@ class RAGIntegrationService:
         original_filename: str,
         document_type: str,
         content_text: str,
-        content_embedding: List[float],
+        content_embedding: np.ndarray,
         file_size: Optional[int],
         mime_type: Optional[str],
-        file_hash: str,
+        file_hash: Optional[str],
         is_primary_cv: bool,
-        description: Optional[str]
+        description: Optional[str],
+        content_minhash: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Saves document and its embedding to database
@@ -161,51 +444,19 @@ class RAGIntegrationService:
             Dict: Save result
         """
         try:
-            # Database connection
-            self.conn = connect()
-            self.cursor = self.conn.cursor()
-            
-            # SQL query for insert/update
-            insert_query = """
-            INSERT INTO document_embeddings (
-                user_id, document_id, filename, original_filename, document_type,
-                is_primary_cv, content_text, content_embedding, file_size, mime_type,
-                file_hash, is_active, processing_status, description
-            ) VALUES (
-                %s, %s, %s, %s, %s,
-                %s, %s, %s::vector, %s, %s,
-                %s, %s, %s, %s
-            )
-            ON CONFLICT (user_id, document_id) 
-            DO UPDATE SET
-                filename = EXCLUDED.filename,
-                original_filename = EXCLUDED.original_filename,
-                document_type = EXCLUDED.document_type,
-                is_primary_cv = EXCLUDED.is_primary_cv,
-                content_text = EXCLUDED.content_text,
-                content_embedding = EXCLUDED.content_embedding,
-                file_size = EXCLUDED.file_size,
-                mime_type = EXCLUDED.mime_type,
-                file_hash = EXCLUDED.file_hash,
-                is_active = EXCLUDED.is_active,
-                processing_status = EXCLUDED.processing_status,
-                description = EXCLUDED.description,
-                updated_at = CURRENT_TIMESTAMP
-            RETURNING id;
-            """
-            
-            # Format embedding for PostgreSQL
-            embedding_str = '[' + ','.join(map(str, content_embedding)) + ']'
+            # Bound as float32 numpy array through the pgvector adapter
+            embedding_vector = np.asarray(content_embedding, dtype=np.float32)
             
-            # Execute query
-            self.cursor.execute(insert_query, (
+            # Execute prepared upsert on a pooled connection (off the event loop)
+            row = await asyncio.to_thread(self._execute_prepared_upsert, (
                 user_id, document_id, filename, original_filename, document_type,
-                is_primary_cv, content_text, embedding_str, file_size, mime_type,
-                file_hash, True, 'processed', description
+                is_primary_cv, content_text, embedding_vector, file_size, mime_type,
+                file_hash, True, 'processed', description,
+                self.embedding_service.model_fingerprint, len(content_text),
+                psycopg2.Binary(content_minhash.tobytes()) if content_minhash is not None else None
             ))
             
-            row_id = self.cursor.fetchone()[0]
-            self.conn.commit()
+            row_id = row[0]
             
             logger.info(f"✅ Document saved to DB with ID={row_id}")
             
@@ -221,18 +472,343 @@ class RAGIntegrationService:
             }
             
         except Exception as e:
-            if self.conn:
-                self.conn.rollback()
             logger.error(f"❌ Error saving to DB: {str(e)}")
             return {
                 "success": False,
                 "error": f"Database save error: {str(e)}"
             }
-        finally:
-            if self.cursor:
-                self.cursor.close()
-            if self.conn:
-                disconnect(self.conn)
+    
+    async def save_batch_to_database(self, records: List[Dict]) -> Dict:
+        """
+        Saves many documents and their embeddings in one round-trip
+        
+        Large batches are streamed with COPY into a temporary staging table;
+        smaller ones use a multi-row execute_values INSERT. Both upsert with
+        the same ON CONFLICT (user_id, document_id) semantics as
+        _save_to_database.
+        
+        Args:
+            records: Dicts with the keyword arguments of _save_to_database
+                (content_embedding as a float32 np.ndarray)
+            
+        Returns:
+            Dict: Save result with the number of rows written and the row id
+                of each document (database_ids, keyed by (user_id, document_id))
+        """
+        if not records:
+            return {
+                "success": True,
+                "saved_count": 0,
+                "database_ids": {},
+                "message": "No documents to save"
+            }
+        
+        # Last record wins for duplicated (user_id, document_id) keys, since a
+        # single INSERT cannot update the same row twice
+        unique_records = {
+            (record["user_id"], record["document_id"]): record
+            for record in records
+        }
+        
+        try:
+            # Rows in EMBEDDING_COLUMNS order
+            rows = [
+                (
+                    record["user_id"], record["document_id"], record["filename"],
+                    record["original_filename"], record["document_type"],
+                    record["is_primary_cv"], record["content_text"],
+                    np.asarray(record["content_embedding"], dtype=np.float32),
+                    record.get("file_size"), record.get("mime_type"),
+                    record["file_hash"], True, 'processed', record.get("description"),
+                    self.embedding_service.model_fingerprint, len(record["content_text"]),
+                    record["content_minhash"].tobytes()
+                    if record.get("content_minhash") is not None else None
+                )
+                for record in unique_records.values()
+            ]
+            
+            if len(rows) > self.COPY_BATCH_THRESHOLD:
+                saved_rows = await asyncio.to_thread(self._copy_upsert, rows)
+            else:
+                saved_rows = await asyncio.to_thread(self._values_upsert, rows)
+            
+            logger.info(f"✅ Batch saved {len(saved_rows)} documents to DB")
+            
+            return {
+                "success": True,
+                "saved_count": len(saved_rows),
+                "database_ids": {
+                    (user_id, document_id): row_id
+                    for user_id, document_id, row_id in saved_rows
+                },
+                "message": "Documents saved to database"
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Error batch saving to DB: {str(e)}")
+            return {
+                "success": False,
+                "error": f"Database batch save error: {str(e)}"
+            }
+    
+    def _upsert_clauses(self) -> Tuple[str, str]:
+        """
+        Builds the column list and ON CONFLICT update list for batch upserts
+        
+        Returns:
+            Tuple[str, str]: (columns, update assignments)
+        """
+        columns = ", ".join(self.EMBEDDING_COLUMNS)
+        update_columns = ",\n                ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in self.EMBEDDING_COLUMNS
+            if column not in ("user_id", "document_id")
+        )
+        return columns, update_columns
+    
+    def _copy_upsert(self, rows: List[tuple]) -> List[tuple]:
+        """
+        Streams rows into a staging table with COPY and upserts them (blocking)
+        
+        Args:
+            rows: Row tuples in EMBEDDING_COLUMNS order
+            
+        Returns:
+            List[tuple]: (user_id, document_id, id) of every row inserted or updated
+        """
+        columns, update_columns = self._upsert_clauses()
+        embedding_index = self.EMBEDDING_COLUMNS.index("content_embedding")
+        minhash_index = self.EMBEDDING_COLUMNS.index("content_minhash")
+        
+        # Build CSV payload (CSV quoting handles tabs/newlines in content_text)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            row = list(row)
+            row[embedding_index] = to_db(row[embedding_index])
+            if row[minhash_index] is not None:
+                row[minhash_index] = "\\x" + row[minhash_index].hex()
+            writer.writerow(row)
+        buffer.seek(0)
+        
+        with get_conn() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TEMP TABLE document_embeddings_staging
+            (LIKE document_embeddings INCLUDING DEFAULTS)
+            ON COMMIT DROP;
+            """)
+            
+            cursor.copy_expert(
+                f"COPY document_embeddings_staging ({columns}) FROM STDIN WITH (FORMAT CSV)",
+                buffer
+            )
+            
+            cursor.execute(f"""
+            INSERT INTO document_embeddings ({columns})
+            SELECT {columns} FROM document_embeddings_staging
+            ON CONFLICT (user_id, document_id)
+            DO UPDATE SET
+                {update_columns},
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING user_id, document_id, id;
+            """)
+            
+            saved_rows = cursor.fetchall()
+            conn.commit()
+        
+        return saved_rows
+    
+    def _values_upsert(self, rows: List[tuple]) -> List[tuple]:
+        """
+        Upserts rows with multi-row INSERT statements via execute_values (blocking)
+        
+        Args:
+            rows: Row tuples in EMBEDDING_COLUMNS order
+            
+        Returns:
+            List[tuple]: (user_id, document_id, id) of every row inserted or updated
+        """
+        columns, update_columns = self._upsert_clauses()
+        template = "(" + ", ".join(
+            "%s::vector" if column == "content_embedding" else "%s"
+            for column in self.EMBEDDING_COLUMNS
+        ) + ")"
+        minhash_index = self.EMBEDDING_COLUMNS.index("content_minhash")
+        rows = [
+            row[:minhash_index] + (psycopg2.Binary(row[minhash_index]) if row[minhash_index] is not None else None,)
+            + row[minhash_index + 1:]
+            for row in rows
+        ]
+        
+        with get_conn() as conn, conn.cursor() as cursor:
+            # fetch=True collects the RETURNING rows of every page
+            saved_rows = execute_values(
+                cursor,
+                f"""
+                INSERT INTO document_embeddings ({columns})
+                VALUES %s
+                ON CONFLICT (user_id, document_id)
+                DO UPDATE SET
+                    {update_columns},
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING user_id, document_id, id;
+                """,
+                rows,
+                template=template,
+                page_size=500,
+                fetch=True
+            )
+            conn.commit()
+        
+        return saved_rows
+    
+    def _execute_prepared_upsert(self, params: tuple) -> tuple:
+        """
+        Runs the document upsert as a server-side prepared statement (blocking)
+        
+        The statement is PREPAREd the first time each pooled connection is
+        used, so later calls skip parsing and planning.
+        
+        Args:
+            params: Values in UPSERT_STATEMENT_SQL parameter order
+            
+        Returns:
+            tuple: RETURNING row (id)
+        """
+        with get_conn() as conn, conn.cursor() as cursor:
+            with self._prepared_lock:
+                needs_prepare = conn not in self._prepared_connections
+            
+            if needs_prepare:
+                # A statement prepared in a failed earlier call may still exist
+                cursor.execute(
+                    "SELECT 1 FROM pg_prepared_statements WHERE name = %s",
+                    (self.UPSERT_STATEMENT_NAME,)
+                )
+                if cursor.fetchone() is None:
+                    cursor.execute(
+                        f"PREPARE {self.UPSERT_STATEMENT_NAME} AS {self.UPSERT_STATEMENT_SQL}"
+                    )
+            
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {self.UPSERT_STATEMENT_NAME} ({placeholders})", params)
+            row = cursor.fetchone()
+            conn.commit()
+            
+            if needs_prepare:
+                with self._prepared_lock:
+                    self._prepared_connections.add(conn)
+        return row
+    
+    @staticmethod
+    def _run_query(query: str, params: tuple, commit: bool = False) -> Optional[tuple]:
+        """
+        Runs one statement on a pooled connection (blocking)
+        
+        Called through asyncio.to_thread so psycopg2 never blocks the event loop.
+        
+        Args:
+            query: SQL statement
+            params: Query parameters
+            commit: Commit the transaction after executing
+            
+        Returns:
+            Optional[tuple]: First result row, or None
+        """
+        with get_conn() as conn, conn.cursor() as cursor:
+            cursor.execute(query, params)
+            row = cursor.fetchone() if cursor.description else None
+            if commit:
+                conn.commit()
+        return row
+    
+    def _find_cached_embedding(self, file_hash: str) -> Optional[np.ndarray]:
+        """
+        Looks up an embedding already stored for the same file contents
+        
+        Only rows produced by the current embedding model (same
+        embedding_model_id fingerprint) are reused.
+        
+        Args:
+            file_hash: SHA-256 hash of the file
+            
+        Returns:
+            Optional[np.ndarray]: Stored float32 embedding, or None if not found
+        """
+        try:
+            row = self._run_query("""
+            SELECT content_embedding
+            FROM document_embeddings
+            WHERE file_hash = %s
+              AND embedding_model_id = %s
+              AND content_embedding IS NOT NULL
+            LIMIT 1;
+            """, (file_hash, self.embedding_service.model_fingerprint))
+            
+            if not row:
+                return None
+            
+            # Already a numpy array when the pgvector type is registered
+            return np.asarray(from_db(row[0]), dtype=np.float32)
+            
+        except Exception as e:
+            # Cache lookup is best-effort; fall back to generating the embedding
+            logger.warning(f"⚠️ Embedding cache lookup failed: {str(e)}")
+            return None
+    
+    def _find_near_duplicate_embedding(
+        self,
+        user_id: int,
+        content_minhash: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """
+        Looks up the embedding of a near-duplicate document of the same user
+        
+        The MinHash signature is compared against the stored signatures of
+        the user's active documents (a handful per user, so no LSH index is
+        needed); the best match above NEAR_DUPLICATE_THRESHOLD is reused.
+        
+        Args:
+            user_id: User ID
+            content_minhash: MinHash signature of the new document
+            
+        Returns:
+            Optional[np.ndarray]: Float32 embedding of the near-duplicate, or None
+        """
+        try:
+            with get_conn() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                SELECT content_minhash, content_embedding
+                FROM document_embeddings
+                WHERE user_id = %s
+                  AND is_active = TRUE
+                  AND embedding_model_id = %s
+                  AND content_minhash IS NOT NULL
+                  AND content_embedding IS NOT NULL;
+                """, (user_id, self.embedding_service.model_fingerprint))
+                rows = cursor.fetchall()
+            
+            if not rows:
+                return None
+            
+            signatures = np.frombuffer(
+                b"".join(bytes(row[0]) for row in rows), dtype=np.uint32
+            ).reshape(len(rows), -1)
+            
+            # Fraction of equal MinHash values estimates the Jaccard similarity
+            similarity = (signatures == content_minhash).mean(axis=1)
+            best = int(similarity.argmax())
+            
+            if similarity[best] < self.NEAR_DUPLICATE_THRESHOLD:
+                return None
+            
+            logger.info(f"♻️ Reusing embedding of near-duplicate document (Jaccard≈{similarity[best]:.2f})")
+            return np.asarray(from_db(rows[best][1]), dtype=np.float32)
+            
+        except Exception as e:
+            # Near-duplicate lookup is best-effort; fall back to generating the embedding
+            logger.warning(f"⚠️ Near-duplicate lookup failed: {str(e)}")
+            return None
     
     async def delete_document_embedding(self, user_id: int, document_id: str) -> Dict:
         """
@@ -246,9 +822,6 @@ class RAGIntegrationService:
             Dict: Deletion result
         """
         try:
-            self.conn = connect()
-            self.cursor = self.conn.cursor()
-            
             # Soft delete (is_active = false)
             delete_query = """
             UPDATE document_embeddings
@@ -257,9 +830,9 @@ class RAGIntegrationService:
             RETURNING id;
             """
             
-            self.cursor.execute(delete_query, (user_id, document_id))
-            result = self.cursor.fetchone()
-            self.conn.commit()
+            result = await asyncio.to_thread(
+                self._run_query, delete_query, (user_id, document_id), True
+            )
             
             if result:
                 logger.info(f"✅ Document embedding {document_id} marked as inactive")
@@ -275,18 +848,11 @@ class RAGIntegrationService:
                 }
                 
         except Exception as e:
-            if self.conn:
-                self.conn.rollback()
             logger.error(f"❌ Error deleting embedding: {str(e)}")
             return {
                 "success": False,
                 "error": f"Deletion error: {str(e)}"
             }
-        finally:
-            if self.cursor:
-                self.cursor.close()
-            if self.conn:
-                disconnect(self.conn)
     
     async def reprocess_document(self, user_id: int, document_id: str, file_path: Path) -> Dict:
         """
@@ -309,17 +875,14 @@ class RAGIntegrationService:
             logger.info(f"🔄 Reprocessing document {document_id} for user_id={user_id}")
             
             # Get document metadata from DB
-            self.conn = connect()
-            self.cursor = self.conn.cursor()
-            
             select_query = """
             SELECT filename, original_filename, document_type, file_size, mime_type, description
             FROM document_embeddings
             WHERE user_id = %s AND document_id = %s;
             """
             
-            self.cursor.execute(select_query, (user_id, document_id))
-            result = self.cursor.fetchone()
+            # Connection goes back to the pool before reprocessing
+            result = await asyncio.to_thread(self._run_query, select_query, (user_id, document_id))
             
             if not result:
                 return {
@@ -329,10 +892,6 @@ class RAGIntegrationService:
             
             filename, original_filename, document_type, file_size, mime_type, description = result
             
-            # Close connection before reprocessing
-            self.cursor.close()
-            disconnect(self.conn)
-            
             # Reprocess document
             return await self.process_uploaded_document(
                 user_id=user_id,
@@ -352,11 +911,6 @@ class RAGIntegrationService:
                 "success": False,
                 "error": f"Reprocessing error: {str(e)}"
             }
-        finally:
-            if self.cursor:
-                self.cursor.close()
-            if self.conn:
-                disconnect(self.conn)
     
     def _calculate_file_hash(self, file_path: Path) -> str:
         """
@@ -366,14 +920,12 @@ class RAGIntegrationService:
             file_path: File path
             
         Returns:
-            str: File hash (hex)
+            str: File hash (hex), or an empty string if the file cannot be read
         """
         try:
-            sha256_hash = hashlib.sha256()
+            # file_digest streams the file through OpenSSL in C (Python 3.11+)
             with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
+                return hashlib.file_digest(f, "sha256").hexdigest()
         except Exception as e:
             logger.error(f"❌ Error calculating file hash: {str(e)}")
             return ""
@@ -390,20 +942,16 @@ class RAGIntegrationService:
             Dict: Document status
         """
         try:
-            self.conn = connect()
-            self.cursor = self.conn.cursor()
-            
             query = """
             SELECT 
                 id, document_type, processing_status, is_primary_cv, 
                 is_active, created_at, updated_at,
-                LENGTH(content_text) as text_length
+                text_length
             FROM document_embeddings
             WHERE user_id = %s AND document_id = %s;
             """
             
-            self.cursor.execute(query, (user_id, document_id))
-            result = self.cursor.fetchone()
+            result = await asyncio.to_thread(self._run_query, query, (user_id, document_id))
             
             if not result:
                 return {
@@ -429,11 +977,68 @@ class RAGIntegrationService:
                 "success": False,
                 "error": f"Error: {str(e)}"
             }
-        finally:
-            if self.cursor:
-                self.cursor.close()
-            if self.conn:
-                disconnect(self.conn)
+
+
+class DocumentBatchCollector:
+    """
+    Groups concurrent uploads into batches for process_uploaded_documents_batch
+    
+    Documents submitted within max_wait_ms of each other (up to max_batch)
+    are embedded and saved together; each caller awaits its own result.
+    """
+    
+    def __init__(self, service: RAGIntegrationService, max_batch: int = 32, max_wait_ms: int = 100):
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def submit(self, **document) -> Dict:
+        """
+        Queues a document and waits for its processing result
+        
+        Args:
+            **document: Keyword arguments of process_uploaded_document
+            
+        Returns:
+            Dict: Processing result for this document
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((document, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Collects queued documents and flushes them as batches"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                results = await self.service.process_uploaded_documents_batch(
+                    [document for document, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"❌ Error flushing document batch: {str(e)}")
+                results = [{"success": False, "error": f"Processing error: {str(e)}"} for _ in batch]
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
 
 
 # Singleton instance
@@ -454,6 +1059,24 @@ def get_rag_integration_service() -> RAGIntegrationService:
     return _rag_integration_service_instance
 
 
+_document_batch_collector: Optional[DocumentBatchCollector] = None
+
+
+def get_document_batch_collector() -> DocumentBatchCollector:
+    """
+    Get or create DocumentBatchCollector singleton
+    
+    Returns:
+        DocumentBatchCollector: Shared collector bound to the RAG service
+    """
+    global _document_batch_collector
+    
+    if _document_batch_collector is None:
+        _document_batch_collector = DocumentBatchCollector(get_rag_integration_service())
+        logger.info("🎯 DocumentBatchCollector singleton created")
+    return _document_batch_collector
+
+
 # Convenience function
 async def process_document_for_rag(
     user_id: int,
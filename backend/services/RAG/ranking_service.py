@@ -2,10 +2,15 @@
 Ranking Service for OrientaTech RAG System
 Improves search results by re-ranking based on multiple factors
 """
+import re
 import sys
+import math
+import time
+import bisect
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
+import numpy as np
 from loguru import logger
 
 # Add backend directory to path for imports
@@ -32,6 +37,37 @@ class RankingService:
         'file_quality': 0.1     # 10% - file quality metrics
     }
     
+    # Ranking factors in the column order used by rank_results_vectorized
+    RANKING_FACTORS = ('similarity', 'recency', 'completeness', 'file_quality')
+    
+    # rank_results switches to the NumPy implementation from this many results
+    VECTORIZE_MIN_RESULTS = 64
+    
+    SECONDS_PER_DAY = 86400
+    
+    # Score lookup tables: np.digitize/bisect_right(bins, x) indexes the scores
+    # Recency by age in days: <30, <90, <180, <365, older
+    RECENCY_BINS = (30, 90, 180, 365)
+    RECENCY_SCORES = (1.0, 0.8, 0.6, 0.4, 0.2)
+    
+    # Completeness by content length: empty, 1-100, 101-500, >500 characters
+    CONTENT_LENGTH_BINS = (1, 101, 501)
+    CONTENT_LENGTH_SCORES = (0.0, 0.3, 0.5, 0.7)
+    
+    # File quality by size in MB: optimal [0.1, 2.0], acceptable [0.05, 5.0]
+    FILE_SIZE_BINS = (0.05, 0.1, float(np.nextafter(2.0, np.inf)), float(np.nextafter(5.0, np.inf)))
+    FILE_SIZE_SCORES = (0.1, 0.3, 0.5, 0.3, 0.1)
+    
+    # Descriptive CV filenames get a completeness bonus
+    _CV_RE = re.compile(r'resume|cv|curriculum', re.IGNORECASE)
+    
+    # File quality bonus by document type
+    DOCUMENT_TYPE_BONUS = {
+        'cv': 0.3,
+        'cover_letter': 0.2,
+        'certificate': 0.2
+    }
+    
     def __init__(self, weights: Optional[Dict[str, float]] = None):
         """
         Initialize the ranking service
@@ -43,6 +79,22 @@ class RankingService:
         self._validate_weights()
         logger.debug(f"RankingService initialized with weights: {self.weights}")
     
+    def _check_weight_factors(self, weights: Dict[str, float]) -> None:
+        """
+        Reject weights for factors that rank_results does not compute
+        
+        Args:
+            weights: Ranking weights
+            
+        Raises:
+            ValueError: If a weight key is not one of RANKING_FACTORS
+        """
+        unknown = set(weights) - set(self.RANKING_FACTORS)
+        if unknown:
+            raise ValueError(
+                f"Unknown ranking factors: {sorted(unknown)}; expected {list(self.RANKING_FACTORS)}"
+            )
+    
     def _validate_weights(self):
         """Validate that weights sum to approximately 1.0"""
         total = sum(self.weights.values())
@@ -59,7 +111,8 @@ class RankingService:
     def rank_results(
         self,
         results: List[Dict],
-        custom_weights: Optional[Dict[str, float]] = None
+        custom_weights: Optional[Dict[str, float]] = None,
+        boost_factors: Optional[Dict] = None
     ) -> List[Dict]:
         """
         Rank search results using multiple factors
@@ -67,10 +120,15 @@ class RankingService:
         Args:
             results: List of search results from SearchService
             custom_weights: Optional custom weights for this ranking
+            boost_factors: Optional boost configuration (see rank_with_boost),
+                applied to the final score before the single sort
             
         Returns:
             List[Dict]: Re-ranked results with final_score added
             
+        Raises:
+            ValueError: If the weights name an unknown ranking factor
+            
         Example:
             results = await search_service.semantic_search(query)
             ranked = ranking_service.rank_results(results)
@@ -80,26 +138,46 @@ class RankingService:
         
         # Use custom weights if provided
         weights = custom_weights or self.weights
+        self._check_weight_factors(weights)
+        
+        if len(results) >= self.VECTORIZE_MIN_RESULTS:
+            return self.rank_results_vectorized(results, weights, boost_factors)
+        
+        # Reference time for recency (POSIX timestamp), taken once per ranking
+        now = time.time()
+        weight_items = tuple(weights.items())
         
         # Calculate scores for each result
         for result in results:
+            age_days = (now - self._get_created_timestamp(result)) // self.SECONDS_PER_DAY
             scores = {
-                'similarity': result.get('similarity_score', 0.0),
-                'recency': self._calculate_recency_score(result),
+                'similarity': result.get('similarity_score') or 0.0,
+                'recency': self._score_recency(age_days),
                 'completeness': self._calculate_completeness_score(result),
                 'file_quality': self._calculate_file_quality_score(result)
             }
             
             # Calculate weighted final score
             final_score = sum(
-                scores[factor] * weights[factor]
-                for factor in weights.keys()
+                scores[factor] * weight
+                for factor, weight in weight_items
             )
             
             # Add scores to result
             result['ranking_scores'] = scores
             result['final_score'] = round(final_score, 4)
             result['ranking_weights'] = weights
+            
+            # Apply boost factors before sorting
+            if boost_factors is not None:
+                boost_multiplier = 1.0
+                if boost_factors.get('boost_recent') and age_days < 30:
+                    boost_multiplier *= boost_factors['boost_recent']
+                if boost_factors.get('boost_cv') and result.get('document_type') == 'cv':
+                    boost_multiplier *= boost_factors['boost_cv']
+                
+                result['final_score'] *= boost_multiplier
+                result['boost_applied'] = boost_multiplier
         
         # Sort by final score (highest first)
         ranked_results = sorted(
@@ -111,48 +189,190 @@ class RankingService:
         logger.info(f"✅ Ranked {len(ranked_results)} results")
         return ranked_results
     
+    def rank_results_vectorized(
+        self,
+        results: List[Dict],
+        custom_weights: Optional[Dict[str, float]] = None,
+        boost_factors: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Rank search results with NumPy (same scores as rank_results)
+        
+        Each factor is gathered into one array, scored with array
+        operations and combined with a single matrix-vector product.
+        
+        Args:
+            results: List of search results from SearchService
+            custom_weights: Optional custom weights for this ranking
+            boost_factors: Optional boost configuration (see rank_with_boost)
+            
+        Returns:
+            List[Dict]: Re-ranked results with final_score added
+            
+        Raises:
+            ValueError: If the weights name an unknown ranking factor
+        """
+        if not results:
+            return []
+        
+        weights = custom_weights or self.weights
+        self._check_weight_factors(weights)
+        count = len(results)
+        now = time.time()
+        
+        # Gather per-result fields into arrays
+        similarity = np.fromiter(
+            (result.get('similarity_score') or 0.0 for result in results),
+            dtype=np.float64, count=count
+        )
+        created_timestamps = np.fromiter(
+            (self._get_created_timestamp(result) for result in results),
+            dtype=np.float64, count=count
+        )
+        age_days = (now - created_timestamps) // self.SECONDS_PER_DAY
+        content_length = np.fromiter(
+            (len(result.get('content_preview', '') or result.get('content_text', '') or '')
+             for result in results),
+            dtype=np.int64, count=count
+        )
+        has_description = np.fromiter(
+            (bool(result.get('description')) for result in results),
+            dtype=bool, count=count
+        )
+        has_cv_filename = np.fromiter(
+            (self._CV_RE.search(result.get('filename') or '') is not None for result in results),
+            dtype=bool, count=count
+        )
+        file_size_mb = np.fromiter(
+            (np.nan if result.get('file_size_mb') is None else result['file_size_mb']
+             for result in results),
+            dtype=np.float64, count=count
+        )
+        type_bonus = np.fromiter(
+            (self.DOCUMENT_TYPE_BONUS.get(result.get('document_type', ''), 0.0) for result in results),
+            dtype=np.float64, count=count
+        )
+        
+        # Recency: bucket lookup; unknown dates (NaN) get the neutral 0.5
+        recency = np.asarray(self.RECENCY_SCORES)[np.digitize(age_days, self.RECENCY_BINS)]
+        recency[np.isnan(age_days)] = 0.5
+        
+        # Completeness
+        completeness = (
+            np.asarray(self.CONTENT_LENGTH_SCORES)[np.digitize(content_length, self.CONTENT_LENGTH_BINS)]
+            + 0.15 * has_description
+            + 0.15 * has_cv_filename
+        )
+        completeness = np.minimum(completeness, 1.0)
+        
+        # File quality; unknown sizes (NaN) get the neutral 0.5
+        size_score = np.asarray(self.FILE_SIZE_SCORES)[np.digitize(file_size_mb, self.FILE_SIZE_BINS)]
+        file_quality = np.minimum(size_score + type_bonus, 1.0)
+        file_quality[np.isnan(file_size_mb)] = 0.5
+        
+        # Weighted sum: (N, 4) @ (4,)
+        factor_scores = np.column_stack((similarity, recency, completeness, file_quality))
+        weight_vector = np.array(
+            [weights.get(factor, 0.0) for factor in self.RANKING_FACTORS],
+            dtype=np.float64
+        )
+        final_scores = factor_scores @ weight_vector
+        
+        rounded_scores = [round(float(score), 4) for score in final_scores]
+        
+        # Boost multipliers (age_days < 30 is False for unknown dates)
+        boost_multipliers = None
+        if boost_factors is not None:
+            boost_multipliers = np.ones(count)
+            if boost_factors.get('boost_recent'):
+                boost_multipliers[age_days < 30] *= boost_factors['boost_recent']
+            if boost_factors.get('boost_cv'):
+                is_cv = np.fromiter(
+                    (result.get('document_type') == 'cv' for result in results),
+                    dtype=bool, count=count
+                )
+                boost_multipliers[is_cv] *= boost_factors['boost_cv']
+            boost_multipliers = boost_multipliers.tolist()
+            rounded_scores = [
+                score * multiplier for score, multiplier in zip(rounded_scores, boost_multipliers)
+            ]
+        
+        for index, (result, row) in enumerate(zip(results, factor_scores.tolist())):
+            result['ranking_scores'] = dict(zip(self.RANKING_FACTORS, row))
+            result['final_score'] = rounded_scores[index]
+            result['ranking_weights'] = weights
+            if boost_multipliers is not None:
+                result['boost_applied'] = boost_multipliers[index]
+        
+        # Stable descending order (ties keep input order, like sorted())
+        order = np.argsort(-np.asarray(rounded_scores), kind='stable')
+        ranked_results = [results[i] for i in order]
+        
+        logger.info(f"✅ Ranked {len(ranked_results)} results")
+        return ranked_results
+    
     # ===================================
     # SCORING METHODS
     # ===================================
     
-    def _calculate_recency_score(self, result: Dict) -> float:
+    def _get_created_timestamp(self, result: Dict) -> float:
         """
-        Calculate recency score based on document age
+        Get document creation time as a POSIX timestamp
+        
+        Aware datetimes (e.g. ISO strings with 'Z') are converted exactly;
+        naive ones are taken as local time, like DB TIMESTAMP values.
+        created_at is parsed once per ranking.
         
         Args:
             result: Search result dictionary
             
         Returns:
-            float: Recency score (0.0 to 1.0)
+            float: Timestamp in seconds, or NaN if the date is unknown/invalid
         """
         try:
             created_at = result.get('created_at')
             
             if not created_at:
-                return 0.5  # Neutral score if date unknown
+                return float('nan')
             
-            # Convert to datetime if string
             if isinstance(created_at, str):
                 created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
             
-            # Calculate age in days
-            age_days = (datetime.now() - created_at.replace(tzinfo=None)).days
+            return created_at.timestamp()
             
-            # Scoring based on age
-            if age_days < 30:
-                return 1.0      # Less than 1 month - maximum score
-            elif age_days < 90:
-                return 0.8      # 1-3 months
-            elif age_days < 180:
-                return 0.6      # 3-6 months
-            elif age_days < 365:
-                return 0.4      # 6-12 months
-            else:
-                return 0.2      # Older than 1 year
-                
         except Exception as e:
-            logger.debug(f"Error calculating recency score: {e}")
-            return 0.5  # Neutral score on error
+            logger.debug(f"Error parsing document date: {e}")
+            return float('nan')
+    
+    def _score_recency(self, age_days: float) -> float:
+        """
+        Map document age to a recency score
+        
+        Args:
+            age_days: Age in days (NaN if unknown)
+            
+        Returns:
+            float: Recency score (0.0 to 1.0), 0.5 if the age is unknown
+        """
+        if math.isnan(age_days):
+            return 0.5  # Neutral score if date unknown
+        
+        # Scoring based on age (1.0 under a month down to 0.2 after a year)
+        return self.RECENCY_SCORES[bisect.bisect_right(self.RECENCY_BINS, age_days)]
+    
+    def _calculate_recency_score(self, result: Dict, now: Optional[float] = None) -> float:
+        """
+        Calculate recency score based on document age
+        
+        Args:
+            result: Search result dictionary
+            now: Reference POSIX timestamp (defaults to the current time)
+            
+        Returns:
+            float: Recency score (0.0 to 1.0)
+        """
+        now = time.time() if now is None else now
+        return self._score_recency((now - self._get_created_timestamp(result)) // self.SECONDS_PER_DAY)
     
     def _calculate_completeness_score(self, result: Dict) -> float:
         """
@@ -170,21 +390,15 @@ class RankingService:
             # Check if content exists
             content = result.get('content_preview', '') or result.get('content_text', '')
             if content:
-                score += 0.3
-                
-                # Bonus for longer content
-                if len(content) > 100:
-                    score += 0.2
-                if len(content) > 500:
-                    score += 0.2
+                # Base score plus bonus for longer content
+                score += self.CONTENT_LENGTH_SCORES[bisect.bisect_right(self.CONTENT_LENGTH_BINS, len(content))]
             
             # Check if description exists
             if result.get('description'):
                 score += 0.15
             
             # Check if filename is descriptive
-            filename = result.get('filename', '').lower()
-            if any(word in filename for word in ['resume', 'cv', 'curriculum']):
+            if self._CV_RE.search(result.get('filename') or ''):
                 score += 0.15
             
             return min(score, 1.0)  # Cap at 1.0
@@ -201,29 +415,21 @@ class RankingService:
             result: Search result dictionary
             
         Returns:
-            float: Quality score (0.0 to 1.0)
+            float: Quality score (0.0 to 1.0), 0.5 if the file size is unknown
         """
         score = 0.0
         
         try:
             # File size scoring (not too small, not too large)
-            file_size_mb = result.get('file_size_mb', 0)
+            file_size_mb = result.get('file_size_mb')
+            if file_size_mb is None:
+                return 0.5  # Neutral score if size unknown
             
-            if 0.1 <= file_size_mb <= 2.0:
-                score += 0.5  # Optimal size range
-            elif 0.05 <= file_size_mb <= 5.0:
-                score += 0.3  # Acceptable range
-            else:
-                score += 0.1  # Too small or too large
+            # Optimal size range scores highest, too small or too large lowest
+            score += self.FILE_SIZE_SCORES[bisect.bisect_right(self.FILE_SIZE_BINS, file_size_mb)]
             
-            # Document type preference
-            doc_type = result.get('document_type', '')
-            if doc_type == 'cv':
-                score += 0.3  # CV documents are typically higher quality
-            elif doc_type == 'cover_letter':
-                score += 0.2
-            elif doc_type == 'certificate':
-                score += 0.2
+            # Document type preference (CV documents are typically higher quality)
+            score += self.DOCUMENT_TYPE_BONUS.get(result.get('document_type', ''), 0.0)
             
             return min(score, 1.0)  # Cap at 1.0
             
@@ -255,35 +461,8 @@ class RankingService:
         Returns:
             List[Dict]: Ranked results with boost applied
         """
-        boost_factors = boost_factors or {}
-        
-        # First, apply standard ranking
-        ranked = self.rank_results(results)
-        
-        # Apply boost factors
-        for result in ranked:
-            boost_multiplier = 1.0
-            
-            # Boost recent documents
-            if boost_factors.get('boost_recent'):
-                created_at = result.get('created_at')
-                if created_at:
-                    if isinstance(created_at, str):
-                        created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    age_days = (datetime.now() - created_at.replace(tzinfo=None)).days
-                    if age_days < 30:
-                        boost_multiplier *= boost_factors['boost_recent']
-            
-            # Boost by document type
-            if boost_factors.get('boost_cv') and result.get('document_type') == 'cv':
-                boost_multiplier *= boost_factors['boost_cv']
-            
-            # Apply boost
-            result['final_score'] *= boost_multiplier
-            result['boost_applied'] = boost_multiplier
-        
-        # Re-sort after boosting
-        ranked = sorted(ranked, key=lambda x: x['final_score'], reverse=True)
+        # Boosts are folded into the score before the single sort
+        ranked = self.rank_results(results, boost_factors=boost_factors or {})
         
         logger.info(f"✅ Applied boost ranking to {len(ranked)} results")
         return ranked
@@ -2,23 +2,152 @@
 Search Service for OrientaTech RAG System
 Provides semantic search functionality for documents using vector embeddings
 """
+import os
 import sys
+import time
+import asyncio
+import itertools
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
 from loguru import logger
 
 # Add backend directory to path for imports
 backend_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from database.db_connection import connect_async, disconnect_async
+from database.db_connection import get_async_pool
 
 # Import embedding service
 try:
-    from .embedding_service import get_embedding_service
+    from .embedding_service import get_embedding_service, EmbeddingService
 except ImportError:
     # Fallback for direct execution
-    from embedding_service import get_embedding_service
+    from embedding_service import get_embedding_service, EmbeddingService
+
+
+VECTOR_DIM = EmbeddingService.EMBEDDING_DIMENSION
+
+# The queries below are constant strings (all values are bind parameters), so
+# asyncpg prepares each one once per pooled connection and reuses it.
+#
+# Result columns shared by the search queries. content_preview is a stored
+# column (migration 012) and size in MB is projected here, so content_text is
+# never read and results need no per-row post-processing
+RESULT_COLUMNS = """
+        document_id, user_id, filename, original_filename, document_type,
+        file_size, description, created_at,
+        content_preview,
+        COALESCE(ROUND(file_size / 1048576.0, 2), 0)::float8 AS file_size_mb"""
+
+# Nearest-neighbour search ordered by the bare cosine-distance operator so the
+# planner can use the halfvec HNSW index (idx_doc_embeddings_halfvec_hnsw).
+# Parameters: $1 query vector, $2 limit, then the optional filters
+SEARCH_QUERY_TEMPLATE = f"""
+    SELECT {RESULT_COLUMNS},
+        content_embedding::halfvec({VECTOR_DIM}) <=> $1::vector::halfvec({VECTOR_DIM}) AS distance
+    FROM document_embeddings
+    WHERE {{where}}
+    ORDER BY content_embedding::halfvec({VECTOR_DIM}) <=> $1::vector::halfvec({VECTOR_DIM})
+    LIMIT $2
+"""
+
+# Binary-quantization variant (idx_doc_embeddings_bit_hnsw): the top $3
+# candidates by Hamming distance are re-ranked by exact cosine distance.
+# Parameters: $1 query vector, $2 limit, $3 candidates, then the optional filters
+BINARY_RERANK_SEARCH_QUERY_TEMPLATE = f"""
+    WITH candidates AS (
+        SELECT {RESULT_COLUMNS},
+            content_embedding <=> $1::vector AS distance
+        FROM document_embeddings
+        WHERE {{where}}
+        ORDER BY binary_quantize(content_embedding)::bit({VECTOR_DIM})
+            <~> binary_quantize($1::vector)
+        LIMIT $3
+    )
+    SELECT * FROM candidates
+    ORDER BY distance
+    LIMIT $2
+"""
+
+
+def build_search_query(filter_user: bool, filter_type: bool, binary_rerank: bool) -> str:
+    """
+    Build the search SQL with only the filters that are actually used
+    
+    Absent filters are left out of the WHERE clause instead of being passed
+    as NULL ("$2 IS NULL OR user_id = $2"), which gives the planner the plain
+    ANN shape and keeps the HNSW index scan.
+    
+    Args:
+        filter_user: Add a user_id filter parameter
+        filter_type: Add a document_type filter parameter
+        binary_rerank: Use the binary-quantization + re-rank query
+        
+    Returns:
+        str: SQL text (filter parameters follow the fixed ones, user first)
+    """
+    next_param = 4 if binary_rerank else 3
+    conditions = ["is_active = TRUE"]
+    if filter_user:
+        conditions.append(f"user_id = ${next_param}")
+        next_param += 1
+    if filter_type:
+        conditions.append(f"document_type = ${next_param}")
+    
+    template = BINARY_RERANK_SEARCH_QUERY_TEMPLATE if binary_rerank else SEARCH_QUERY_TEMPLATE
+    return template.format(where="\n      AND ".join(conditions))
+
+
+# Every filter combination, built once so each SQL text stays constant
+SEARCH_QUERIES = {
+    key: build_search_query(*key)
+    for key in itertools.product((False, True), repeat=3)
+}
+
+# Document statistics from the doc_stats_by_user materialized view (migration
+# 013), summed over all users when $1 is NULL
+STATISTICS_QUERY = """
+    SELECT
+        COALESCE(SUM(total_documents), 0)::bigint AS total_documents,
+        COALESCE(SUM(cv_count), 0)::bigint AS cv_count,
+        COALESCE(SUM(cover_letter_count), 0)::bigint AS cover_letter_count,
+        COALESCE(SUM(certificate_count), 0)::bigint AS certificate_count,
+        COALESCE(SUM(other_count), 0)::bigint AS other_count,
+        COALESCE(SUM(total_size_bytes), 0)::bigint AS total_size_bytes,
+        COALESCE(SUM(processed_count), 0)::bigint AS processed_count,
+        COALESCE(SUM(pending_count), 0)::bigint AS pending_count,
+        COALESCE(SUM(failed_count), 0)::bigint AS failed_count
+    FROM doc_stats_by_user
+    WHERE $1::int IS NULL OR user_id = $1
+"""
+
+# Reference lookup, ownership check and neighbour search in one statement.
+# The LEFT JOIN keeps one row (with NULL document_id) when the reference
+# exists but has no neighbours, so zero rows means "not found or denied"
+SIMILAR_QUERY = f"""
+    WITH ref AS (
+        SELECT content_embedding, user_id
+        FROM document_embeddings
+        WHERE document_id = $1
+          AND is_active = TRUE
+          AND content_embedding IS NOT NULL
+          AND ($2::int IS NULL OR user_id = $2)
+    )
+    SELECT ref.user_id AS ref_user_id, similar.*
+    FROM ref
+    LEFT JOIN LATERAL (
+        SELECT {RESULT_COLUMNS},
+            content_embedding::halfvec({VECTOR_DIM}) <=> ref.content_embedding::halfvec({VECTOR_DIM}) AS distance
+        FROM document_embeddings
+        WHERE is_active = TRUE
+          AND user_id = ref.user_id
+          AND document_id <> $1
+        ORDER BY content_embedding::halfvec({VECTOR_DIM}) <=> ref.content_embedding::halfvec({VECTOR_DIM})
+        LIMIT $3
+    ) AS similar ON TRUE
+"""
 
 
 class SearchService:
@@ -33,9 +162,43 @@ class SearchService:
     - Result enrichment with metadata
     """
     
+    # HNSW candidate queue size per query (higher = better recall, slower)
+    DEFAULT_EF_SEARCH = 100
+    
+    # Binary-quantized ANN + exact re-rank (A/B flag, needs migration 011)
+    USE_BINARY_RERANK = os.getenv("SEARCH_BINARY_RERANK", "false").lower() == "true"
+    BINARY_RERANK_CANDIDATES = 100
+    
+    # Interval between background refreshes of doc_stats_by_user
+    STATS_REFRESH_SECONDS = int(os.getenv("STATS_REFRESH_SECONDS", "60"))
+    
+    # Log the plan of each search (extra round-trip, for diagnosing index use)
+    EXPLAIN_SEARCH = os.getenv("SEARCH_EXPLAIN", "false").lower() == "true"
+    
+    # Concurrent similar-document queries per batch call (bounded by the pool)
+    SIMILAR_BATCH_CONCURRENCY = 10
+    
+    # LRU of query embeddings keyed by the normalized query (whitespace
+    # collapsed, lowercased), checked before the embedding micro-batcher so
+    # hot queries skip its wait window; longer queries are not cached
+    QUERY_CACHE_SIZE = 1024
+    QUERY_CACHE_MAX_LENGTH = 512
+    
+    # Short-lived cache of complete search results for repeated searches
+    # (typeahead, retries); invalidated per user when documents change
+    RESULT_CACHE_SIZE = 2048
+    RESULT_CACHE_TTL_SECONDS = 60
+    RESULT_CACHE_MAX_QUERY_LENGTH = 256
+    
     def __init__(self):
         """Initialize the search service"""
         self.embedding_service = get_embedding_service()
+        
+        # Query LRU: only touched from the event loop, so no lock is needed
+        self._query_embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
+        # Result LRU: search key -> (expiry on the monotonic clock, results)
+        self._result_cache: "OrderedDict[Tuple, Tuple[float, List[Dict]]]" = OrderedDict()
         logger.debug("SearchService initialized")
     
     # ===================================
@@ -48,7 +211,8 @@ class SearchService:
         user_id: Optional[int] = None,
         document_type: Optional[str] = None,
         limit: int = 10,
-        similarity_threshold: float = 0.3
+        similarity_threshold: float = 0.3,
+        ef_search: Optional[int] = None
     ) -> List[Dict]:
         """
         Perform semantic search across documents
@@ -59,6 +223,8 @@ class SearchService:
             document_type: Filter by document type (None = all types)
             limit: Maximum number of results
             similarity_threshold: Minimum similarity score (0.0 to 1.0)
+            ef_search: HNSW search breadth (None = DEFAULT_EF_SEARCH); e.g. 200
+                for high recall, 40 for low latency
             
         Returns:
             List[Dict]: List of matching documents with metadata
@@ -70,23 +236,41 @@ class SearchService:
                 limit=10
             )
         """
+        cache_key = None
+        if len(query) <= self.RESULT_CACHE_MAX_QUERY_LENGTH:
+            cache_key = (
+                " ".join(query.split()), user_id, document_type, limit,
+                round(similarity_threshold, 3), ef_search
+            )
+            cached = self._get_cached_results(cache_key)
+            if cached is not None:
+                logger.debug(f"Search result cache hit for: '{query}'")
+                return cached
+        
         try:
             # Step 1: Generate embedding for query
             logger.info(f"Searching for: '{query}'")
-            query_embedding = self.embedding_service.generate_embedding(query)
+            query_embedding = await self._get_query_embedding(query)
             
-            # Step 2: Search in database using PostgreSQL function
-            results = await self._search_in_database(
-                query_embedding=query_embedding,
-                similarity_threshold=similarity_threshold,
-                max_results=limit,
-                target_user_id=user_id,
-                document_type_filter=document_type
-            )
+            # Step 2: Search in database on a pooled connection
+            pool = await get_async_pool()
+            async with pool.acquire() as conn:
+                results = await self._search_in_database(
+                    conn,
+                    query_embedding=query_embedding,
+                    similarity_threshold=similarity_threshold,
+                    max_results=limit,
+                    target_user_id=user_id,
+                    document_type_filter=document_type,
+                    ef_search=ef_search
+                )
             
             # Step 3: Enrich results with additional metadata
             enriched_results = await self._enrich_results(results)
             
+            if cache_key is not None:
+                self._cache_results(cache_key, enriched_results)
+            
             logger.success(f"✅ Found {len(enriched_results)} documents")
             return enriched_results
             
@@ -186,124 +370,213 @@ class SearchService:
             ValueError: If document not found or doesn't belong to user
         """
         try:
-            # Get the reference document's embedding from database
-            conn = await connect_async()
-            if not conn:
-                raise RuntimeError("Database connection failed")
-            
-            try:
-                # Get document embedding and verify ownership
-                query = """
-                    SELECT content_embedding, content_text, user_id
-                    FROM document_embeddings
-                    WHERE document_id = $1 AND is_active = TRUE
-                """
-                result = await conn.fetchrow(query, document_id)
-                
-                if not result or not result['content_embedding']:
-                    raise ValueError(f"Document {document_id} not found or has no embedding")
-                
-                # 🔐 Security: Verify document ownership if user_id provided
-                if user_id is not None and result['user_id'] != user_id:
-                    raise ValueError(f"Document {document_id} not found or access denied")
-                
-                # Use the document owner's user_id for filtering similar documents
-                search_user_id = user_id if user_id is not None else result['user_id']
-                logger.info(f"Searching similar documents for user_id={search_user_id}")
-                
-                # Convert pgvector to list
-                # pgvector returns as string "[0.123,0.456,...]" or as list
-                embedding_data = result['content_embedding']
-                if isinstance(embedding_data, str):
-                    # Parse string format: "[0.123,0.456,...]"
-                    reference_embedding = [float(x) for x in embedding_data.strip('[]').split(',')]
-                else:
-                    # Already a list
-                    reference_embedding = list(embedding_data)
-                
-                # Search using the document's embedding (within same user's documents)
-                search_results = await self._search_in_database(
-                    query_embedding=reference_embedding,
-                    similarity_threshold=similarity_threshold,
-                    max_results=limit + 1,  # +1 to exclude self
-                    target_user_id=search_user_id,  # ← Filter by user!
-                    document_type_filter=None
+            pool = await get_async_pool()
+            async with pool.acquire() as conn:
+                search_results = await self._find_similar_by_document_id(
+                    conn,
+                    document_id=document_id,
+                    user_id=user_id,
+                    limit=limit,
+                    similarity_threshold=similarity_threshold
                 )
-                
-                # Filter out the reference document itself
-                filtered_results = [
-                    r for r in search_results 
-                    if r['document_id'] != document_id
-                ][:limit]
-                
-                # Enrich results
-                enriched_results = await self._enrich_results(filtered_results)
-                
-                logger.success(f"✅ Found {len(enriched_results)} similar documents")
-                return enriched_results
-                
-            finally:
-                await disconnect_async(conn)
-                
+            
+            # Enrich results
+            enriched_results = await self._enrich_results(search_results)
+            
+            logger.success(f"✅ Found {len(enriched_results)} similar documents")
+            return enriched_results
+            
         except Exception as e:
             logger.error(f"❌ Error finding similar documents: {e}")
             raise RuntimeError(f"Similar documents search failed: {e}")
     
+    async def get_similar_documents_batch(
+        self,
+        document_ids: List[str],
+        user_id: Optional[int] = None,
+        limit: int = 5,
+        similarity_threshold: float = 0.3
+    ) -> List[Union[List[Dict], Exception]]:
+        """
+        Find similar documents for several reference documents concurrently
+        
+        Args:
+            document_ids: IDs of the reference documents
+            user_id: Filter by user (if provided, verifies document ownership)
+            limit: Maximum number of results per document
+            similarity_threshold: Minimum similarity score
+            
+        Returns:
+            List: One entry per document_id, in input order: the list of similar
+                documents, or the exception raised for that document
+        """
+        semaphore = asyncio.Semaphore(self.SIMILAR_BATCH_CONCURRENCY)
+        
+        async def _one(document_id: str) -> List[Dict]:
+            async with semaphore:
+                return await self.get_similar_documents(
+                    document_id=document_id,
+                    user_id=user_id,
+                    limit=limit,
+                    similarity_threshold=similarity_threshold
+                )
+        
+        results = await asyncio.gather(
+            *[_one(document_id) for document_id in document_ids],
+            return_exceptions=True
+        )
+        
+        failed = [
+            document_id for document_id, result in zip(document_ids, results)
+            if isinstance(result, Exception)
+        ]
+        if failed:
+            logger.warning(f"⚠️ Similar documents search failed for {len(failed)} documents: {failed}")
+        
+        return results
+    
+    async def _get_query_embedding(self, query: str) -> np.ndarray:
+        """
+        Embed a search query, reusing the vector of a previously seen query
+        
+        Hits return without queueing; misses go through the embedding
+        service's micro-batcher, so concurrent searches share one forward
+        pass off the event loop.
+        
+        Args:
+            query: Search query text
+            
+        Returns:
+            np.ndarray: 384-dimensional float32 embedding vector
+        """
+        key = " ".join(query.split()).lower()
+        
+        embedding = self._query_embedding_cache.get(key)
+        if embedding is not None:
+            self._query_embedding_cache.move_to_end(key)
+            return embedding
+        
+        embedding = await self.embedding_service.encode_async(query)
+        
+        if len(key) <= self.QUERY_CACHE_MAX_LENGTH:
+            self._query_embedding_cache[key] = embedding
+            while len(self._query_embedding_cache) > self.QUERY_CACHE_SIZE:
+                self._query_embedding_cache.popitem(last=False)
+        
+        return embedding
+    
+    def _get_cached_results(self, key: Tuple) -> Optional[List[Dict]]:
+        """Return a copy of unexpired cached results, or None"""
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, results = entry
+        if expires_at < time.monotonic():
+            del self._result_cache[key]
+            return None
+        
+        self._result_cache.move_to_end(key)
+        # Result dicts hold only immutable values, so a shallow copy per dict
+        # protects the cache from callers mutating their results
+        return [dict(result) for result in results]
+    
+    def _cache_results(self, key: Tuple, results: List[Dict]) -> None:
+        """Store a copy of search results, evicting the least recently used entries"""
+        self._result_cache[key] = (
+            time.monotonic() + self.RESULT_CACHE_TTL_SECONDS,
+            [dict(result) for result in results]
+        )
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+    
+    def invalidate(self, user_id: int) -> None:
+        """
+        Drop cached search results that may include a user's documents
+        
+        Call after a document of the user is added, changed or removed.
+        Searches across all users (user_id None) are dropped as well.
+        
+        Args:
+            user_id: Owner of the changed document
+        """
+        stale = [key for key in self._result_cache if key[1] is None or key[1] == user_id]
+        for key in stale:
+            del self._result_cache[key]
+    
     # ===================================
     # DATABASE INTERACTION
     # ===================================
     
     async def _search_in_database(
         self,
-        query_embedding: List[float],
+        conn,
+        query_embedding: np.ndarray,
         similarity_threshold: float,
         max_results: int,
         target_user_id: Optional[int] = None,
-        document_type_filter: Optional[str] = None
+        document_type_filter: Optional[str] = None,
+        ef_search: Optional[int] = None
     ) -> List[Dict]:
         """
         Execute search query in PostgreSQL using pgvector
         
         Args:
-            query_embedding: 384-dimensional embedding vector
+            conn: Pooled asyncpg connection (pgvector codec registered)
+            query_embedding: 384-dimensional float32 embedding vector
             similarity_threshold: Minimum similarity score
             max_results: Maximum number of results
             target_user_id: Filter by user ID
             document_type_filter: Filter by document type
+            ef_search: HNSW search breadth (None = DEFAULT_EF_SEARCH)
             
         Returns:
             List[Dict]: Raw search results from database
         """
-        conn = await connect_async()
-        if not conn:
-            raise RuntimeError("Database connection failed")
+        ef_search = ef_search or self.DEFAULT_EF_SEARCH
+        params = [np.asarray(query_embedding, dtype=np.float32), max_results]
+        
+        if self.USE_BINARY_RERANK:
+            # The candidate pool must hold every result, and HNSW returns at most ef_search rows
+            candidates = max(self.BINARY_RERANK_CANDIDATES, max_results)
+            ef_search = max(ef_search, candidates)
+            params.append(candidates)
+        
+        # Only filters that are set become WHERE conditions
+        if target_user_id is not None:
+            params.append(target_user_id)
+        if document_type_filter is not None:
+            params.append(document_type_filter)
+        
+        query = SEARCH_QUERIES[(
+            target_user_id is not None,
+            document_type_filter is not None,
+            self.USE_BINARY_RERANK
+        )]
         
         try:
-            # Convert embedding list to PostgreSQL vector string format
-            embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
-            
-            # Call PostgreSQL function search_similar_documents
-            query = """
-                SELECT * FROM search_similar_documents(
-                    $1::vector,  -- query_embedding
-                    $2,          -- similarity_threshold
-                    $3,          -- max_results
-                    $4,          -- target_user_id
-                    $5           -- document_type_filter
+            # Top-k by distance (index scan), similarity threshold applied after.
+            # ef_search is set transaction-locally so it never leaks to other queries
+            async with conn.transaction():
+                await conn.execute(
+                    "SELECT set_config('hnsw.ef_search', $1, true)",
+                    str(ef_search)
                 )
-            """
-            
-            rows = await conn.fetch(
-                query,
-                embedding_str,
-                similarity_threshold,
-                max_results,
-                target_user_id,
-                document_type_filter
-            )
-            
-            # Convert to list of dictionaries
-            results = [dict(row) for row in rows]
+                if self.EXPLAIN_SEARCH:
+                    await self._log_search_plan(conn, query, params)
+                
+                # Rows are streamed and converted as they arrive (similarity =
+                # 1 - cosine distance); prefetch covers the whole limit in one fetch.
+                # Rows come in distance order, so the first one under the
+                # threshold ends the scan
+                results = []
+                async for row in conn.cursor(query, *params, prefetch=max_results + 1):
+                    result = dict(row)
+                    result['similarity_score'] = 1.0 - result.pop('distance')
+                    if result['similarity_score'] < similarity_threshold:
+                        break
+                    results.append(result)
             
             logger.debug(f"Database returned {len(results)} results")
             return results
@@ -311,8 +584,73 @@ class SearchService:
         except Exception as e:
             logger.error(f"Database search error: {e}")
             raise RuntimeError(f"Database search failed: {e}")
-        finally:
-            await disconnect_async(conn)
+    
+    async def _log_search_plan(self, conn, query: str, params: List) -> None:
+        """
+        Log the execution plan of a search query and whether HNSW is used
+        
+        Args:
+            conn: Connection inside the search transaction (same ef_search)
+            query: Search SQL text
+            params: Bind parameters of the query
+        """
+        plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *params)
+        if '_hnsw"' in plan:
+            logger.debug(f"Search plan uses HNSW index: {plan}")
+        else:
+            logger.warning(f"⚠️ Search plan does not use an HNSW index: {plan}")
+    
+    async def _find_similar_by_document_id(
+        self,
+        conn,
+        document_id: str,
+        user_id: Optional[int],
+        limit: int,
+        similarity_threshold: float
+    ) -> List[Dict]:
+        """
+        Find neighbours of a stored document in a single round-trip
+        
+        The reference embedding never leaves the database: SIMILAR_QUERY looks it
+        up, verifies ownership and searches within the owner's documents.
+        
+        Args:
+            conn: Pooled asyncpg connection
+            document_id: ID of the reference document
+            user_id: Required owner of the reference document (None = any)
+            limit: Maximum number of results (reference document excluded)
+            similarity_threshold: Minimum similarity score
+            
+        Returns:
+            List[Dict]: Raw search results from database
+            
+        Raises:
+            ValueError: If document not found, has no embedding or doesn't belong to user
+        """
+        async with conn.transaction():
+            await conn.execute(
+                "SELECT set_config('hnsw.ef_search', $1, true)",
+                str(self.DEFAULT_EF_SEARCH)
+            )
+            rows = await conn.fetch(SIMILAR_QUERY, document_id, user_id, limit)
+        
+        # 🔐 Security: no rows means missing document or foreign owner
+        if not rows:
+            raise ValueError(f"Document {document_id} not found or access denied")
+        
+        logger.info(f"Searching similar documents for user_id={rows[0]['ref_user_id']}")
+        
+        results = []
+        for row in rows:
+            if row['document_id'] is None:
+                continue
+            result = dict(row)
+            del result['ref_user_id']
+            result['similarity_score'] = 1.0 - result.pop('distance')
+            if result['similarity_score'] >= similarity_threshold:
+                results.append(result)
+        
+        return results
     
     # ===================================
     # RESULT ENRICHMENT
@@ -322,16 +660,27 @@ class SearchService:
         """
         Enrich search results with additional metadata
         
+        Preview and size in MB are already computed by the search query;
+        relevance scores are converted in one NumPy pass and URLs are added.
+        
         Args:
             results: Raw results from database
             
         Returns:
             List[Dict]: Enriched results with URLs, user info, etc.
         """
-        enriched = []
+        if not results:
+            return []
+        
+        scores = np.fromiter(
+            (result['similarity_score'] for result in results),
+            dtype=np.float64,
+            count=len(results)
+        )
+        percentages = np.round(scores * 100, 2)
         
-        for result in results:
-            enriched_result = {
+        return [
+            {
                 # Basic document info
                 'document_id': result['document_id'],
                 'filename': result['filename'],
@@ -339,15 +688,15 @@ class SearchService:
                 'document_type': result['document_type'],
                 
                 # Search relevance
-                'similarity_score': float(result['similarity_score']),
-                'similarity_percentage': round(float(result['similarity_score']) * 100, 2),
+                'similarity_score': score,
+                'similarity_percentage': percentage,
                 
                 # Content
-                'content_preview': self._create_preview(result.get('content_text', '')),
+                'content_preview': result['content_preview'],
                 
                 # File metadata
                 'file_size': result['file_size'],
-                'file_size_mb': round(result['file_size'] / (1024 * 1024), 2) if result['file_size'] else 0,
+                'file_size_mb': result['file_size_mb'],
                 
                 # User info
                 'user_id': result['user_id'],
@@ -357,35 +706,13 @@ class SearchService:
                 'view_url': f"/api/documents/{result['document_id']}/view",
                 
                 # Timestamps
-                'created_at': result['created_at'].isoformat() if result.get('created_at') else None,
+                'created_at': result['created_at'].isoformat() if result['created_at'] else None,
                 
                 # Description
-                'description': result.get('description', '')
+                'description': result['description']
             }
-            
-            enriched.append(enriched_result)
-        
-        return enriched
-    
-    def _create_preview(self, text: str, max_length: int = 200) -> str:
-        """
-        Create text preview for search results
-        
-        Args:
-            text: Full text
-            max_length: Maximum preview length
-            
-        Returns:
-            str: Preview text
-        """
-        if not text:
-            return ""
-        
-        # Truncate to max length
-        if len(text) > max_length:
-            return text[:max_length].strip() + "..."
-        
-        return text.strip()
+            for result, score, percentage in zip(results, scores.tolist(), percentages.tolist())
+        ]
     
     # ===================================
     # STATISTICS
@@ -405,14 +732,10 @@ class SearchService:
             Dict: Statistics about indexed documents
         """
         try:
-            conn = await connect_async()
-            if not conn:
-                raise RuntimeError("Database connection failed")
-            
-            try:
-                # Call PostgreSQL function get_document_statistics
-                query = "SELECT * FROM get_document_statistics($1)"
-                result = await conn.fetchrow(query, user_id)
+            pool = await get_async_pool()
+            async with pool.acquire() as conn:
+                # Precomputed per-user counts (see refresh_statistics)
+                result = await conn.fetchrow(STATISTICS_QUERY, user_id)
                 
                 if result:
                     return {
@@ -432,14 +755,31 @@ class SearchService:
                         'total_documents': 0,
                         'message': 'No documents found'
                     }
-                    
-            finally:
-                await disconnect_async(conn)
                 
         except Exception as e:
             logger.error(f"Error getting statistics: {e}")
             raise RuntimeError(f"Statistics retrieval failed: {e}")
     
+    async def refresh_statistics(self) -> None:
+        """Recompute the doc_stats_by_user view without blocking readers"""
+        pool = await get_async_pool()
+        async with pool.acquire() as conn:
+            await conn.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY doc_stats_by_user")
+        logger.debug("Document statistics refreshed")
+    
+    async def run_statistics_refresh(self) -> None:
+        """
+        Refresh document statistics every STATS_REFRESH_SECONDS until cancelled
+        
+        Meant to run as a background task for the lifetime of the application.
+        """
+        while True:
+            await asyncio.sleep(self.STATS_REFRESH_SECONDS)
+            try:
+                await self.refresh_statistics()
+            except Exception as e:
+                logger.warning(f"⚠️ Document statistics refresh failed: {e}")
+    
     # ===================================
     # UTILITY METHODS
     # ===================================
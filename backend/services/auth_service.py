@@ -1,8 +1,9 @@
 import os
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
-from passlib.context import CryptContext
+import bcrypt
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
 from pathlib import Path
@@ -15,22 +16,39 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "fallback_secret_key")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Clave y codificador JWT preparados una sola vez (no en cada petición)
+_JWT_KEY = SECRET_KEY.encode('utf-8')
+_jwt = jwt.PyJWT()
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub", "user_id"]}
+
 # Configuración de encriptación de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = 12
+
+def _password_bytes(password: str) -> bytes:
+    """Codificar la contraseña para bcrypt (límite de 72 bytes)"""
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) > 72:
+        # Mismo truncado que al crear los hashes existentes: sin cortar caracteres a la mitad
+        password_bytes = password_bytes[:72].decode('utf-8', errors='ignore').encode('utf-8')
+    return password_bytes
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode('utf-8'))
+    except ValueError:
+        # Hash con formato inválido
+        return False
+
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verificar si la contraseña coincide con el hash"""
-    # bcrypt tiene un límite de 72 bytes, truncamos si es necesario
-    if len(plain_password.encode('utf-8')) > 72:
-        plain_password = plain_password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verificar si la contraseña coincide con el hash (en un hilo, sin bloquear el event loop)"""
+    return await asyncio.to_thread(_check_password, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    """Generar hash de la contraseña"""
-    # bcrypt tiene un límite de 72 bytes, truncamos si es necesario
-    if len(password.encode('utf-8')) > 72:
-        password = password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Generar hash de la contraseña (en un hilo, sin bloquear el event loop)"""
+    return await asyncio.to_thread(_hash_password, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Crear token JWT"""
@@ -41,24 +59,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _jwt.encode(to_encode, _JWT_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def verify_token(token: str) -> dict:
     """Verificar y decodificar token JWT"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        user_id: int = payload.get("user_id")
-        
-        if email is None or user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return {"email": email, "user_id": user_id}
+        # Las claims obligatorias (exp, sub, user_id) las valida PyJWT
+        payload = _jwt.decode(
+            token,
+            _JWT_KEY,
+            algorithms=[ALGORITHM],
+            options=_JWT_DECODE_OPTIONS
+        )
+        return {"email": payload["sub"], "user_id": payload["user_id"]}
     
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -66,7 +80,7 @@ def verify_token(token: str) -> dict:
             detail="Token expirado",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido",
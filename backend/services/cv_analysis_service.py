@@ -2,11 +2,22 @@
 Service for CV analysis and career advice integration
 """
 import os
-from typing import Dict, Any, Optional
+import re
+import json
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
+
+import numpy as np
 from loguru import logger
 
-from agent.langchain import CVAnalyzer, analyze_user_cv, get_career_advice_for_profile
+from agent.langchain import CVAnalyzer, get_user_profile_analysis
+from services.RAG.embedding_service import get_embedding_service
 from services.document_utils import DocumentUtils
 
 
@@ -15,10 +26,109 @@ class CVAnalysisService:
     Service to handle CV analysis workflow integration
     """
     
+    # Analysis results keyed by the SHA-256 of the uploaded file: an on-disk
+    # SQLite store next to the uploaded documents survives restarts, a small
+    # in-memory LRU sits in front of it. Entries expire after CACHE_TTL_SECONDS
+    # and only the newest CACHE_MAX_ENTRIES are kept on disk
+    CACHE_PATH = Path(os.getenv(
+        "CV_ANALYSIS_CACHE_PATH", DocumentUtils.BASE_DOCS_DIR / "cv_analysis_cache.db"
+    ))
+    CACHE_TTL_SECONDS = 30 * 24 * 3600
+    CACHE_MAX_ENTRIES = 10_000
+    MEMORY_CACHE_SIZE = 128
+    
+    # Career advice reused across near-identical profiles: the categorical
+    # fields must match exactly and the free-text skills/experience must be
+    # semantically close (cosine similarity); oldest entries are dropped first
+    ADVICE_SIMILARITY_THRESHOLD = 0.95
+    ADVICE_CACHE_SIZE = 1000
+    ADVICE_CATEGORICAL_FIELDS = ("area_of_interest", "digital_level", "education_level")
+    ADVICE_FREE_TEXT_FIELDS = ("main_skills", "previous_experience")
+    
+    # Stand-ins for the requester's name in shared advice
+    _FULL_NAME_SLOT = "\x00full_name\x00"
+    _FIRST_NAME_SLOT = "\x00first_name\x00"
+    
     def __init__(self):
         """Initialize the CV Analysis Service"""
         self.analyzer = CVAnalyzer()
         self.document_utils = DocumentUtils()
+        
+        # sha -> ((analysis, career_advice), stored_at)
+        self._memory_cache: "OrderedDict[str, Tuple[Tuple[Dict[str, Any], str], float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        self._cache = sqlite3.connect(self.CACHE_PATH, check_same_thread=False)
+        self._cache.execute(
+            "CREATE TABLE IF NOT EXISTS cv_analysis_cache "
+            "(sha TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._cache.commit()
+        
+        self._advice_lock = threading.Lock()
+        self._advice_embeddings: Optional[np.ndarray] = None  # (n, dim), normalized
+        self._advice_categories: List[Tuple[str, ...]] = []
+        self._advice_payloads: List[str] = []
+    
+    @staticmethod
+    def _file_sha256(file_path: str) -> str:
+        """Hash the file contents with a buffered read"""
+        with open(file_path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    
+    def _get_cached_analysis(self, sha: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Look up a previous analysis of the same file contents
+        
+        Args:
+            sha: SHA-256 hex digest of the file
+            
+        Returns:
+            Tuple (analysis, career_advice) or None on a miss
+        """
+        expires_before = time.time() - self.CACHE_TTL_SECONDS
+        with self._cache_lock:
+            entry = self._memory_cache.get(sha)
+            if entry is not None and entry[1] >= expires_before:
+                self._memory_cache.move_to_end(sha)
+                return entry[0]
+            
+            row = self._cache.execute(
+                "SELECT result, stored_at FROM cv_analysis_cache WHERE sha = ? AND stored_at >= ?",
+                (sha, expires_before)
+            ).fetchone()
+            if row is None:
+                self._memory_cache.pop(sha, None)
+                return None
+            
+            stored = json.loads(row[0])
+            cached = (stored["analysis"], stored["career_advice"])
+            self._remember(sha, cached, row[1])
+            return cached
+    
+    def _cache_analysis(self, sha: str, analysis: Dict[str, Any], career_advice: str) -> None:
+        """Store a successful analysis in both cache levels, pruning old entries"""
+        payload = json.dumps({"analysis": analysis, "career_advice": career_advice}, ensure_ascii=False)
+        stored_at = time.time()
+        with self._cache_lock:
+            self._cache.execute(
+                "INSERT OR REPLACE INTO cv_analysis_cache (sha, result, stored_at) VALUES (?, ?, ?)",
+                (sha, payload, stored_at)
+            )
+            self._cache.execute(
+                "DELETE FROM cv_analysis_cache WHERE stored_at < ? OR sha NOT IN "
+                "(SELECT sha FROM cv_analysis_cache ORDER BY stored_at DESC LIMIT ?)",
+                (stored_at - self.CACHE_TTL_SECONDS, self.CACHE_MAX_ENTRIES)
+            )
+            self._cache.commit()
+            self._remember(sha, (analysis, career_advice), stored_at)
+    
+    def _remember(self, sha: str, cached: Tuple[Dict[str, Any], str], stored_at: float) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)"""
+        self._memory_cache[sha] = (cached, stored_at)
+        self._memory_cache.move_to_end(sha)
+        if len(self._memory_cache) > self.MEMORY_CACHE_SIZE:
+            self._memory_cache.popitem(last=False)
     
     def analyze_user_resume(self, user_id: int, uploaded_file_path: str) -> Dict[str, Any]:
         """
@@ -34,12 +144,33 @@ class CVAnalysisService:
         try:
             logger.info(f"Starting resume analysis for user {user_id}")
             
-            # Validate file exists
-            if not os.path.exists(uploaded_file_path):
+            # Same file analysed before (retries, duplicate uploads): reuse the
+            # LLM output and only save the profile for this user. Opening the
+            # file for the hash also validates that it exists
+            try:
+                sha = self._file_sha256(uploaded_file_path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Resume file not found: {uploaded_file_path}")
-            
-            # Process CV and generate advice
-            result = analyze_user_cv(user_id, uploaded_file_path)
+            cached = self._get_cached_analysis(sha)
+            if cached is not None:
+                logger.info(f"Reusing cached resume analysis for user {user_id}")
+                analysis, career_advice = cached
+                result = {
+                    "success": True,
+                    "analysis": analysis,
+                    "career_advice": career_advice,
+                    "database_saved": self.analyzer.save_user_profile_to_db(
+                        user_id, analysis, "processed_cv.txt"
+                    )
+                }
+            else:
+                # Process CV and generate advice. The service's analyzer is reused so
+                # every analysis goes through the same LLM client and its open connections
+                result = self.analyzer.process_cv_and_generate_advice(user_id, uploaded_file_path)
+                # CVAnalyzer falls back to a default profile when the LLM output
+                # can't be parsed; that must not stick to this file forever
+                if result.get("success") and result.get("analysis", {}).get("full_name") != "Unknown":
+                    self._cache_analysis(sha, result.get("analysis", {}), result.get("career_advice"))
             
             if result.get("success"):
                 logger.info(f"Resume analysis completed successfully for user {user_id}")
@@ -73,6 +204,134 @@ class CVAnalysisService:
                 "error": str(e)
             }
     
+    async def analyze_user_resume_async(self, user_id: int, uploaded_file_path: str) -> Dict[str, Any]:
+        """
+        Async wrapper around analyze_user_resume for the API routes
+        
+        The LLM calls block, so they run in a worker thread and concurrent
+        uploads are analysed in parallel without stalling the event loop.
+        
+        Args:
+            user_id: User ID
+            uploaded_file_path: Path to uploaded resume file
+            
+        Returns:
+            Dict containing analysis results and career advice
+        """
+        return await asyncio.to_thread(self.analyze_user_resume, user_id, uploaded_file_path)
+    
+    @classmethod
+    def _profile_category(cls, analysis: Dict[str, Any]) -> Tuple[str, ...]:
+        """Categorical fields that must match exactly for advice to be shared"""
+        return tuple(
+            str(analysis.get(field) or "").strip().lower()
+            for field in cls.ADVICE_CATEGORICAL_FIELDS
+        )
+    
+    @classmethod
+    def _profile_summary(cls, analysis: Dict[str, Any]) -> str:
+        """Free text embedded for the advice cache (skills and experience only)"""
+        return "\n".join(str(analysis.get(field) or "") for field in cls.ADVICE_FREE_TEXT_FIELDS)
+    
+    @classmethod
+    def _advice_template(cls, advice: str, full_name: str) -> Optional[str]:
+        """
+        Replace the user's name in generated advice with name slots
+        
+        Args:
+            advice: Advice generated for this user
+            full_name: Name the advice was generated with
+            
+        Returns:
+            Shareable advice template, or None if part of the name would remain
+        """
+        parts = full_name.split()
+        if not parts:
+            return advice
+        
+        template = re.sub(r"\s+".join(map(re.escape, parts)), cls._FULL_NAME_SLOT, advice, flags=re.IGNORECASE)
+        template = re.sub(rf"\b{re.escape(parts[0])}\b", cls._FIRST_NAME_SLOT, template, flags=re.IGNORECASE)
+        
+        # Surnames used on their own would leak; particles (de, la, del) are ignored
+        for part in parts[1:]:
+            if len(part) > 3 and re.search(rf"\b{re.escape(part)}\b", template, flags=re.IGNORECASE):
+                return None
+        return template
+    
+    @classmethod
+    def _fill_advice(cls, template: str, full_name: str) -> str:
+        """Put the requester's name into a shared advice template"""
+        parts = full_name.split() or ["Usuario"]
+        return template.replace(cls._FULL_NAME_SLOT, " ".join(parts)).replace(cls._FIRST_NAME_SLOT, parts[0])
+    
+    def _get_similar_advice(self, category: Tuple[str, ...], embedding: np.ndarray) -> Optional[str]:
+        """
+        Find advice generated for a near-identical profile
+        
+        Args:
+            category: Categorical fields of the profile (see _profile_category)
+            embedding: Normalized embedding of the profile free text
+            
+        Returns:
+            Cached advice template or None if no profile is similar enough
+        """
+        with self._advice_lock:
+            rows = [index for index, cached in enumerate(self._advice_categories) if cached == category]
+            if not rows:
+                return None
+            scores = self._advice_embeddings[rows] @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.ADVICE_SIMILARITY_THRESHOLD:
+                return None
+            return self._advice_payloads[rows[best]]
+    
+    def _cache_advice(self, category: Tuple[str, ...], embedding: np.ndarray, template: str) -> None:
+        """Add an advice template to the semantic cache"""
+        keep = self.ADVICE_CACHE_SIZE - 1
+        with self._advice_lock:
+            if self._advice_embeddings is None:
+                self._advice_embeddings = embedding[None, :]
+            else:
+                self._advice_embeddings = np.vstack((self._advice_embeddings[-keep:], embedding))
+            self._advice_categories = self._advice_categories[-keep:] + [category]
+            self._advice_payloads = self._advice_payloads[-keep:] + [template]
+    
+    def _generate_profile_advice(self, analysis: Dict[str, Any]) -> str:
+        """
+        Career advice for a stored profile, reused across near-identical profiles
+        
+        Advice is always generated with the user's real name; it is shared
+        only as a template with the name replaced, and filled in with the
+        requester's name on a hit.
+        
+        Args:
+            analysis: Profile in the analysis format (see get_user_profile_analysis)
+            
+        Returns:
+            Career advice string
+        """
+        full_name = str(analysis.get("full_name") or "Usuario")
+        category = self._profile_category(analysis)
+        try:
+            embedding = get_embedding_service().generate_embedding(
+                self._profile_summary(analysis), normalize=True, return_numpy=True
+            )
+        except Exception as e:
+            logger.warning(f"Advice cache unavailable, calling the LLM directly: {e}")
+            return self.analyzer.generate_career_advice(analysis)
+        
+        template = self._get_similar_advice(category, embedding)
+        if template is not None:
+            logger.info("Reusing career advice from a similar profile")
+            return self._fill_advice(template, full_name)
+        
+        advice = self.analyzer.generate_career_advice(analysis)
+        if advice != CVAnalyzer.FALLBACK_ADVICE:
+            template = self._advice_template(advice, full_name)
+            if template is not None:
+                self._cache_advice(category, embedding, template)
+        return advice
+    
     def get_updated_career_advice(self, user_id: int) -> Dict[str, Any]:
         """
         Get updated career advice for existing user profile
@@ -84,7 +343,8 @@ class CVAnalysisService:
             Dict containing career advice
         """
         try:
-            advice = get_career_advice_for_profile(user_id)
+            analysis = get_user_profile_analysis(user_id)
+            advice = self._generate_profile_advice(analysis) if analysis else None
             
             if advice:
                 return {
@@ -106,6 +366,18 @@ class CVAnalysisService:
                 "error": str(e)
             }
     
+    async def get_updated_career_advice_async(self, user_id: int) -> Dict[str, Any]:
+        """
+        Async wrapper around get_updated_career_advice (runs in a worker thread)
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dict containing career advice
+        """
+        return await asyncio.to_thread(self.get_updated_career_advice, user_id)
+    
     def validate_resume_file(self, file_path: str) -> Dict[str, Any]:
         """
         Validate if the uploaded file is a valid resume format
@@ -127,8 +399,16 @@ class CVAnalysisService:
                 }
             
             # Check file size (max 5MB as per env config)
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
+                return {
+                    "valid": False,
+                    "message": "Archivo no encontrado"
+                }
+            
             max_size_mb = int(os.getenv("MAX_FILE_SIZE_MB", "5"))
-            file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+            file_size_mb = file_stat.st_size / (1024 * 1024)
             
             if file_size_mb > max_size_mb:
                 return {
@@ -3,18 +3,332 @@ CV Anonymizer - Versión modular para integración
 Anonimiza datos personales preservando experiencia profesional
 """
 
-import PyPDF2
 import spacy
 import fitz  # PyMuPDF
 import os
 import re
 import asyncio
+import threading
+import time
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass
 
 
-@dataclass
+# Pipelines spaCy compartidos por todo el proceso (se cargan una sola vez).
+# Por defecto se usa uno ligero basado en reglas; el modelo completo solo si se pide
+NLP_MODEL = "es_core_news_sm"
+NLP_DISABLED_COMPONENTS = ["parser", "lemmatizer", "attribute_ruler", "tagger", "morphologizer", "senter"]
+_NLP: Dict[bool, Any] = {}  # use_heavy_ner -> pipeline (False = el modelo no está instalado)
+_NLP_LOCK = threading.Lock()
+
+
+# Patrones de detección, compilados una sola vez por proceso
+PHONE_PATTERNS = [
+    r'\b(?:\+34|0034)?\s*[6-9]\d{2}\s*\d{2}\s*\d{2}\s*\d{2}\b',
+    r'\b(?:\+34|0034)?\s*[8-9]\d{1}\s*\d{3}\s*\d{2}\s*\d{2}\b',
+    r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{3}\b',
+    r'\b[6-9]\d{8}\b'
+]
+EMAIL_PATTERN = r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'
+
+# Todos los formatos de teléfono en una sola alternancia: el texto se recorre una vez
+_PHONE_RE = re.compile("|".join(f"(?:{pattern})" for pattern in PHONE_PATTERNS))
+_EMAIL_RE = re.compile(EMAIL_PATTERN, re.IGNORECASE)
+_FULL_NAME_RE = re.compile(r'\b([A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+\s+[A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+)\b')
+_DIGIT_RE = re.compile(r'\d')
+_NAME_CHARS_RE = re.compile(r'^[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ\s\-\'\.]+$')
+
+# Campos de metadatos que pueden contener datos personales
+_SENSITIVE_METADATA_FIELDS = frozenset({
+    '/Author', '/Creator', '/Producer', '/Subject', '/Title',
+    'author', 'creator', 'producer', 'subject', 'title', 'keywords'
+})
+
+# Filtros de exclusión muy básicos (solo palabras obviamente no nombres)
+_EXCLUDED_NAME_WORDS = frozenset({
+    'cv', 'curriculum', 'vitae', 'email', 'telefono', 'phone', 'mail',
+    'linkedin', 'github', 'www', 'com', 'org', 'net', 'http', 'https',
+    'pdf', 'doc', 'docx', 'html', 'css', 'javascript', 'python',
+    'años', 'año', 'experiencia', 'formacion', 'educacion',
+    'universidad', 'colegio', 'instituto', 'empresa', 'trabajo'
+})
+# Las palabras largas también excluyen cualquier nombre que las contenga
+# (una sola alternancia: una búsqueda por candidato en lugar de una por palabra)
+_EXCLUDED_NAME_SUBSTRINGS_RE = re.compile("|".join(
+    re.escape(word) for word in sorted(_EXCLUDED_NAME_WORDS, key=len, reverse=True) if len(word) > 3
+))
+_COMMON_NON_NAMES = frozenset({
+    'el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'en', 'con',
+    'por', 'para', 'que', 'como', 'sobre', 'desde', 'hasta', 'entre'
+})
+
+# Separadores que delimitan el fragmento donde se busca un email
+_EMAIL_SEPARATORS = (' ', '\n', '\t', '\r')
+
+# Separadores que se eliminan de un teléfono antes de validarlo (una sola pasada)
+_PHONE_SEPARATORS = str.maketrans('', '', ' -.')
+
+
+def _build_rule_based_nlp():
+    """
+    Construye un pipeline ligero para nombres: tokenizador español + EntityRuler
+    
+    Marca como PER secuencias de 2-3 palabras capitalizadas que no sean
+    palabras excluidas (cv, email, universidad...). No carga ningún modelo.
+    """
+    nlp = spacy.blank("es")
+    name_token = {"IS_TITLE": True, "IS_ALPHA": True, "LOWER": {"NOT_IN": sorted(_EXCLUDED_NAME_WORDS)}}
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "PER", "pattern": [name_token, name_token, {**name_token, "OP": "?"}]}
+    ])
+    return nlp
+
+
+def _get_nlp(verbose: bool = False, use_heavy_ner: bool = False):
+    """
+    Devuelve el pipeline spaCy compartido, cargándolo la primera vez (thread-safe)
+    
+    Args:
+        verbose: Si True, informa del resultado de la carga
+        use_heavy_ner: Si True, usa el modelo estadístico NLP_MODEL (solo NER activo)
+            en lugar del pipeline basado en reglas
+        
+    Returns:
+        Pipeline spaCy, o None si el modelo pedido no está instalado
+    """
+    if use_heavy_ner not in _NLP:
+        with _NLP_LOCK:
+            if use_heavy_ner not in _NLP:
+                if not use_heavy_ner:
+                    _NLP[use_heavy_ner] = _build_rule_based_nlp()
+                else:
+                    try:
+                        _NLP[use_heavy_ner] = spacy.load(NLP_MODEL, disable=NLP_DISABLED_COMPONENTS)
+                        if verbose:
+                            print("✅ Modelo spaCy cargado")
+                    except OSError:
+                        if verbose:
+                            print(f"⚠️ Modelo spaCy '{NLP_MODEL}' no encontrado. Funcionando con patrones básicos.")
+                            print(f"💡 Para mejor detección, instalar con: python -m spacy download {NLP_MODEL}")
+                        _NLP[use_heavy_ner] = False
+    return _NLP[use_heavy_ner] or None
+
+
+# Aspecto de las zonas redactadas y del texto de reemplazo
+REDACTION_FILL = (1.0, 1.0, 1.0)
+REPLACEMENT_COLOR = (0.0, 0.0, 0.0)
+REPLACEMENT_FONT = "helv"
+REPLACEMENT_FONTSIZE = 10.0  # Tamaño de fuente más pequeño para mejor ajuste
+
+# A partir de este número de páginas la anonimización se reparte entre procesos;
+# en CVs cortos arrancar el pool cuesta más de lo que se gana
+PARALLEL_MIN_PAGES = 4
+
+
+def _mostly_covered(area: fitz.Rect, marked: fitz.Rect) -> bool:
+    """Indica si más de la mitad de area queda dentro de una zona ya marcada"""
+    overlap = fitz.Rect(area) & marked
+    return not overlap.is_empty and overlap.get_area() > 0.5 * area.get_area()
+
+
+def _redact_page(page: fitz.Page, page_num: int, replacements: List[Tuple[str, str]], verbose: bool = False) -> int:
+    """
+    Sustituye en una página las ocurrencias de cada reemplazo
+    
+    Args:
+        page: Página a modificar
+        page_num: Índice de la página (solo para los mensajes)
+        replacements: Pares (original, reemplazo) ordenados de más largo a más corto
+        verbose: Si True, muestra información detallada
+        
+    Returns:
+        Número de reemplazos realizados en la página
+    """
+    # La página se analiza una sola vez (TextPage con los flags de search_for)
+    # y todas las búsquedas la reutilizan en lugar de extraerla de nuevo
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_SEARCH)
+    
+    # Con su texto se descartan los reemplazos que no están en la página
+    page_text = " ".join(page.get_text(textpage=textpage).lower().split())
+    
+    # Pasada 1: marcar todas las redacciones de la página. Los reemplazos
+    # van de más largo a más corto, así que una ocurrencia dentro de una
+    # zona ya marcada (p. ej. el nombre dentro del nombre completo) se omite
+    pending = []
+    for original, replacement in replacements:
+        # Forma normalizada (minúsculas, espacios colapsados) para descartar
+        # rápidamente los reemplazos que no están en la página
+        if " ".join(original.lower().split()) not in page_text:
+            continue
+        
+        areas = [
+            area for area in page.search_for(original, textpage=textpage)
+            if not any(_mostly_covered(area, marked) for marked, _ in pending)
+        ]
+        
+        if areas:
+            if verbose:
+                print(f"   📄 Página {page_num + 1}: Encontradas {len(areas)} ocurrencias de '{original}'")
+            
+            for area in areas:
+                # Crear anotación de redacción (cubre el texto original)
+                page.add_redact_annot(area, fill=REDACTION_FILL)
+                pending.append((area, replacement))
+    
+    if not pending:
+        return 0
+    
+    # Aplicar todas las redacciones de la página de una vez
+    page.apply_redactions()
+    
+    # Pasada 2: insertar el texto de reemplazo
+    for area, replacement in pending:
+        try:
+            page.insert_text(
+                (area.x0, area.y1 - 2),
+                replacement,
+                fontsize=REPLACEMENT_FONTSIZE,
+                color=REPLACEMENT_COLOR,
+                fontname=REPLACEMENT_FONT
+            )
+        except Exception as e:
+            if verbose:
+                print(f"⚠️ Error insertando texto en página {page_num + 1}: {e}")
+    
+    if verbose:
+        print(f"✅ Página {page_num + 1}: {len(pending)} reemplazos realizados")
+    
+    return len(pending)
+
+
+def _anonymize_pages(job: Tuple[bytes, int, List[Tuple[str, str]], bool]) -> Tuple[bytes, int]:
+    """
+    Trabajo de un proceso del pool: anonimiza un PDF con un tramo de páginas consecutivas
+    
+    Args:
+        job: (bytes del PDF del tramo, índice original de su primera página, reemplazos, verbose)
+        
+    Returns:
+        (bytes del PDF anonimizado, número de reemplazos realizados)
+    """
+    pdf_bytes, first_page, replacements, verbose = job
+    with fitz.open("pdf", pdf_bytes) as doc:
+        count = sum(
+            _redact_page(page, first_page + offset, replacements, verbose)
+            for offset, page in enumerate(doc)
+        )
+        return doc.tobytes(), count
+
+
+# Enlaces que apuntan a otra página del mismo documento
+_INTERNAL_LINK_KINDS = (fitz.LINK_GOTO, fitz.LINK_NAMED)
+
+# Pool de procesos para la anonimización en paralelo, compartido por todo el
+# proceso (se crea la primera vez que se usa y se recrea si se rompe)
+_PAGE_POOL: Optional[ProcessPoolExecutor] = None
+_PAGE_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_PAGE_POOL_LOCK = threading.Lock()
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    """Devuelve el pool de procesos compartido (thread-safe)"""
+    global _PAGE_POOL
+    
+    if _PAGE_POOL is None:
+        with _PAGE_POOL_LOCK:
+            if _PAGE_POOL is None:
+                # Sin fork: el servidor tiene hilos (uvicorn, torch, el loop de fondo)
+                # y un fork desde un proceso multihilo puede heredar locks tomados
+                _PAGE_POOL = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context(_PAGE_POOL_START_METHOD)
+                )
+    return _PAGE_POOL
+
+
+def _discard_page_pool() -> None:
+    """Descarta el pool compartido tras un fallo para que se cree uno nuevo"""
+    global _PAGE_POOL
+    
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is not None:
+            _PAGE_POOL.shutdown(wait=False, cancel_futures=True)
+            _PAGE_POOL = None
+
+
+# Loop asyncio de fondo para las consultas a la BD desde código síncrono
+# (un único hilo para todo el proceso, arrancado la primera vez que se usa)
+USER_DATA_TIMEOUT_SECONDS = 10
+_BG_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_BG_LOOP_LOCK = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Devuelve el loop de fondo compartido, arrancando su hilo la primera vez (thread-safe)"""
+    global _BG_LOOP
+    
+    if _BG_LOOP is None:
+        with _BG_LOOP_LOCK:
+            if _BG_LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="cv-anonymizer-loop", daemon=True
+                ).start()
+                _BG_LOOP = loop
+    return _BG_LOOP
+
+
+# Perfiles de usuario ya consultados (LRU con caducidad). Quien modifique
+# user_personal_info debe llamar a invalidate_user(user_id)
+USER_DATA_CACHE_SIZE = 1024
+USER_DATA_CACHE_TTL_SECONDS = 300
+_USER_DATA_CACHE: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()
+_USER_DATA_CACHE_LOCK = threading.Lock()
+
+
+def _get_cached_user_data(user_id: int) -> Optional[Dict]:
+    """Devuelve el perfil cacheado del usuario si no ha caducado"""
+    with _USER_DATA_CACHE_LOCK:
+        cached = _USER_DATA_CACHE.get(user_id)
+        if cached is None:
+            return None
+        
+        cached_at, user_data = cached
+        if time.monotonic() - cached_at > USER_DATA_CACHE_TTL_SECONDS:
+            del _USER_DATA_CACHE[user_id]
+            return None
+        
+        _USER_DATA_CACHE.move_to_end(user_id)
+        return user_data
+
+
+def _cache_user_data(user_id: int, user_data: Dict) -> None:
+    """Guarda el perfil del usuario, descartando el más antiguo si se llena"""
+    with _USER_DATA_CACHE_LOCK:
+        _USER_DATA_CACHE[user_id] = (time.monotonic(), user_data)
+        _USER_DATA_CACHE.move_to_end(user_id)
+        if len(_USER_DATA_CACHE) > USER_DATA_CACHE_SIZE:
+            _USER_DATA_CACHE.popitem(last=False)
+
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Descarta el perfil cacheado de un usuario
+    
+    Args:
+        user_id: ID del usuario cuyo perfil ha cambiado o se ha eliminado
+    """
+    with _USER_DATA_CACHE_LOCK:
+        _USER_DATA_CACHE.pop(user_id, None)
+
+
+@dataclass(slots=True)
 class AnonymizationResult:
     """Resultado del proceso de anonimización"""
     success: bool
@@ -25,7 +339,7 @@ class AnonymizationResult:
     details: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonalData:
     """Datos personales detectados"""
     names: List[str]
@@ -37,16 +351,23 @@ class PersonalData:
 class CVAnonymizer:
     """Anonimizador de CVs - versión modular y silenciosa"""
     
-    def __init__(self, verbose: bool = False, custom_replacements: Optional[Dict[str, str]] = None):
+    def __init__(
+        self,
+        verbose: bool = False,
+        custom_replacements: Optional[Dict[str, str]] = None,
+        use_heavy_ner: bool = False
+    ):
         """
         Inicializa el anonimizador
         
         Args:
             verbose: Si True, muestra información detallada
             custom_replacements: Reemplazos personalizados {'tipo': 'valor'}
+            use_heavy_ner: Si True, nlp usa el modelo estadístico es_core_news_sm
+                en lugar del pipeline ligero basado en reglas
         """
         self.verbose = verbose
-        self._load_nlp_model()
+        self.use_heavy_ner = use_heavy_ner
         
         # Datos de reemplazo por defecto
         self.replacements = {
@@ -62,17 +383,10 @@ class CVAnonymizer:
         # Patrones de detección
         self._setup_patterns()
     
-    def _load_nlp_model(self) -> None:
-        """Carga el modelo de spaCy si está disponible"""
-        try:
-            self.nlp = spacy.load("es_core_news_sm")
-            if self.verbose:
-                print("✅ Modelo spaCy cargado")
-        except OSError:
-            if self.verbose:
-                print("⚠️ Modelo spaCy 'es_core_news_sm' no encontrado. Funcionando con patrones básicos.")
-                print("💡 Para mejor detección, instalar con: python -m spacy download es_core_news_sm")
-            self.nlp = None
+    @property
+    def nlp(self):
+        """Pipeline de spaCy compartido, cargado la primera vez que se necesita (None si no está instalado)"""
+        return _get_nlp(self.verbose, self.use_heavy_ner)
     
     def _get_user_data(self, user_id: int) -> Optional[Dict]:
         """
@@ -84,93 +398,77 @@ class CVAnonymizer:
         Returns:
             Diccionario con los datos del usuario o None si no se encuentra
         """
+        # El mismo usuario se anonimiza a menudo varias veces (resubidas, reintentos)
+        user_data = _get_cached_user_data(user_id)
+        if user_data is not None:
+            return user_data
+        
         try:
             # Importar aquí para evitar imports circulares
             from models.user_profile import UserPersonalInfoQueries
             
-            # Verificar si ya hay un loop activo
+            # La consulta asíncrona se ejecuta en el loop de fondo compartido,
+            # tanto si se llama desde código síncrono como desde un loop activo
+            future = asyncio.run_coroutine_threadsafe(
+                UserPersonalInfoQueries.get_profile_by_user_id(user_id),
+                _get_background_loop()
+            )
             try:
-                loop = asyncio.get_running_loop()
-                # Si hay un loop activo, crear una nueva tarea
-                if loop.is_running():
-                    # Usar un nuevo hilo para ejecutar la operación asíncrona
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(self._run_async_query, user_id)
-                        user_data = future.result()
-                        return user_data
-                else:
-                    # Si no hay loop activo, crear uno nuevo
-                    user_data = loop.run_until_complete(
-                        UserPersonalInfoQueries.get_profile_by_user_id(user_id)
-                    )
-                    return user_data
-            except RuntimeError:
-                # No hay loop activo, crear uno nuevo
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    user_data = loop.run_until_complete(
-                        UserPersonalInfoQueries.get_profile_by_user_id(user_id)
-                    )
-                    return user_data
-                finally:
-                    loop.close()
-                    
+                user_data = future.result(timeout=USER_DATA_TIMEOUT_SECONDS)
+            except BaseException:
+                future.cancel()
+                raise
+            
+            if user_data is not None:
+                _cache_user_data(user_id, user_data)
+            return user_data
+        
         except Exception as e:
             if self.verbose:
                 print(f"⚠️ Error obteniendo datos del usuario {user_id}: {e}")
             return None
     
-    def _run_async_query(self, user_id: int) -> Optional[Dict]:
-        """Ejecuta la consulta asíncrona en un nuevo loop"""
-        import asyncio
-        from models.user_profile import UserPersonalInfoQueries
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(
-                UserPersonalInfoQueries.get_profile_by_user_id(user_id)
-            )
-        finally:
-            loop.close()
-    
     def _setup_patterns(self) -> None:
         """Configura los patrones de detección"""
-        self.phone_patterns = [
-            r'\b(\+34|0034)?\s*[6-9]\d{2}\s*\d{2}\s*\d{2}\s*\d{2}\b',
-            r'\b(\+34|0034)?\s*[8-9]\d{1}\s*\d{3}\s*\d{2}\s*\d{2}\b',
-            r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{3}\b',
-            r'\b[6-9]\d{8}\b'
-        ]
+        self.phone_patterns = PHONE_PATTERNS
+        self.email_pattern = EMAIL_PATTERN
         
-        self.email_pattern = r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'
+        # Versiones compiladas (compartidas a nivel de módulo)
+        self._phone_re = _PHONE_RE
+        self._email_re = _EMAIL_RE
+        self._name_re = _FULL_NAME_RE
         
-        self.sensitive_metadata_fields = {
-            '/Author', '/Creator', '/Producer', '/Subject', '/Title',
-            'author', 'creator', 'producer', 'subject', 'title', 'keywords'
-        }
+        self.sensitive_metadata_fields = _SENSITIVE_METADATA_FIELDS
     
-    def extract_personal_data(self, pdf_path: str, user_data: Optional[Dict] = None) -> PersonalData:
+    def extract_personal_data(
+        self,
+        pdf_path: str,
+        user_data: Optional[Dict] = None,
+        doc: Optional[fitz.Document] = None
+    ) -> PersonalData:
         """
         Extrae datos personales del PDF usando datos específicos del usuario
         
         Args:
             pdf_path: Ruta al archivo PDF
             user_data: Datos del usuario obtenidos de la base de datos
+            doc: Documento ya abierto (si no se indica, se abre pdf_path)
             
         Returns:
             PersonalData con todos los datos encontrados (usando datos del usuario si están disponibles)
         """
+        if doc is None:
+            with self._open(pdf_path) as opened_doc:
+                return self.extract_personal_data(pdf_path, user_data, opened_doc)
+        
         if self.verbose:
             print(f"📄 Analizando: {os.path.basename(pdf_path)}")
         
         # Extraer texto
-        text = self._extract_text(pdf_path)
+        text = self._extract_text(doc)
         
         # Extraer metadatos
-        metadata, metadata_issues = self._analyze_metadata(pdf_path)
+        metadata, metadata_issues = self._analyze_metadata(doc)
         
         # Detectar datos personales usando información del usuario si está disponible
         names = self._detect_user_names_from_db(text, user_data)  # Detectar nombres específicos del usuario
@@ -204,41 +502,12 @@ class CVAnonymizer:
                 if self.verbose and user_data:
                     print(f"👤 Datos del usuario obtenidos: {user_data.get('full_name', 'N/A')}")
             
-            # Extraer datos personales del PDF
-            personal_data = self.extract_personal_data(pdf_path, user_data)
-            
-            # Verificar si hay datos para anonimizar (incluye nombres del usuario)
-            total_personal = len(personal_data.names) + len(personal_data.phones) + len(personal_data.emails)
-            total_metadata = len(personal_data.metadata_issues)
-            
-            if total_personal == 0 and total_metadata == 0:
-                if self.verbose:
-                    print("ℹ️ No se encontraron datos personales")
-                return AnonymizationResult(
-                    success=True,
-                    personal_data_count=0,
-                    metadata_count=0,
-                    details={'message': 'No personal data found'}
-                )
-            
-            # Procesar anonimización
-            output_file = self._process_anonymization(pdf_path, personal_data, output_name)
-            
-            if self.verbose:
-                print(f"✅ Anonimizado: {output_file}")
-                print(f"📊 Datos personales: {total_personal}, Metadatos: {total_metadata}")
-            
-            return AnonymizationResult(
-                success=True,
-                output_file=output_file,
-                personal_data_count=total_personal,
-                metadata_count=total_metadata,
-                details={
-                    'names_found': len(personal_data.names),  # Nombres específicos del usuario
-                    'phones_found': len(personal_data.phones),
-                    'emails_found': len(personal_data.emails)
-                }
-            )
+            # El PDF se abre una sola vez: análisis, limpieza de metadatos y redacción
+            doc = self._open(pdf_path)
+            try:
+                return self._anonymize_document(doc, pdf_path, output_name, user_data)
+            finally:
+                doc.close()
             
         except Exception as e:
             return AnonymizationResult(
@@ -246,43 +515,77 @@ class CVAnonymizer:
                 error_message=str(e)
             )
     
-    def _extract_text(self, pdf_path: str) -> str:
+    def _anonymize_document(
+        self,
+        doc: fitz.Document,
+        pdf_path: str,
+        output_name: Optional[str],
+        user_data: Optional[Dict]
+    ) -> AnonymizationResult:
+        """Anonimiza un documento ya abierto (ver anonymize)"""
+        # Extraer datos personales del PDF
+        personal_data = self.extract_personal_data(pdf_path, user_data, doc)
+        
+        # Verificar si hay datos para anonimizar (incluye nombres del usuario)
+        total_personal = len(personal_data.names) + len(personal_data.phones) + len(personal_data.emails)
+        total_metadata = len(personal_data.metadata_issues)
+        
+        if total_personal == 0 and total_metadata == 0:
+            if self.verbose:
+                print("ℹ️ No se encontraron datos personales")
+            return AnonymizationResult(
+                success=True,
+                personal_data_count=0,
+                metadata_count=0,
+                details={'message': 'No personal data found'}
+            )
+        
+        # Procesar anonimización
+        output_file = self._process_anonymization(doc, personal_data, output_name)
+        
+        if self.verbose:
+            print(f"✅ Anonimizado: {output_file}")
+            print(f"📊 Datos personales: {total_personal}, Metadatos: {total_metadata}")
+        
+        return AnonymizationResult(
+            success=True,
+            output_file=output_file,
+            personal_data_count=total_personal,
+            metadata_count=total_metadata,
+            details={
+                'names_found': len(personal_data.names),  # Nombres específicos del usuario
+                'phones_found': len(personal_data.phones),
+                'emails_found': len(personal_data.emails)
+            }
+        )
+    
+    def _open(self, pdf_path: str) -> fitz.Document:
+        """Abre el PDF con PyMuPDF"""
+        return fitz.open(pdf_path)
+    
+    def _extract_text(self, doc: fitz.Document) -> str:
         """Extrae texto del PDF"""
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        return text
-    
-    def _analyze_metadata(self, pdf_path: str) -> Tuple[Dict, Dict]:
+        return "\n".join(page.get_text() for page in doc)
+    
+    def _analyze_metadata(self, doc: fitz.Document) -> Tuple[Dict, Dict]:
         """Analiza metadatos del PDF"""
         metadata = {}
         metadata_issues = {}
         
         try:
-            # PyPDF2 metadata
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                if reader.metadata:
-                    for key, value in reader.metadata.items():
-                        if value:
-                            metadata[key] = value
+            if doc.metadata:
+                metadata = {key: value for key, value in doc.metadata.items() if value}
             
-            # PyMuPDF metadata
-            doc = fitz.open(pdf_path)
-            fitz_metadata = doc.metadata
-            if fitz_metadata:
-                for key, value in fitz_metadata.items():
-                    if value and key not in metadata:
-                        metadata[key] = value
-            doc.close()
-            
-            # Evaluar metadatos sensibles
+            # Evaluar metadatos sensibles. Varios campos suelen repetir el mismo
+            # valor (autor, creador...): cada valor distinto se comprueba una vez
+            checked: Dict[str, bool] = {}
             for key, value in metadata.items():
                 key_clean = key.lower().replace('/', '')
                 if key in self.sensitive_metadata_fields or key_clean in self.sensitive_metadata_fields:
-                    if self._contains_personal_info(str(value)):
+                    text = str(value)
+                    if text not in checked:
+                        checked[text] = self._contains_personal_info(text)
+                    if checked[text]:
                         metadata_issues[key] = value
                         
         except Exception as e:
@@ -294,19 +597,18 @@ class CVAnonymizer:
     def _contains_personal_info(self, text: str) -> bool:
         """Verifica si el texto contiene información personal"""
         # Buscar emails (criterio principal para metadatos)
-        if re.search(self.email_pattern, text, re.IGNORECASE):
+        if '@' in text and self._email_re.search(text):
             return True
-            
-        # Buscar patrones de nombres simples
-        name_pattern = r'\b([A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+\s+[A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+)\b'
-        names = re.findall(name_pattern, text)
-        
-        # Verificar si hay nombres que parezcan reales (al menos 2 palabras capitalizadas)
-        for name in names:
-            if len(name.strip()) > 5:  # Filtro básico por longitud
-                return True
-            
-        return False
+        
+        # Buscar nombres que parezcan reales (al menos 2 palabras capitalizadas).
+        # Sin ninguna mayúscula no puede haberlos: islower() evita el regex
+        if text.islower():
+            return False
+        
+        return any(
+            len(match.group(1).strip()) > 5  # Filtro básico por longitud
+            for match in self._name_re.finditer(text)
+        )
     
 
     
@@ -320,33 +622,17 @@ class CVAnonymizer:
             return False
         
         # Solo letras válidas y algunos caracteres especiales
-        if not re.match(r'^[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ\s\-\'\.]+$', name):
+        if not _NAME_CHARS_RE.match(name):
             return False
         
-        # Filtros de exclusión muy básicos (solo palabras obviamente no nombres)
-        excluded_words = {
-            'cv', 'curriculum', 'vitae', 'email', 'telefono', 'phone', 'mail',
-            'linkedin', 'github', 'www', 'com', 'org', 'net', 'http', 'https',
-            'pdf', 'doc', 'docx', 'html', 'css', 'javascript', 'python',
-            'años', 'año', 'experiencia', 'formacion', 'educacion',
-            'universidad', 'colegio', 'instituto', 'empresa', 'trabajo'
-        }
-        
         # Verificar si contiene palabras claramente excluidas
         name_lower = name.lower()
-        for excluded in excluded_words:
-            if excluded == name_lower or (len(excluded) > 3 and excluded in name_lower):
-                return False
+        if name_lower in _EXCLUDED_NAME_WORDS or _EXCLUDED_NAME_SUBSTRINGS_RE.search(name_lower):
+            return False
         
         # Si es una sola palabra, verificar que no sea una palabra común no-nombre
-        if len(words) == 1:
-            word_lower = words[0].lower()
-            common_non_names = {
-                'el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'en', 'con',
-                'por', 'para', 'que', 'como', 'sobre', 'desde', 'hasta', 'entre'
-            }
-            if word_lower in common_non_names:
-                return False
+        if len(words) == 1 and words[0].lower() in _COMMON_NON_NAMES:
+            return False
         
         # Verificar que al menos una palabra empiece con mayúscula
         if not any(word[0].isupper() for word in words if word):
@@ -358,14 +644,16 @@ class CVAnonymizer:
     
     def _filter_duplicate_names(self, names: List[str]) -> List[str]:
         """Filtra nombres duplicados o contenidos en otros"""
-        sorted_names = sorted(names, key=len, reverse=True)
+        # De más largo a más corto: los ya aceptados se acumulan en un único
+        # texto separado por '\0', así cada comprobación es una sola búsqueda
+        sorted_names = sorted(dict.fromkeys(names), key=len, reverse=True)
         filtered = []
+        accepted = ""
         
         for name in sorted_names:
-            is_subset = any(name != filtered_name and name in filtered_name 
-                          for filtered_name in filtered)
-            if not is_subset:
+            if name not in accepted:
                 filtered.append(name)
+                accepted += name + "\0"
         
         return filtered
     
@@ -373,16 +661,15 @@ class CVAnonymizer:
         """Detecta números de teléfono"""
         phones = set()
         
-        for pattern in self.phone_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if isinstance(match, tuple):
-                    phone = ''.join(match).strip()
-                else:
-                    phone = match.strip()
-                
-                if self._is_valid_phone(phone):
-                    phones.add(phone)
+        # Sin ningún dígito no puede haber teléfonos: se evita el regex completo
+        if not _DIGIT_RE.search(text):
+            return []
+        
+        # Una sola pasada sobre el texto con todos los formatos
+        for match in self._phone_re.finditer(text):
+            phone = match.group(0).strip()
+            if self._is_valid_phone(phone):
+                phones.add(phone)
         
         return list(phones)
     
@@ -402,7 +689,18 @@ class CVAnonymizer:
     
     def _detect_emails(self, text: str) -> List[str]:
         """Detecta direcciones de email"""
-        emails = re.findall(self.email_pattern, text, re.IGNORECASE)
+        # Un email no contiene espacios: el regex solo se ejecuta sobre el
+        # fragmento entre espacios que rodea cada '@' (localizado con str.find)
+        emails = []
+        stop = 0
+        at = text.find('@')
+        while at != -1:
+            start = max(stop, max(text.rfind(sep, stop, at) for sep in _EMAIL_SEPARATORS) + 1)
+            ends = [end for end in (text.find(sep, at) for sep in _EMAIL_SEPARATORS) if end != -1]
+            stop = min(ends, default=len(text))
+            emails.extend(self._email_re.findall(text, start, stop))
+            at = text.find('@', stop)
+        
         return [email.strip() for email in emails]
     
     def _detect_emails_with_user_data(self, text: str, user_data: Optional[Dict] = None) -> List[str]:
@@ -442,17 +740,22 @@ class CVAnonymizer:
         if self.verbose:
             print(f"🔍 Buscando el nombre '{full_name}' en el documento...")
         
+        # Texto en minúsculas calculado una sola vez para todas las búsquedas
+        text_lower = text.lower()
+        
         # Buscar el nombre completo
-        if full_name.lower() in text.lower():
+        full_name_found = full_name.lower() in text_lower
+        if full_name_found:
             names_found.append(full_name)
             if self.verbose:
                 print(f"✅ Nombre completo encontrado: '{full_name}'")
         
-        # También buscar partes del nombre (nombre y apellidos por separado)
+        # También buscar partes del nombre (nombre y apellidos por separado).
+        # Si el nombre completo está en el texto, sus partes también: no se recorre de nuevo
         name_parts = full_name.split()
         if len(name_parts) > 1:
             for part in name_parts:
-                if len(part) >= 3 and part.lower() in text.lower():
+                if len(part) >= 3 and (full_name_found or part.lower() in text_lower):
                     # Verificar que no esté ya en la lista
                     if part not in names_found:
                         names_found.append(part)
@@ -469,54 +772,53 @@ class CVAnonymizer:
     
     def _is_valid_phone(self, phone: str) -> bool:
         """Valida si un teléfono es válido"""
-        clean_phone = phone.replace(' ', '').replace('-', '').replace('.', '')
-        return phone and len(clean_phone) >= 9 and clean_phone.isdigit()
+        clean_phone = phone.translate(_PHONE_SEPARATORS)
+        return len(clean_phone) >= 9 and clean_phone.isdigit()
     
-    def _process_anonymization(self, pdf_path: str, personal_data: PersonalData, output_name: Optional[str]) -> str:
-        """Procesa la anonimización completa"""
-        temp_files = []
+    def _process_anonymization(self, doc: fitz.Document, personal_data: PersonalData, output_name: Optional[str]) -> str:
+        """Procesa la anonimización completa sobre el documento abierto y lo guarda"""
+        # Limpiar metadatos si es necesario
+        if personal_data.metadata_issues:
+            self._clean_metadata(doc)
+        
+        # Anonimizar contenido si es necesario (incluye nombres del usuario)
+        total_content_data = len(personal_data.names) + len(personal_data.phones) + len(personal_data.emails)
+        if total_content_data > 0:
+            self._anonymize_content(doc, personal_data)
+        
+        # Guardar archivo final
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = output_name or f"cv_anonimo_{timestamp}.pdf"
         
         try:
-            working_file = pdf_path
-            
-            # Limpiar metadatos si es necesario
-            if personal_data.metadata_issues:
-                temp_metadata_file = self._clean_metadata(pdf_path)
-                if temp_metadata_file:
-                    temp_files.append(temp_metadata_file)
-                    working_file = temp_metadata_file
-            
-            # Anonimizar contenido si es necesario (incluye nombres del usuario)
-            total_content_data = len(personal_data.names) + len(personal_data.phones) + len(personal_data.emails)
-            
-            if total_content_data > 0:
-                output_file = self._anonymize_content(working_file, personal_data, output_name)
-            else:
-                # Solo metadatos, renombrar archivo temporal
-                if temp_files:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    output_file = output_name or f"cv_anonimo_{timestamp}.pdf"
-                    os.rename(temp_files[0], output_file)
-                    temp_files.remove(temp_files[0])
-                else:
-                    output_file = output_name or f"cv_anonimo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            
-            return output_file
-            
+            self._save(doc, output_file)
+            if self.verbose:
+                print(f"💾 Archivo guardado: {output_file}")
+        except Exception as e:
+            if self.verbose:
+                print(f"❌ Error guardando archivo: {e}")
+            raise
+        
+        return output_file
+    
+    def _save(self, doc: fitz.Document, output_file: str) -> None:
+        """Guarda el documento; si es el mismo archivo de origen, vía temporal + reemplazo atómico"""
+        if os.path.abspath(output_file) != os.path.abspath(doc.name or ""):
+            doc.save(output_file)
+            return
+        
+        # PyMuPDF no permite reescribir por completo el archivo abierto
+        temp_file = f"{output_file}.tmp"
+        try:
+            doc.save(temp_file)
+            os.replace(temp_file, output_file)
         finally:
-            # Limpiar archivos temporales
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except Exception:
-                    pass
-    
-    def _clean_metadata(self, pdf_path: str) -> Optional[str]:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    
+    def _clean_metadata(self, doc: fitz.Document) -> None:
         """Limpia metadatos del PDF"""
         try:
-            doc = fitz.open(pdf_path)
-            
             clean_metadata = {
                 'author': 'Usuario Anónimo',
                 'creator': 'CV Anónimo',
@@ -530,23 +832,12 @@ class CVAnonymizer:
             
             doc.set_metadata(clean_metadata)
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            temp_file = f"temp_metadata_{timestamp}.pdf"
-            
-            doc.save(temp_file)
-            doc.close()
-            
-            return temp_file
-            
         except Exception as e:
             if self.verbose:
                 print(f"⚠️ Error limpiando metadatos: {e}")
-            return None
     
-    def _anonymize_content(self, pdf_path: str, personal_data: PersonalData, output_name: Optional[str]) -> str:
+    def _anonymize_content(self, doc: fitz.Document, personal_data: PersonalData) -> None:
         """Anonimiza el contenido del PDF en todas las páginas (incluye nombres específicos del usuario)"""
-        doc = fitz.open(pdf_path)
-        
         # Preparar reemplazos (incluye nombres del usuario de la BD)
         replacements = []
         
@@ -569,67 +860,76 @@ class CVAnonymizer:
             for orig, repl in replacements:
                 print(f"   '{orig}' → '{repl}'")
         
-        # Procesar todas las páginas del documento
-        total_replacements = 0
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_replacements = 0
-            
-            # Realizar reemplazos en esta página
-            for original, replacement in replacements:
-                areas = page.search_for(original)
-                
-                if areas:
-                    if self.verbose:
-                        print(f"   📄 Página {page_num + 1}: Encontradas {len(areas)} ocurrencias de '{original}'")
-                    
-                    for area in areas:
-                        # Crear anotación de redacción (cubre el texto original)
-                        page.add_redact_annot(area, fill=(1, 1, 1))
-                    
-                    # Aplicar las redacciones
-                    page.apply_redactions()
-                    
-                    # Insertar el texto de reemplazo
-                    for area in areas:
-                        insertion_point = fitz.Point(area.x0, area.y1 - 2)
-                        try:
-                            page.insert_text(
-                                insertion_point,
-                                replacement,
-                                fontsize=10.0,  # Tamaño de fuente más pequeño para mejor ajuste
-                                color=(0, 0, 0),
-                                fontname="helv"
-                            )
-                        except Exception as e:
-                            if self.verbose:
-                                print(f"⚠️ Error insertando texto en página {page_num + 1}: {e}")
-                    
-                    page_replacements += len(areas)
-                    total_replacements += len(areas)
-            
-            if self.verbose and page_replacements > 0:
-                print(f"✅ Página {page_num + 1}: {page_replacements} reemplazos realizados")
+        total_replacements = None
+        if len(doc) >= PARALLEL_MIN_PAGES and (os.cpu_count() or 1) > 1:
+            total_replacements = self._anonymize_pages_parallel(doc, replacements)
+        
+        # Documentos cortos, una sola CPU o pool no disponible: página a página
+        if total_replacements is None:
+            total_replacements = sum(
+                _redact_page(doc[page_num], page_num, replacements, self.verbose)
+                for page_num in range(len(doc))
+            )
         
         if self.verbose:
             print(f"✅ Total de reemplazos realizados: {total_replacements}")
+    
+    def _anonymize_pages_parallel(self, doc: fitz.Document, replacements: List[Tuple[str, str]]) -> Optional[int]:
+        """
+        Anonimiza las páginas en paralelo, un tramo de páginas por proceso, y las vuelve a ensamblar en doc
         
-        # Guardar archivo final
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = output_name or f"cv_anonimo_{timestamp}.pdf"
+        Args:
+            doc: Documento abierto (se modifica in situ)
+            replacements: Pares (original, reemplazo) ordenados de más largo a más corto
+            
+        Returns:
+            Total de reemplazos realizados, o None si no se pudo usar el pool
+        """
+        page_count = len(doc)
+        
+        # Un tramo de páginas consecutivas por proceso: menos PDFs que serializar
+        workers = min(os.cpu_count() or 1, page_count)
+        chunk_size = -(-page_count // workers)
+        jobs = []
+        for first_page in range(0, page_count, chunk_size):
+            chunk = fitz.open()
+            chunk.insert_pdf(doc, from_page=first_page, to_page=min(first_page + chunk_size, page_count) - 1)
+            jobs.append((chunk.tobytes(), first_page, replacements, self.verbose))
+            chunk.close()
         
         try:
-            doc.save(output_file)
-            if self.verbose:
-                print(f"💾 Archivo guardado: {output_file}")
-        except Exception as e:
+            results = list(_get_page_pool().map(_anonymize_pages, jobs))
+        except (OSError, BrokenProcessPool) as e:
+            _discard_page_pool()
             if self.verbose:
-                print(f"❌ Error guardando archivo: {e}")
-            raise
-        finally:
-            doc.close()
+                print(f"⚠️ No se pudo paralelizar la anonimización ({e}). Procesando en serie...")
+            return None
         
-        return output_file
+        # Marcadores y enlaces internos apuntan a páginas concretas: se guardan
+        # antes de reconstruir y se restauran sobre las páginas nuevas
+        toc = doc.get_toc(simple=False)
+        internal_links = [
+            [link for link in page.get_links() if link["kind"] in _INTERNAL_LINK_KINDS]
+            for page in doc
+        ]
+        
+        # Añadir las páginas anonimizadas al final y quitar las originales;
+        # así se conserva el propio doc (metadatos ya limpios, ruta de origen)
+        for chunk_bytes, _ in results:
+            with fitz.open("pdf", chunk_bytes) as chunk_doc:
+                doc.insert_pdf(chunk_doc)
+        doc.delete_pages(0, page_count - 1)
+        
+        for page, links in zip(doc, internal_links):
+            # Los enlaces que sobrevivieron dentro de un tramo se sustituyen por los originales
+            for link in page.get_links():
+                if link["kind"] in _INTERNAL_LINK_KINDS:
+                    page.delete_link(link)
+            for link in links:
+                page.insert_link(link)
+        doc.set_toc(toc)
+        
+        return sum(count for _, count in results)
 
 
 def anonymize_cv(
@@ -652,10 +952,26 @@ def anonymize_cv(
     Returns:
         AnonymizationResult con el resultado
     """
-    anonymizer = CVAnonymizer(verbose=verbose, custom_replacements=custom_replacements)
+    if custom_replacements is None:
+        anonymizer = _get_default_anonymizer(verbose)
+    else:
+        anonymizer = CVAnonymizer(verbose=verbose, custom_replacements=custom_replacements)
     return anonymizer.anonymize(pdf_path, output_name, user_id)
 
 
+# Anonimizadores con los reemplazos por defecto, reutilizados entre llamadas
+# (no guardan estado por CV, así que se pueden compartir entre hilos)
+_DEFAULT_ANONYMIZERS: Dict[bool, CVAnonymizer] = {}
+
+
+def _get_default_anonymizer(verbose: bool) -> CVAnonymizer:
+    """Devuelve el anonimizador por defecto para el nivel de verbosidad indicado"""
+    anonymizer = _DEFAULT_ANONYMIZERS.get(verbose)
+    if anonymizer is None:
+        anonymizer = _DEFAULT_ANONYMIZERS.setdefault(verbose, CVAnonymizer(verbose=verbose))
+    return anonymizer
+
+
 # CLI para usar como script independiente
 if __name__ == "__main__":
     import sys
@@ -17,7 +17,7 @@ from models.documents import (
 )
 from services.document_utils import DocumentUtils
 from services.cv_anonymizer import anonymize_cv
-from services.RAG import get_rag_integration_service
+from services.RAG import get_rag_integration_service, get_document_batch_collector, get_search_service
 
 class DocumentService:
     """Servicio principal para gestión de documentos de usuario"""
@@ -25,6 +25,8 @@ class DocumentService:
     def __init__(self):
         self.document_utils = DocumentUtils()
         self.rag_integration = get_rag_integration_service()
+        self.rag_batch_collector = get_document_batch_collector()
+        self.search_service = get_search_service()
     
     async def upload_document(
         self, 
@@ -117,7 +119,8 @@ class DocumentService:
             # 🔥 INTEGRACIÓN CON RAG: Procesar documento para búsqueda semántica
             try:
                 logger.info(f"🤖 Iniciando procesamiento RAG del documento {unique_filename}")
-                rag_result = await self.rag_integration.process_uploaded_document(
+                # Las subidas concurrentes se agrupan en un solo lote de embeddings e inserción
+                rag_result = await self.rag_batch_collector.submit(
                     user_id=user_id,
                     document_id=doc_id,
                     file_path=file_path,
@@ -131,6 +134,8 @@ class DocumentService:
                 
                 if rag_result["success"]:
                     logger.info(f"✅ Procesamiento RAG completado: {rag_result.get('message')}")
+                    # Las búsquedas cacheadas ya no incluyen este documento
+                    self.search_service.invalidate(user_id)
                 else:
                     logger.warning(f"⚠️ Procesamiento RAG falló: {rag_result.get('error')}")
                     # No interrumpimos la carga si el procesamiento RAG falla
@@ -311,6 +316,7 @@ class DocumentService:
                 
                 if rag_delete_result["success"]:
                     logger.info(f"✅ Embedding RAG eliminado")
+                    self.search_service.invalidate(user_id)
                 else:
                     logger.warning(f"⚠️ No se pudo eliminar el embedding RAG: {rag_delete_result.get('error')}")
                     
@@ -0,0 +1,86 @@
+"""
+Tests unitarios del CVAnonymizer (no cargan spaCy ni acceden a la base de datos)
+"""
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.cv_anonymizer import CVAnonymizer, EMAIL_PATTERN
+
+
+def _reference_emails(text):
+    """Comportamiento original: regex sobre el texto completo"""
+    return [email.strip() for email in re.findall(EMAIL_PATTERN, text, re.IGNORECASE)]
+
+
+def _reference_filter(names):
+    """Comportamiento original sobre nombres únicos: se descartan los contenidos en otros"""
+    filtered = []
+    for name in sorted(dict.fromkeys(names), key=len, reverse=True):
+        if not any(name != other and name in other for other in filtered):
+            filtered.append(name)
+    return filtered
+
+
+@pytest.fixture
+def anonymizer():
+    return CVAnonymizer()
+
+
+class TestDetectEmails:
+    
+    @pytest.mark.parametrize("text", [
+        "",
+        "sin arroba",
+        "ana.perez@gmail.com",
+        "Contacto: ana.perez@gmail.com | Tel: 600 123 456",
+        "a@b.es\nb@c.org\tc@d.com\rd@e.net",
+        "  inicio@dominio.com  y final fin@dominio.io",
+        "doble a@b.com@c.org y x@@y.com",
+        "arroba suelta @ y correo@valido.es",
+        "mayúsculas ANA.PEREZ@GMAIL.COM, con coma: pepe@mail.es.",
+        "sin dominio usuario@localhost y usuario@mail.c",
+        "pegados texto,ana@mail.com;pepe@mail.com",
+    ])
+    def test_matches_full_text_regex(self, anonymizer, text):
+        assert anonymizer._detect_emails(text) == _reference_emails(text)
+    
+    def test_random_texts_match_full_text_regex(self, anonymizer):
+        rng = random.Random(0)
+        alphabet = "ab.x-_@ \n\t\r,;\f" + "\xa0"
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            text = text.replace("x", rng.choice(["com", "es", "x"]))
+            assert anonymizer._detect_emails(text) == _reference_emails(text), repr(text)
+
+
+class TestFilterDuplicateNames:
+    
+    def test_contained_names_removed(self, anonymizer):
+        names = ["Ana", "Ana García", "García", "Ana García López", "Pedro"]
+        assert anonymizer._filter_duplicate_names(names) == ["Ana García López", "Pedro"]
+    
+    def test_duplicates_removed(self, anonymizer):
+        assert anonymizer._filter_duplicate_names(["Luis Gil", "Luis Gil", "Eva"]) == ["Luis Gil", "Eva"]
+    
+    def test_empty(self, anonymizer):
+        assert anonymizer._filter_duplicate_names([]) == []
+    
+    def test_no_match_across_accepted_names(self, anonymizer):
+        # "Ana Luis" solo aparece uniendo dos nombres aceptados
+        names = ["Eva Ana", "Luis Mar", "Ana Luis"]
+        assert sorted(anonymizer._filter_duplicate_names(names)) == sorted(names)
+    
+    def test_random_names_match_reference(self, anonymizer):
+        rng = random.Random(1)
+        words = ["Ana", "Eva", "Gil", "Luis", "García", "López", "Mar", "an", "a"]
+        for _ in range(500):
+            names = [" ".join(rng.choices(words, k=rng.randint(1, 3))) for _ in range(rng.randint(0, 8))]
+            result = anonymizer._filter_duplicate_names(names)
+            assert sorted(result) == sorted(_reference_filter(names))
@@ -0,0 +1,148 @@
+"""
+Unit tests for the model-free helpers of EmbeddingService; the transformer
+model is never loaded
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.RAG.embedding_service import EmbeddingService
+
+
+@pytest.fixture
+def service():
+    """EmbeddingService without __init__: no model, device or executor"""
+    return EmbeddingService.__new__(EmbeddingService)
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((6, 384)).astype(np.float32)
+
+
+def _normalize(matrix):
+    return matrix / np.linalg.norm(matrix, axis=-1, keepdims=True)
+
+
+class TestQuantizeEmbeddings:
+    
+    def test_float32_is_unchanged(self, embeddings):
+        result = EmbeddingService.quantize_embeddings(embeddings, "float32")
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, embeddings)
+    
+    def test_float16(self, embeddings):
+        result = EmbeddingService.quantize_embeddings(embeddings, "float16")
+        assert result.dtype == np.float16
+        np.testing.assert_allclose(result.astype(np.float32), embeddings, rtol=1e-3, atol=1e-3)
+    
+    def test_bfloat16_round_trip(self, embeddings):
+        result = EmbeddingService.quantize_embeddings(embeddings, "bfloat16")
+        assert result.dtype == np.int16
+        assert result.shape == embeddings.shape
+        restored = EmbeddingService._as_float32(result)
+        np.testing.assert_allclose(restored, embeddings, rtol=1e-2, atol=1e-2)
+    
+    def test_bfloat16_accepts_read_only_input(self, embeddings):
+        embeddings.setflags(write=False)
+        result = EmbeddingService.quantize_embeddings(embeddings, "bfloat16")
+        assert result.shape == embeddings.shape
+    
+    def test_int8_uses_full_range_per_vector(self, embeddings):
+        result = EmbeddingService.quantize_embeddings(embeddings, "int8")
+        assert result.dtype == np.int8
+        np.testing.assert_array_equal(np.abs(result).max(axis=1), 127)
+        np.testing.assert_array_equal(np.sign(result[np.abs(embeddings) > 0.05]),
+                                      np.sign(embeddings[np.abs(embeddings) > 0.05]))
+    
+    def test_int8_zero_vector(self):
+        result = EmbeddingService.quantize_embeddings(np.zeros((1, 8), np.float32), "int8")
+        np.testing.assert_array_equal(result, 0)
+    
+    def test_ubinary_packs_sign_bits(self, embeddings):
+        result = EmbeddingService.quantize_embeddings(embeddings, "ubinary")
+        assert result.dtype == np.uint8
+        assert result.shape == (6, 384 // 8)
+        np.testing.assert_array_equal(np.unpackbits(result, axis=-1).astype(bool), embeddings > 0)
+    
+    def test_unsupported_precision(self, embeddings):
+        with pytest.raises(ValueError):
+            EmbeddingService.quantize_embeddings(embeddings, "int4")
+
+
+class TestCalculateSimilarity:
+    
+    def test_identical_vectors(self, service, embeddings):
+        assert service.calculate_similarity(embeddings[0], embeddings[0]) == pytest.approx(1.0, abs=1e-5)
+    
+    def test_rejects_mismatched_shapes(self, service, embeddings):
+        assert service.calculate_similarity(embeddings[0], embeddings[1][:100]) == 0.0
+
+
+class TestSimilarityMatrix:
+    
+    def test_matrix_matches_pairwise(self, service, embeddings):
+        matrix = service.calculate_similarity_matrix(embeddings[:2], embeddings)
+        expected = _normalize(embeddings[:2]) @ _normalize(embeddings).T
+        
+        assert matrix.shape == (2, 6)
+        np.testing.assert_allclose(matrix, expected, rtol=1e-5, atol=1e-6)
+        for i in range(2):
+            for j in range(6):
+                assert matrix[i, j] == pytest.approx(
+                    service.calculate_similarity(embeddings[i], embeddings[j]), abs=1e-5
+                )
+    
+    def test_matrix_assume_normalized_and_out(self, service, embeddings):
+        normalized = _normalize(embeddings)
+        out = np.empty((6, 6), dtype=np.float32)
+        
+        result = service.calculate_similarity_matrix(normalized, normalized, assume_normalized=True, out=out)
+        
+        assert result is out
+        np.testing.assert_allclose(np.diag(out), 1.0, rtol=1e-5)
+    
+    def test_matrix_zero_rows(self, service, embeddings):
+        a = np.vstack((np.zeros(384, np.float32), embeddings[0]))
+        matrix = service.calculate_similarity_matrix(a, embeddings)
+        
+        assert np.isfinite(matrix).all()
+        np.testing.assert_array_equal(matrix[0], 0.0)
+    
+    def test_matrix_accepts_single_vectors_and_half_precision(self, service, embeddings):
+        matrix = service.calculate_similarity_matrix(
+            embeddings[0].astype(np.float16), embeddings.astype(np.float16)
+        )
+        assert matrix.dtype == np.float32
+        assert matrix.shape == (1, 6)
+        assert matrix[0, 0] == pytest.approx(1.0, abs=1e-3)
+
+
+class TestSimilarityOneToMany:
+    
+    def test_one_to_many_matches_matrix(self, service, embeddings):
+        corpus = _normalize(embeddings)
+        query = embeddings[3] * 5.0
+        
+        scores = service.calculate_similarity_one_to_many(query, corpus)
+        
+        assert scores.shape == (6,)
+        np.testing.assert_allclose(
+            scores, service.calculate_similarity_matrix(query, corpus)[0], rtol=1e-5, atol=1e-6
+        )
+        assert int(np.argmax(scores)) == 3
+    
+    def test_one_to_many_does_not_modify_query(self, service, embeddings):
+        query = embeddings[0].copy()
+        service.calculate_similarity_one_to_many(query, _normalize(embeddings))
+        np.testing.assert_array_equal(query, embeddings[0])
+    
+    def test_one_to_many_zero_query(self, service, embeddings):
+        scores = service.calculate_similarity_one_to_many(np.zeros(384, np.float32), _normalize(embeddings))
+        np.testing.assert_array_equal(scores, 0.0)
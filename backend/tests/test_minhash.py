@@ -0,0 +1,60 @@
+"""
+Unit tests for compute_minhash (near-duplicate detection of uploaded documents)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.RAG.rag_integration_service import (
+    MINHASH_PERMUTATIONS,
+    RAGIntegrationService,
+    compute_minhash
+)
+
+BASE_TEXT = " ".join(
+    f"experiencia en desarrollo web proyecto {i} con python fastapi y postgresql"
+    for i in range(40)
+)
+
+
+def _similarity(a, b):
+    return float((a == b).mean())
+
+
+class TestComputeMinhash:
+    
+    def test_signature_shape_and_dtype(self):
+        signature = compute_minhash(BASE_TEXT)
+        assert signature.shape == (MINHASH_PERMUTATIONS,)
+        assert signature.dtype == np.uint32
+    
+    def test_deterministic(self):
+        np.testing.assert_array_equal(compute_minhash(BASE_TEXT), compute_minhash(BASE_TEXT))
+    
+    def test_case_and_punctuation_insensitive(self):
+        noisy = BASE_TEXT.upper().replace(" ", " , ")
+        np.testing.assert_array_equal(compute_minhash(noisy), compute_minhash(BASE_TEXT))
+    
+    def test_near_duplicate_above_threshold(self):
+        edited = BASE_TEXT.replace("proyecto 39", "proyecto treinta y nueve")
+        assert _similarity(compute_minhash(BASE_TEXT), compute_minhash(edited)) >= (
+            RAGIntegrationService.NEAR_DUPLICATE_THRESHOLD
+        )
+    
+    def test_unrelated_text_below_threshold(self):
+        other = " ".join(f"certificado de curso de cocina número {i} aprobado" for i in range(40))
+        assert _similarity(compute_minhash(BASE_TEXT), compute_minhash(other)) < 0.1
+    
+    def test_short_text_has_signature(self):
+        signature = compute_minhash("hola mundo")
+        assert signature.shape == (MINHASH_PERMUTATIONS,)
+        assert signature.max() > 0
+    
+    def test_signature_round_trips_through_bytes(self):
+        signature = compute_minhash(BASE_TEXT)
+        restored = np.frombuffer(signature.tobytes(), dtype=np.uint32)
+        np.testing.assert_array_equal(restored, signature)
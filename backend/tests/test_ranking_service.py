@@ -0,0 +1,96 @@
+"""
+Tests de paridad entre RankingService.rank_results (escalar) y
+rank_results_vectorized (NumPy)
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.RAG.ranking_service import RankingService
+
+
+def _make_results():
+    """Resultados que cubren valores ausentes, None y todos los tramos de puntuación"""
+    now = datetime.now()
+    results = []
+    sizes = [None, 0, 0.01, 0.05, 0.07, 0.1, 1.0, 2.0, 3.5, 5.0, 8.0]
+    ages = [None, 'invalid', 5, 45, 120, 200, 400]
+    types = ['cv', 'cover_letter', 'certificate', 'other', None]
+    contents = ['', 'x' * 50, 'x' * 300, 'x' * 800]
+    filenames = ['resume.pdf', 'doc.pdf', None]
+    
+    for i in range(77):
+        age = ages[i % len(ages)]
+        if age is None:
+            created_at = None
+        elif age == 'invalid':
+            created_at = 'not-a-date'
+        else:
+            created_at = (now - timedelta(days=age)).isoformat()
+        
+        result = {
+            'document_id': str(i),
+            'similarity_score': None if i % 13 == 0 else (i % 10) / 10,
+            'created_at': created_at,
+            'content_preview': contents[i % len(contents)],
+            'description': 'desc' if i % 3 == 0 else None,
+            'filename': filenames[i % len(filenames)],
+            'document_type': types[i % len(types)],
+        }
+        size = sizes[i % len(sizes)]
+        if i % 17 != 0:
+            result['file_size_mb'] = size
+        results.append(result)
+    return results
+
+
+class TestRankingParity:
+    """Los caminos escalar y vectorizado deben puntuar igual"""
+    
+    def setup_method(self):
+        self.service = RankingService()
+    
+    def _scalar(self, results, **kwargs):
+        # Forzar el camino escalar independientemente del tamaño
+        self.service.VECTORIZE_MIN_RESULTS = len(results) + 1
+        return self.service.rank_results(results, **kwargs)
+    
+    @pytest.mark.parametrize("boost_factors", [None, {'boost_recent': 1.5, 'boost_cv': 1.2}])
+    def test_scores_match(self, boost_factors):
+        scalar = self._scalar(_make_results(), boost_factors=boost_factors)
+        vectorized = self.service.rank_results_vectorized(_make_results(), boost_factors=boost_factors)
+        
+        assert [r['document_id'] for r in scalar] == [r['document_id'] for r in vectorized]
+        for a, b in zip(scalar, vectorized):
+            assert a['final_score'] == pytest.approx(b['final_score'])
+            assert a.get('boost_applied') == b.get('boost_applied')
+            for factor in RankingService.RANKING_FACTORS:
+                assert a['ranking_scores'][factor] == pytest.approx(b['ranking_scores'][factor])
+    
+    def test_unknown_file_size_is_neutral(self):
+        results = [{'document_id': '1', 'file_size_mb': None, 'document_type': 'cv'}]
+        scalar = self._scalar([dict(results[0])])
+        vectorized = self.service.rank_results_vectorized([dict(results[0])])
+        
+        assert scalar[0]['ranking_scores']['file_quality'] == 0.5
+        assert vectorized[0]['ranking_scores']['file_quality'] == 0.5
+    
+    def test_unknown_weight_factor_rejected(self):
+        weights = {'similarity': 0.9, 'popularity': 0.1}
+        
+        with pytest.raises(ValueError):
+            self._scalar(_make_results(), custom_weights=weights)
+        with pytest.raises(ValueError):
+            self.service.rank_results_vectorized(_make_results(), custom_weights=weights)
+    
+    def test_partial_weights_match(self):
+        weights = {'similarity': 0.5, 'completeness': 0.5}
+        scalar = self._scalar(_make_results(), custom_weights=weights)
+        vectorized = self.service.rank_results_vectorized(_make_results(), custom_weights=weights)
+        
+        assert [r['final_score'] for r in scalar] == pytest.approx([r['final_score'] for r in vectorized])
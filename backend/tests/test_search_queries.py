@@ -0,0 +1,65 @@
+"""
+Unit tests for the prebuilt semantic search SQL (build_search_query / SEARCH_QUERIES)
+"""
+import itertools
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.RAG.search_service import SEARCH_QUERIES, build_search_query
+
+FLAGS = list(itertools.product((False, True), repeat=3))
+
+
+def _parameters(query):
+    return sorted({int(number) for number in re.findall(r"\$(\d+)", query)})
+
+
+class TestSearchQueries:
+    
+    def test_every_combination_prebuilt(self):
+        assert set(SEARCH_QUERIES) == set(FLAGS)
+        for key in FLAGS:
+            assert SEARCH_QUERIES[key] == build_search_query(*key)
+    
+    @pytest.mark.parametrize("filter_user,filter_type,binary_rerank", FLAGS)
+    def test_parameters_are_contiguous(self, filter_user, filter_type, binary_rerank):
+        query = build_search_query(filter_user, filter_type, binary_rerank)
+        fixed = 3 if binary_rerank else 2
+        expected = fixed + filter_user + filter_type
+        
+        # asyncpg requires $1..$n without gaps
+        assert _parameters(query) == list(range(1, expected + 1))
+    
+    @pytest.mark.parametrize("filter_user,filter_type,binary_rerank", FLAGS)
+    def test_only_used_filters_are_present(self, filter_user, filter_type, binary_rerank):
+        query = build_search_query(filter_user, filter_type, binary_rerank)
+        
+        assert "is_active = TRUE" in query
+        assert ("user_id = $" in query) == filter_user
+        assert ("document_type = $" in query) == filter_type
+        assert "IS NULL" not in query
+        assert "{" not in query and "}" not in query
+    
+    def test_user_filter_comes_before_type_filter(self):
+        assert "user_id = $3" in build_search_query(True, True, False)
+        assert "document_type = $4" in build_search_query(True, True, False)
+        assert "user_id = $4" in build_search_query(True, True, True)
+        assert "document_type = $5" in build_search_query(True, True, True)
+        assert "document_type = $3" in build_search_query(False, True, False)
+    
+    def test_binary_rerank_uses_hamming_candidates(self):
+        query = build_search_query(False, False, True)
+        assert "binary_quantize" in query
+        assert "LIMIT $3" in query
+        assert "binary_quantize" not in build_search_query(False, False, False)
+    
+    def test_ann_query_orders_by_bare_distance(self):
+        # ORDER BY must be the bare operator expression for the HNSW index
+        query = build_search_query(True, False, False)
+        assert re.search(r"ORDER BY content_embedding::halfvec\(\d+\) <=> \$1", query)